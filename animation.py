@@ -0,0 +1,101 @@
+from assets import flipped, rotated, scaled
+
+
+#clips con nombre (frames + duracion por frame) y un reloj global compartido;
+#las entidades solo guardan clip (id) y phase (offset en frames)
+
+
+class Clip:
+    __slots__ = ("name", "frames", "frame_ms")
+
+    def __init__(self, name, frames, frame_ms):
+        self.name = name
+        self.frames = tuple(frames)
+        self.frame_ms = frame_ms
+
+
+class AnimationClock:
+    def __init__(self):
+        self.clips = []
+        self.by_name = {}
+        self.variants = {}
+        self.time_ms = 0.0
+
+    def add(self, name, frames, frame_ms):
+        if not frames:
+            return None
+        clip_id = len(self.clips)
+        self.clips.append(Clip(name, frames, frame_ms))
+        self.by_name[name] = clip_id
+        return clip_id
+
+    def fork(self):
+        #reloj propio que comparte los clips (para varias partidas en un proceso)
+        clock = AnimationClock()
+        clock.clips = self.clips
+        clock.by_name = self.by_name
+        clock.variants = self.variants
+        return clock
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def _variant(self, clip_id, kind, param, make):
+        key = (clip_id, kind, param)
+        variant = self.variants.get(key)
+        if variant is None:
+            clip = self.clips[clip_id]
+            variant = self.add(f"{clip.name}:{kind}{'' if param is None else param}",
+                               [make(f) for f in clip.frames], clip.frame_ms)
+            self.variants[key] = variant
+        return variant
+
+    def flipped(self, clip_id):
+        return self._variant(clip_id, "flip", None, flipped)
+
+    def rotated(self, clip_id, angle):
+        return self._variant(clip_id, "rot", angle, lambda f: rotated(f, angle))
+
+    def index(self, clip_id, phase=0):
+        clip = self.clips[clip_id]
+        return (int(self.time_ms // clip.frame_ms) + phase) % len(clip.frames)
+
+    def frame(self, clip_id, phase=0):
+        return self.clips[clip_id].frames[self.index(clip_id, phase)]
+
+    def spawn_phase(self, clip_id):
+        #phase para que el clip empiece en el frame 0 en el momento del spawn
+        return -int(self.time_ms // self.clips[clip_id].frame_ms)
+
+    def advance(self, dt_ms, rate=1.0):
+        self.time_ms += dt_ms * rate
+
+    def resolve(self, sprites):
+        #una pasada por frame: el indice base se calcula una vez por clip
+        base = {}
+        clips = self.clips
+        for sprite in sprites:
+            clip_id = getattr(sprite, "clip", None)
+            if clip_id is None:
+                continue
+            clip = clips[clip_id]
+            start = base.get(clip_id)
+            if start is None:
+                start = base[clip_id] = int(self.time_ms // clip.frame_ms)
+            image = clip.frames[(start + sprite.phase) % len(clip.frames)]
+            if image is sprite.image:
+                continue
+            sprite.image = image
+            size = image.get_size()
+            if size != sprite.rect.size:
+                center = sprite.rect.center
+                sprite.rect.size = size
+                sprite.rect.center = center
+
+
+def swim_cycle(image, squash=0.94):
+    #ciclo barato para peces de una sola imagen: se estira y encoge un poco
+    w, h = image.get_size()
+    narrow = scaled(image, (max(1, int(w * squash)), h))
+    flat = scaled(image, (w, max(1, int(h * squash))))
+    return [image, narrow, image, flat]
@@ -12,6 +12,16 @@ def load_sound(path):
         return None
 
 
+def load_font(path, size):
+    #font desde archivo; si no esta, la default que trae pygame (tampoco escanea el sistema)
+    if os.path.exists(path):
+        try:
+            return pygame.font.Font(path, size)
+        except (pygame.error, OSError):
+            pass
+    return pygame.font.Font(None, size)
+
+
 def load_music(path):
     #carga musica, devuelve falso si hay eror
     if not os.path.exists(path):
@@ -40,12 +50,47 @@ def scale_image_to_fit(surface, max_size):
     return pygame.transform.smoothscale(surface, new_size)
 
 
+#atlas de sprites (atlas.py): los sprites salen como subsurface de una hoja grande.
+#None = cada imagen desde su archivo
+_atlas = None
+
+
+def set_atlas(atlas):
+    global _atlas
+    _atlas = atlas
+
+
+def atlas_sheets():
+    return getattr(_atlas, "sheets", ())
+
+
+#imagenes cargadas (path, max_size, convert_alpha, colorkey) -> surface, para la recarga en
+#caliente (hotreload.py). None = no se anotan
+loaded = None
+
+
+def track_loaded():
+    global loaded
+    if loaded is None:
+        loaded = {}
+    return loaded
+
+
 def load_image(path, max_size=None, convert_alpha=True, colorkey=None):
     #abre imagen y la escala/aplica colorkey si se pide
 
     if not os.path.exists(path):
         return None
-    
+    if _atlas is not None and convert_alpha:
+        image = _atlas.image(path, max_size, colorkey, _decode_image)
+    else:
+        image = _decode_image(path, max_size, convert_alpha, colorkey)
+    if loaded is not None and image is not None:
+        loaded[(path, max_size, convert_alpha, colorkey)] = image
+    return image
+
+
+def _decode_image(path, max_size, convert_alpha, colorkey):
     try:
         image = pygame.image.load(path)
         image = image.convert_alpha() if convert_alpha else image.convert()
@@ -59,3 +104,52 @@ def load_image(path, max_size=None, convert_alpha=True, colorkey=None):
 
     except pygame.error:
         return None
+
+
+#variantes compartidas (flip, rotacion, escala) para no copiar una imagen por sprite
+_variant_cache = {}
+
+
+def _cached_variant(key, surface, make):
+    entry = _variant_cache.get(key)
+    if entry is None or entry[0] is not surface:
+        if _atlas is not None:
+            entry = (surface, _atlas.variant(key[0], surface, key[2] if len(key) > 2 else None, make))
+        else:
+            entry = (surface, make())
+        _variant_cache[key] = entry
+    return entry[1]
+
+
+def flipped(surface):
+    return _cached_variant(("flip", id(surface)), surface,
+                           lambda: pygame.transform.flip(surface, True, False))
+
+
+def rotation_bucket(angle, step):
+    #redondea el angulo al bucket mas cercano para reusar imagenes rotadas
+    if step <= 0:
+        return angle
+    return (round(angle / step) * step) % 360
+
+
+def rotated(surface, angle):
+    return _cached_variant(("rot", id(surface), angle), surface,
+                           lambda: pygame.transform.rotate(surface, angle))
+
+
+def scaled(surface, size):
+    return _cached_variant(("scale", id(surface), size), surface,
+                           lambda: pygame.transform.smoothscale(surface, size))
+
+
+def solid_image(size, color, flags=0):
+    #imagenes de relleno cuando no hay asset, una por tamaño/color
+    key = ("solid", size, color, flags)
+    entry = _variant_cache.get(key)
+    if entry is None:
+        surface = pygame.Surface(size, flags)
+        surface.fill(color)
+        entry = (surface, surface)
+        _variant_cache[key] = entry
+    return entry[1]
@@ -0,0 +1,301 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pygame
+
+import assets
+from constants import ATLAS_DIR, ATLAS_SHEET_SIZE, ROTATION_BUCKET_DEGREES
+
+
+#atlas de sprites: `python atlas.py build` carga los sprites como el juego (ya escalados, con
+#colorkey) mas sus variantes (flip de los peces, rotaciones del tiburon, botes) y los empaqueta
+#en pocas hojas (RGBA crudo) con un indice JSON. En runtime cada sprite es una subsurface de
+#su hoja. Un archivo que cambio (tamano/mtime) o que no esta en el indice se carga como siempre
+
+INDEX_NAME = "atlas.json"
+VERSION = 1
+PADDING = 1
+
+
+def _relative(base, path):
+    return Path(os.path.relpath(os.path.abspath(path), base)).as_posix()
+
+
+def _load_name(rel, max_size, colorkey):
+    #mismo archivo con otro tamano maximo o colorkey es otro sprite
+    size = f"{max_size[0]}x{max_size[1]}" if max_size else "-"
+    key = ",".join(str(c) for c in colorkey) if colorkey is not None else "-"
+    return f"{rel}|{size}|{key}"
+
+
+def _variant_name(parent, kind, param):
+    if kind == "scale":
+        param = f"{param[0]}x{param[1]}"
+    return f"{parent}|{kind}{'' if param is None else param}"
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class Atlas:
+    def __init__(self, base, index, sheets):
+        self.base = base
+        self.sources = index["sources"]  # ruta relativa -> [bytes, mtime_ns] al empaquetar
+        self.sprites = index["sprites"]  # nombre -> [hoja, x, y, w, h, colorkey, rle]
+        self.sheets = sheets
+        self.names = {}  # id(subsurface) -> (subsurface, nombre), para encontrar sus variantes
+        self.hits = 0
+        self.misses = 0
+
+    def _sprite(self, name):
+        entry = self.sprites.get(name)
+        if entry is None:
+            return None
+        sheet, x, y, w, h, colorkey, rle = entry
+        image = self.sheets[sheet].subsurface((x, y, w, h))
+        if colorkey is not None:
+            #los flips/rotaciones con colorkey salen de pygame con RLE, igual que aca
+            image.set_colorkey(colorkey, pygame.RLEACCEL if rle else 0)
+        self.names[id(image)] = (image, name)
+        return image
+
+    def image(self, path, max_size, colorkey, decode):
+        rel = _relative(self.base, path)
+        image = None
+        if self.sources.get(rel) == _stamp(path):
+            image = self._sprite(_load_name(rel, max_size, colorkey))
+        if image is None:
+            self.misses += 1
+            return decode(path, max_size, True, colorkey)
+        self.hits += 1
+        return image
+
+    def variant(self, kind, surface, param, make):
+        entry = self.names.get(id(surface))
+        if entry is not None and entry[0] is surface:
+            image = self._sprite(_variant_name(entry[1], kind, param))
+            if image is not None:
+                return image
+        return make()
+
+
+def load(path, base):
+    #None si no hay atlas (o no se puede leer): el juego carga archivo por archivo
+    try:
+        with open(os.path.join(path, INDEX_NAME)) as f:
+            index = json.load(f)
+        if index.get("version") != VERSION:
+            return None
+        sheets = []
+        for name, w, h in index["sheets"]:
+            with open(os.path.join(path, name), "rb") as f:
+                sheets.append(pygame.image.frombytes(f.read(), (w, h), "RGBA").convert_alpha())
+    except (OSError, ValueError, KeyError, pygame.error):
+        return None
+    return Atlas(str(base), index, sheets)
+
+
+class _Recorder:
+    #hook de assets mientras se empaqueta: carga normal y anota nombre -> surface
+
+    def __init__(self, base):
+        self.base = base
+        self.names = {}
+        self.sprites = {}
+        self.sources = {}
+
+    def _keep(self, image, name):
+        if image is not None and image.get_flags() & pygame.SRCALPHA:
+            self.names[id(image)] = (image, name)
+            self.sprites.setdefault(name, image)
+        return image
+
+    def image(self, path, max_size, colorkey, decode):
+        rel = _relative(self.base, path)
+        self.sources[rel] = _stamp(path)
+        return self._keep(decode(path, max_size, True, colorkey), _load_name(rel, max_size, colorkey))
+
+    def variant(self, kind, surface, param, make):
+        image = make()
+        entry = self.names.get(id(surface))
+        if entry is not None and entry[0] is surface:
+            self._keep(image, _variant_name(entry[1], kind, param))
+        return image
+
+
+class _Counter:
+    #hook de assets para el bench sin atlas: cuenta los archivos decodificados
+    def __init__(self):
+        self.misses = 0
+
+    def image(self, path, max_size, colorkey, decode):
+        self.misses += 1
+        return decode(path, max_size, True, colorkey)
+
+    def variant(self, kind, surface, param, make):
+        return make()
+
+
+def warm_variants(game):
+    #las variantes que el juego arma a mitad de partida: flips de los peces, rotaciones del
+    #tiburon (todos los buckets) y las rotaciones/hundido de los botes
+    game.reset_game(seed=0)
+    for clip in game.friendly_fish_clips + game.predator_fish_clips:
+        game.animator.flipped(clip)
+    for angle in range(0, 360, ROTATION_BUCKET_DEGREES):
+        game.shark_clip(angle)
+
+
+def pack(sizes, sheet_size):
+    #estantes: de mas alto a mas bajo, fila por fila; hoja nueva cuando no entra.
+    #Cada hoja queda del tamano que se uso
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    places = [None] * len(sizes)
+    sheets = []
+    x = y = shelf = 0
+    for i in order:
+        w, h = sizes[i]
+        if sheets and x + w > sheet_size:
+            x, y, shelf = 0, y + shelf, 0
+        if not sheets or y + h > sheet_size:
+            sheets.append([0, 0])
+            x = y = shelf = 0
+        places[i] = (len(sheets) - 1, x, y)
+        used = sheets[-1]
+        used[0] = max(used[0], x + w)
+        used[1] = max(used[1], y + h)
+        x += w + PADDING
+        shelf = max(shelf, h + PADDING)
+    return places, [tuple(size) for size in sheets]
+
+
+def _copy_pixels(image, sheet, x, y):
+    #fila por fila en crudo: blit o copy() pasarian los pixels del colorkey a alpha 0
+    src = image.get_buffer().raw
+    dst = sheet.get_buffer()
+    row = image.get_width() * 4
+    pitch, sheet_pitch = image.get_pitch(), sheet.get_pitch()
+    for r in range(image.get_height()):
+        dst.write(src[r * pitch:r * pitch + row], (y + r) * sheet_pitch + x * 4)
+
+
+def build(base, out_dir, sheet_size=ATLAS_SHEET_SIZE):
+    from game import LuckyLuresGame
+    recorder = _Recorder(str(base))
+    assets.set_atlas(recorder)
+    try:
+        game = LuckyLuresGame(headless=True, use_atlas=False)
+        warm_variants(game)
+    finally:
+        assets.set_atlas(None)
+
+    #todas las hojas en el formato de los sprites (los que vienen en otro formato no entran)
+    template = next(iter(recorder.sprites.values()))
+    names = sorted(name for name, image in recorder.sprites.items()
+                   if image.get_bitsize() == 32 and image.get_masks() == template.get_masks())
+    images = [recorder.sprites[name] for name in names]
+    places, sizes = pack([image.get_size() for image in images], sheet_size)
+    sheets = [pygame.Surface(size, pygame.SRCALPHA, template) for size in sizes]
+    for sheet in sheets:
+        sheet.fill((0, 0, 0, 0))
+    sprites = {}
+    for name, image, (index, x, y) in zip(names, images, places):
+        _copy_pixels(image, sheets[index], x, y)
+        colorkey = image.get_colorkey()
+        sprites[name] = [index, x, y, image.get_width(), image.get_height(),
+                         list(colorkey) if colorkey is not None else None,
+                         bool(image.get_flags() & pygame.RLEACCELOK)]
+
+    os.makedirs(out_dir, exist_ok=True)
+    #hojas en RGBA crudo: se leen de un tiron, sin decodificar PNG al arrancar
+    sheet_names = []
+    for i, sheet in enumerate(sheets):
+        sheet_names.append([f"sheet_{i}.rgba", sheet.get_width(), sheet.get_height()])
+        with open(os.path.join(out_dir, sheet_names[-1][0]), "wb") as f:
+            f.write(pygame.image.tobytes(sheet, "RGBA"))
+    index = {"version": VERSION, "sheets": sheet_names, "sources": recorder.sources, "sprites": sprites}
+    with open(os.path.join(out_dir, INDEX_NAME), "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+
+    area = sum(w * h for w, h in sizes)
+    used = sum(image.get_width() * image.get_height() for image in images)
+    print(f"{len(images)} sprites from {len(recorder.sources)} files -> {len(sheets)} sheets "
+          f"({', '.join(f'{w}x{h}' for w, h in sizes)}), {used * 100 / max(1, area):.0f}% filled -> {out_dir}")
+    return index
+
+
+def _buffers(game):
+    #sprites en uso (assets + variantes) y cuantos bloques de pixels distintos ocupan
+    surfaces = {}
+    for value in (game.boat_image, game.lure_image, game.sunken_image, *game.friendly_fish_images,
+                  *game.predator_fish_images, *game.obstacle_frames):
+        if value is not None:
+            surfaces[id(value)] = value
+    for source, result in assets._variant_cache.values():
+        surfaces[id(result)] = result
+    buffers = set()
+    for surface in surfaces.values():
+        parent = surface.get_parent()
+        buffers.add(id(surface if parent is None else parent))
+    return len(surfaces), len(buffers)
+
+
+def _bench_once(use_atlas):
+    from game import LuckyLuresGame
+    assets._variant_cache.clear()
+    assets.set_atlas(None if use_atlas else _Counter())
+    game = LuckyLuresGame(headless=True, use_atlas=use_atlas)
+    hook = assets._atlas
+    load_ms = sum(ms for name, ms in game.startup.phases if name in ("atlas", "assets"))
+    start = time.perf_counter()
+    warm_variants(game)
+    variants_ms = (time.perf_counter() - start) * 1000
+    sprites, buffers = _buffers(game)
+    files = hook.misses + len(assets.atlas_sheets())
+    assets.set_atlas(None)
+    return load_ms, variants_ms, files, sprites, buffers
+
+
+def bench(runs, base):
+    if not os.path.exists(base / ATLAS_DIR / INDEX_NAME):
+        print(f"no atlas in {base / ATLAS_DIR}, run `python atlas.py build` first")
+        return 1
+    results = {False: [], True: []}
+    for _ in range(runs):
+        for use_atlas in (False, True):
+            results[use_atlas].append(_bench_once(use_atlas))
+    for use_atlas, rows in results.items():
+        load_ms = statistics.median(r[0] for r in rows)
+        variants_ms = statistics.median(r[1] for r in rows)
+        files, sprites, buffers = rows[-1][2:]
+        print(f"{'atlas' if use_atlas else 'files':5}: load {load_ms:6.1f} ms | mid-game variants {variants_ms:6.1f} ms | "
+              f"{files} image files | {sprites} sprites in {buffers} pixel buffers")
+    return 0
+
+
+def main(argv=None):
+    base = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Sprite atlas packer for Lucky Lures")
+    commands = parser.add_subparsers(dest="command", required=True)
+    make = commands.add_parser("build", help="pack every sprite into sheets + index")
+    make.add_argument("--out", default=str(base / ATLAS_DIR))
+    make.add_argument("--sheet-size", type=int, default=ATLAS_SHEET_SIZE)
+    measure = commands.add_parser("bench", help="asset load time with and without the atlas")
+    measure.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build(base, args.out, args.sheet_size)
+        return 0
+    return bench(args.runs, base)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import pygame
 
+from assets import rotated, scaled, solid_image
 from constants import (
     HEIGHT,
     MAX_HEALTH,
@@ -11,22 +12,24 @@ from constants import (
 
 #clase de bote
 class PlayerBoat(pygame.sprite.Sprite):
+    bounds = pygame.Rect(0, 0, WIDTH, HEIGHT)  # en modo rio: la vista de la camara
+
     def __init__(self, x, y, sprite_image=None, sunken_image=None, name="P1"):
         super().__init__()
         #busca la img
         if sprite_image:
-            self.base_image = sprite_image.copy()
+            self.base_image = sprite_image
         else:  # no la encuentra
-            self.base_image = pygame.Surface((60, 30))
-            self.base_image.fill(YELLOW)
-        #rote con el jugador
+            self.base_image = solid_image((60, 30), YELLOW)
+        #rote con el jugador (rotaciones compartidas entre botes)
         self.images = {
             "UP": self.base_image,
-            "DOWN": pygame.transform.rotate(self.base_image, 180),
-            "LEFT": pygame.transform.rotate(self.base_image, 90),
-            "RIGHT": pygame.transform.rotate(self.base_image, -90),
+            "DOWN": rotated(self.base_image, 180),
+            "LEFT": rotated(self.base_image, 90),
+            "RIGHT": rotated(self.base_image, -90),
         }
         self.direction = "UP"  # default
+        self.heading = (0, -1)  # ultimo movimiento, con diagonales (para lanzar)
         self.image = self.images[self.direction]
         self.rect = self.image.get_rect(center=(x, y))
         self.speed = PLAYER_SPEED
@@ -39,9 +42,7 @@ class PlayerBoat(pygame.sprite.Sprite):
 
             target_size = (max(8, int(target_size[0] * shrink)),
                            max(8, int(target_size[1] * shrink)))
-            self.sunken_image = pygame.transform.smoothscale(
-                sunken_image.copy(), target_size
-            )
+            self.sunken_image = scaled(sunken_image, target_size)
         else:
             self.sunken_image = None
         self.is_sunk = False
@@ -62,9 +63,12 @@ class PlayerBoat(pygame.sprite.Sprite):
             dy = self.speed
             self._set_direction("DOWN")
 
+        if dx or dy:
+            self.heading = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+
         self.rect.x += dx
         self.rect.y += dy
-        self.rect.clamp_ip(pygame.Rect(0, 0, WIDTH, HEIGHT)) #keeps rect/boat inside screen
+        self.rect.clamp_ip(self.bounds) #keeps rect/boat inside screen
     #hp
     def take_damage(self, amount=1):
 
@@ -86,7 +90,11 @@ class PlayerBoat(pygame.sprite.Sprite):
             return
         
         self.direction = direction
-        prev_center = self.rect.center
-        
+
         self.image = self.images.get(direction, self.base_image)
-        self.rect = self.image.get_rect(center=prev_center)
+        #rect en el lugar, mismo centro (sin Rect nuevo)
+        size = self.image.get_size()
+        if size != self.rect.size:
+            center = self.rect.center
+            self.rect.size = size
+            self.rect.center = center
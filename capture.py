@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import queue
+import struct
+import sys
+import time
+import zlib
+import multiprocessing as mp
+from collections import deque
+from multiprocessing import shared_memory
+
+
+#captura de video: el frame loop copia self.screen a un slot libre de un pool en shared memory
+#y le pasa el indice a un proceso escritor (png o raw comprimido). Si no hay slot libre el
+#frame se descarta; el juego nunca espera al escritor.
+#Proceso y no thread: pygame.image.save no suelta el GIL mientras comprime el png
+
+#.zraw: una linea JSON de cabecera y despues registros (frame, t_ms, largo) + pixels con zlib
+RECORD = struct.Struct("<IdI")
+
+
+def _surface_from(data, size, bitsize, masks):
+    import pygame
+    surface = pygame.Surface(size, 0, bitsize, masks)
+    surface.get_buffer().write(bytes(data))
+    return surface
+
+
+def _writer_main(shm_name, slot_bytes, header, fmt, path, jobs, done):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    size = tuple(header["size"])
+    masks = tuple(header["masks"])
+    written = 0
+    encode_s = 0.0
+    out = None
+    if fmt == "png":
+        os.makedirs(path, exist_ok=True)
+    else:
+        out = open(path, "wb")
+        out.write((json.dumps(header) + "\n").encode())
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            slot, frame, t_ms = job
+            start = time.perf_counter()
+            data = shm.buf[slot * slot_bytes:(slot + 1) * slot_bytes]
+            if fmt == "png":
+                import pygame
+                surface = _surface_from(data, size, header["bitsize"], masks)
+                pygame.image.save(surface, os.path.join(path, f"frame_{frame:06d}.png"))
+            else:
+                packed = zlib.compress(data, 1)
+                out.write(RECORD.pack(frame, t_ms, len(packed)))
+                out.write(packed)
+            data.release()
+            done.put(slot)
+            written += 1
+            encode_s += time.perf_counter() - start
+    finally:
+        if out:
+            out.close()
+        shm.close()
+        done.put(("stats", written, encode_s))
+
+
+class FrameCapture:
+    def __init__(self, directory, surface, fmt="zraw", pool=8, every=1):
+        if surface.get_pitch() != surface.get_width() * surface.get_bytesize():
+            raise ValueError("capture needs a surface without row padding")
+        self.fmt = fmt
+        self.every = every
+        self.size = surface.get_size()
+        self.slot_bytes = surface.get_pitch() * surface.get_height()
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * pool)
+        self.slots = [self.shm.buf[i * self.slot_bytes:(i + 1) * self.slot_bytes] for i in range(pool)]
+        self.free = list(range(pool))
+
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("capture_%Y%m%d_%H%M%S")
+        self.path = os.path.join(directory, stamp if fmt == "png" else stamp + ".zraw")
+        header = {
+            "size": list(self.size),
+            "bitsize": surface.get_bitsize(),
+            "masks": list(surface.get_masks()),
+            "every": every,
+        }
+        ctx = mp.get_context("spawn")
+        self.jobs = ctx.Queue()
+        self.done = ctx.Queue()
+        self.writer = ctx.Process(target=_writer_main, name="capture",
+                                  args=(self.shm.name, self.slot_bytes, header, fmt, self.path,
+                                        self.jobs, self.done), daemon=True)
+        self.writer.start()
+
+        self.start = time.perf_counter()
+        self.frame = 0
+        self.captured = 0
+        self.dropped = 0
+        self.cost_total = 0.0
+        self.cost_max = 0.0
+        self.costs = deque(maxlen=1000)
+        self.writer_stats = None
+
+    def _reclaim(self):
+        while True:
+            try:
+                item = self.done.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, tuple):
+                self.writer_stats = item
+            else:
+                self.free.append(item)
+
+    def grab(self, surface):
+        #llamar justo despues de display.flip
+        self.frame += 1
+        if self.frame % self.every:
+            return
+        begin = time.perf_counter()
+        self._reclaim()
+        if self.free:
+            slot = self.free.pop()
+            view = surface.get_view("0")
+            self.slots[slot][:] = memoryview(view).cast("B")
+            del view  #suelta el lock de la surface
+            self.jobs.put((slot, self.frame, (begin - self.start) * 1000))
+            self.captured += 1
+        else:
+            self.dropped += 1  #el escritor va atrasado: se pierde el frame, no el framerate
+        cost = time.perf_counter() - begin
+        self.cost_total += cost
+        self.costs.append(cost)
+        if cost > self.cost_max:
+            self.cost_max = cost
+
+    def close(self, timeout=10.0):
+        self.jobs.put(None)
+        deadline = time.perf_counter() + timeout
+        while self.writer_stats is None and time.perf_counter() < deadline:
+            try:
+                item = self.done.get(timeout=0.1)
+            except queue.Empty:
+                if not self.writer.is_alive():
+                    break
+                continue
+            if isinstance(item, tuple):
+                self.writer_stats = item
+        self.writer.join(1.0)
+        for view in self.slots:
+            view.release()
+        self.shm.close()
+        self.shm.unlink()
+        return self.report()
+
+    def report(self):
+        grabs = self.captured + self.dropped
+        ordered = sorted(self.costs)
+        p99 = ordered[int(0.99 * (len(ordered) - 1))] * 1000 if ordered else 0.0
+        mean = self.cost_total / grabs * 1000 if grabs else 0.0
+        line = (f"[capture] {self.captured} frames, {self.dropped} dropped "
+                f"({self.dropped / max(1, grabs):.1%}); main thread mean {mean:.3f} ms, "
+                f"p99 {p99:.3f} ms, max {self.cost_max * 1000:.3f} ms")
+        if self.writer_stats:
+            _, written, encode_s = self.writer_stats
+            line += f"; writer {written} frames, {encode_s * 1000 / max(1, written):.1f} ms/frame"
+        return line + f" -> {self.path}"
+
+
+def iter_zraw(path):
+    #(cabecera, frame, t_ms, bytes crudos) por cada frame de un .zraw
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        while True:
+            raw = f.read(RECORD.size)
+            if len(raw) < RECORD.size:
+                return
+            frame, t_ms, length = RECORD.unpack(raw)
+            yield header, frame, t_ms, zlib.decompress(f.read(length))
+
+
+def decode(path, out_dir):
+    import pygame
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for header, frame, t_ms, data in iter_zraw(path):
+        surface = _surface_from(data, tuple(header["size"]), header["bitsize"], tuple(header["masks"]))
+        pygame.image.save(surface, os.path.join(out_dir, f"frame_{frame:06d}.png"))
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode a .zraw gameplay capture to PNG frames")
+    parser.add_argument("capture", help=".zraw file written by CAPTURE_ENABLED")
+    parser.add_argument("out_dir")
+    args = parser.parse_args(argv)
+    count = decode(args.capture, args.out_dir)
+    print(f"{count} frames written to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import math
+
+import pygame
+
+
+#una mask por imagen distinta; se guarda la imagen junto a su mask para que el id no se reuse
+_mask_cache = {}
+
+
+def get_mask(surface):
+    entry = _mask_cache.get(id(surface))
+    if entry is None or entry[0] is not surface:
+        entry = (surface, pygame.mask.from_surface(surface))
+        _mask_cache[id(surface)] = entry
+    return entry[1]
+
+
+def mask_cache_size():
+    return len(_mask_cache)
+
+
+def _first_item(item):
+    return item[0]
+
+
+class Collider:
+    #rect primero (barato), mask solo si los rects se tocan y pixel_perfect esta activo
+
+    def __init__(self, pixel_perfect=False):
+        self.pixel_perfect = pixel_perfect
+        self.broad_tests = 0
+        self.narrow_tests = 0
+        self.narrow_hits = 0
+        self.last_frame = (0, 0, 0)
+
+    def begin_frame(self):
+        self.last_frame = (self.broad_tests, self.narrow_tests, self.narrow_hits)
+        self.broad_tests = 0
+        self.narrow_tests = 0
+        self.narrow_hits = 0
+
+    def __call__(self, a, b):
+        self.broad_tests += 1
+        if not a.rect.colliderect(b.rect):
+            return False
+        if not self.pixel_perfect:
+            return True
+
+        self.narrow_tests += 1
+        offset = (b.rect.x - a.rect.x, b.rect.y - a.rect.y)
+        if get_mask(a.image).overlap(get_mask(b.image), offset) is None:
+            return False
+        self.narrow_hits += 1
+        return True
+
+    def sweep(self, mover, start, end, candidates, out=None):
+        #mover viaja con su centro de start a end; agrega a out (o a una lista nueva)
+        #(fraccion del camino, target) ordenado por el primer contacto. Rect del target engordado con el tamano del mover
+        #(Minkowski) contra el segmento del centro
+        w, h = mover.rect.size
+        length = math.hypot(end[0] - start[0], end[1] - start[1])
+        hits = [] if out is None else out
+        first = len(hits)
+        for target in candidates:
+            self.broad_tests += 1
+            clipped = target.rect.inflate(w, h).clipline(start, end)
+            if not clipped:
+                continue
+            entry = clipped[0]
+            if self.pixel_perfect:
+                entry = self._first_overlap(mover, target, clipped)
+                if entry is None:
+                    continue
+            t = math.hypot(entry[0] - start[0], entry[1] - start[1]) / length if length else 0.0
+            hits.append((t, target))
+        if len(hits) - first > 1:
+            hits[first:] = sorted(hits[first:], key=_first_item)
+        return hits
+
+    def _first_overlap(self, mover, target, clipped):
+        #recorre el tramo dentro del rect engordado probando masks cada medio mover
+        self.narrow_tests += 1
+        (x0, y0), (x1, y1) = clipped
+        w, h = mover.rect.size
+        step = max(1.0, min(w, h) / 2)
+        steps = max(1, int(math.hypot(x1 - x0, y1 - y0) / step) + 1)
+        mover_mask = get_mask(mover.image)
+        target_mask = get_mask(target.image)
+        for i in range(steps + 1):
+            x = x0 + (x1 - x0) * i / steps
+            y = y0 + (y1 - y0) * i / steps
+            offset = (target.rect.x - int(x - w / 2), target.rect.y - int(y - h / 2))
+            if mover_mask.overlap(target_mask, offset) is not None:
+                self.narrow_hits += 1
+                return x, y
+        return None
+
+    def stats_text(self):
+        broad, narrow, hits = self.last_frame
+        return f"rect {broad} | mask {narrow} ({hits} hit) | masks {mask_cache_size()}"
@@ -15,6 +15,10 @@ MAX_HEALTH = 3
 
 FISH_SPAWN_INTERVAL = 1500    # ms
 OBSTACLE_SPAWN_INTERVAL = 2000
+FISH_SPAWN_MIN_INTERVAL = 600
+OBSTACLE_SPAWN_MIN_INTERVAL = 700
+SPAWN_RAMP_MS_PER_SECOND = 10 # cada segundo los intervalos bajan esto
+PREDATOR_CHANCE = 0.3
 
 BASE_FISH_SPEED = 3
 BASE_OBSTACLE_SPEED = 4
@@ -24,6 +28,90 @@ IDLE_SHARK_SPEED = BASE_OBSTACLE_SPEED + 2.5
 BOAT_IMAGE_MAX_SIZE = (140, 80)
 FISH_IMAGE_MAX_SIZE = (90, 50)
 
+#atlas de sprites (python atlas.py build); sin atlas, o si el archivo cambio, se carga de su archivo
+ATLAS_ENABLED = True
+ATLAS_DIR = "atlas"
+ATLAS_SHEET_SIZE = 1024
+
+#recarga en caliente (solo con ventana): constants.py y las imagenes de assets/ se releen
+#entre frames cuando cambian; WIDTH/HEIGHT/FPS y los *_ENABLED igual piden reiniciar
+HOT_RELOAD = False
+HOT_RELOAD_POLL_MS = 250
+
+#modo endless: vida y poblacion acotadas, dificultad que se aplana
+ENDLESS_FISH_LIFETIME_MS = 20000
+ENDLESS_OBSTACLE_LIFETIME_MS = 15000
+ENDLESS_MAX_FISH = 30
+ENDLESS_MAX_OBSTACLES = 15
+ENDLESS_RAMP_TAU_S = 90       # la dificultad se acerca al minimo con esta constante de tiempo
+
+#cardumenes (steering con grid; numpy opcional para las fuerzas)
+SCHOOLING_ENABLED = False
+SCHOOLING_NUMPY = True
+SCHOOL_RADIUS = 60          # vecinos para alinearse / juntarse
+SCHOOL_SEPARATION = 24      # distancia minima entre peces del mismo tipo
+SCHOOL_CHASE_RADIUS = 140   # depredadores persiguen / amigos huyen dentro de este radio
+SCHOOL_BOUNDS = (0, 60, WIDTH, HEIGHT - 60)  # zona del rio donde nadan (left, top, right, bottom)
+
+#animacion (ms por frame, reloj global)
+OBSTACLE_FRAME_MS = 120
+PREDATOR_FRAME_MS = 140
+FISH_FRAME_MS = 150
+
+#colisiones
+PIXEL_PERFECT_COLLISION = False   # mask despues del rect
+SHOW_COLLISION_STATS = False      # contador de tests por frame en el HUD
+ROTATION_BUCKET_DEGREES = 10      # angulos de tiburon se redondean para reusar imagen/mask
+SPATIAL_CELL = 64                 # celda del grid para la colision barrida de cebos
+
+#latencia de input
+LATENCY_TRACE = False      # reporte de latencia input->pantalla al salir
+LATENCY_LATE_LATCH = False # dormir antes de leer input en vez de despues del flip
+
+#memoria
+MEMORY_ACCOUNTING = False  # bytes por entidad/asset, overlay con F3
+MEMORY_SAMPLE_MS = 2000
+MEMORY_TRACEMALLOC = False # suma objetos python (tiene costo)
+MEMORY_BUDGETS_MB = {"total": 128, "entities": 16}  # alarma + reporte al pasarse
+REPORT_DIR = "reports"
+
+#calidad adaptativa: baja calidad si el frame se pasa del presupuesto
+GOVERNOR_ENABLED = True
+GOVERNOR_MAX_FISH = 25
+GOVERNOR_MAX_OBSTACLES = 12
+
+#leaderboard (sqlite, se escribe en un thread aparte)
+LEADERBOARD_ENABLED = True
+LEADERBOARD_FILE = "leaderboard.db"
+
+#telemetria (line-JSON, rotado y comprimido en un thread aparte)
+TELEMETRY_ENABLED = False
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_MAX_BYTES = 8 * 1024 * 1024
+
+#dos procesos: simulacion y render separados (shared memory)
+SPLIT_PROCESSES = False
+SPLIT_UNCAPPED = False     # benchmark: ambos lados sin limite de FPS
+
+#arranque: font incluida (si falta se usa la de pygame) y reporte de tiempos al primer frame
+FONT_FILE = "assets/fonts/main.ttf"
+STARTUP_PROFILE = False
+
+#gc: assets congelados despues de cargar, gc ciclico solo en pausa / cambios de estado
+GC_GAMEPLAY_MODE = True
+ALLOC_COUNTER = False      # bloques netos por frame de juego (sys.getallocatedblocks)
+
+#grabacion: "zraw" (zlib, aguanta 60 fps) o "png" (secuencia, mas lenta: descarta mas frames)
+CAPTURE_ENABLED = False
+CAPTURE_FORMAT = "zraw"
+CAPTURE_DIR = "captures"
+CAPTURE_POOL = 8            # buffers preasignados en shared memory
+CAPTURE_EVERY = 1           # 2 = graba un frame de cada dos
+
+#particulas (numpy opcional; sin numpy se desactivan solas)
+PARTICLES_ENABLED = True
+PARTICLE_CAPACITY = 16384
+
 #colores
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -39,3 +127,16 @@ STATE_MENU = "MENU"
 STATE_PLAYING = "PLAYING"
 STATE_PAUSED = "PAUSED"
 STATE_GAME_OVER = "GAME_OVER"
+
+#rio largo con camara (modo experimental): el mundo mide RIVER_LENGTH_SCREENS pantallas de alto
+RIVER_ENABLED = False
+RIVER_LENGTH_SCREENS = 40
+RIVER_CHUNK_HEIGHT = 200     # alto de cada franja de fondo generada
+RIVER_NEAR_MARGIN = 150      # px alrededor de la vista con update completo
+RIVER_ACTIVE_SCREENS = 1.5   # mas alla de esto (en pantallas) las entidades se descartan
+RIVER_FAR_EVERY = 4          # las lejanas se actualizan 1 de cada N ticks con el dt acumulado
+
+#rival de la CPU en P2: lookahead con presupuesto fijo por frame (la dificultad es el presupuesto)
+CPU_OPPONENT = False
+CPU_DIFFICULTY = "normal"
+CPU_BUDGETS_MS = {"easy": 0.25, "normal": 0.75, "hard": 2.0}
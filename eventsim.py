@@ -0,0 +1,826 @@
+import argparse
+import heapq
+import math
+import sys
+import time
+from bisect import bisect_left
+from itertools import accumulate
+
+import pygame
+
+import headless
+from constants import FPS, GAME_TIME_SECONDS, WIDTH
+
+
+#partidas headless por eventos: entre colisiones todo se mueve en forma cerrada (peces en x con
+#rebote, obstaculos y cebos en linea recta, botes hasta el borde). Una cola de prioridad guarda
+#rebotes, salidas de pantalla, spawns, el tiburon por quietud y las ventanas de ticks en que dos
+#cosas pueden tocarse; solo esos ticks se simulan. Las pruebas en si (rects, barrido de cebos,
+#orden de resolucion, random) son las del juego: mismo seed + politica = mismo resultado que
+#headless.play_match
+
+NEVER = 1 << 40
+
+#fases dentro de un tick, en el orden de update_playing
+SPAWN, BOAT, IDLE, MOVE, ARM = range(5)
+CATCH, SMASH, BITE = range(3)
+
+_timelines = {}
+
+
+def _timeline(seconds, fps):
+    #reloj de headless.frame_dt con las mismas sumas de float que update_playing; el ultimo
+    #indice es el tick del "Time's up!". Es igual para todas las partidas
+    key = (seconds, fps)
+    if key not in _timelines:
+        ms, elapsed, left, dts = [], [], [], []
+        total, e, t = 0, 0.0, seconds
+        while not left or left[-1] > 0:
+            dt = headless.frame_dt(len(ms), fps)
+            total += dt
+            e += dt / 1000.0
+            t -= dt / 1000.0
+            ms.append(total)
+            elapsed.append(e)
+            left.append(t)
+            dts.append(dt)
+        _timelines[key] = (ms, elapsed, left, dts)
+    return _timelines[key]
+
+
+def _step(v):
+    #cuanto mueve rect.x += v por tick (pygame redondea alejandose del cero); con .5 justo
+    #depende del signo de la posicion, esos se simulan tick a tick
+    if abs(v) * 2 % 2 == 1:
+        return None
+    return int(round(v))
+
+
+def _reach(pos, d, low, high):
+    #ticks que se mueve antes de quedar clampeado contra el borde
+    dist = high - pos if d > 0 else pos - low if d < 0 else 0
+    return -(-dist // abs(d)) if dist > 0 else 0
+
+
+def _ticks(c, v, low, high, first, last):
+    #ticks n de [first, last] con low <= c + v*n <= high; redondea hacia afuera (sobra un tick)
+    if v == 0:
+        return (first, last) if low <= c <= high else None
+    a, b = (low - c) / v, (high - c) / v
+    if v < 0:
+        a, b = b, a
+    first = max(first, math.floor(a))
+    last = min(last, math.ceil(b))
+    return (first, last) if first <= last else None
+
+
+def _window(pa, pb, rx, ry, start):
+    #primer y ultimo tick desde start en que los centros quedan a menos de rx, ry
+    first = last = None
+    for a0, a1, ax, ay, adx, ady, at in pa:
+        for b0, b1, bx, by, bdx, bdy, bt in pb:
+            span = _ticks(ax - adx * at - bx + bdx * bt, adx - bdx, -rx, rx, max(a0, b0, start), min(a1, b1))
+            if span:
+                span = _ticks(ay - ady * at - by + bdy * bt, ady - bdy, -ry, ry, *span)
+            if span:
+                first = span[0] if first is None else min(first, span[0])
+                last = span[1] if last is None else max(last, span[1])
+    return first, last
+
+
+def _frame_size(track, t):
+    if track.frame_ms is None:
+        return track.sizes[0]
+    return track.sizes[(int(t // track.frame_ms) + track.phase) % len(track.sizes)]
+
+
+def _newest(group):
+    return next(reversed(group.spritedict))
+
+
+def _seq(track):
+    return track.seq
+
+
+def _contact_order(contact):
+    return contact[0], contact[1]
+
+
+class _Track:
+    #pez u obstaculo: centro (x0 + dx*(n - t0), y0 + dy*(n - t0)) hasta su proximo evento
+
+    def __init__(self, sprite, seq, born, sizes, frame_ms, phase):
+        self.sprite = sprite
+        self.seq = seq
+        self.born = born  # tick en que se creo: su imagen es la de ese tick
+        self.sizes = sizes
+        self.frame_ms = frame_ms
+        self.phase = phase
+        self.x0, self.y0 = sprite.rect.center
+        self.dx = self.dy = 0
+        self.t0 = born
+        self.stepped = False
+        self.alive = True
+        self.version = 0
+        #extremos del clip: alcanzan para acotar rebotes, salidas y ventanas con cualquier frame
+        self.extent = (max(w - w // 2 for w, h in sizes), max(h - h // 2 for w, h in sizes))
+        self.widest = max(w for w, h in sizes)
+        self.smallest = (min(w for w, h in sizes), min(h for w, h in sizes))
+
+    def ext(self):
+        return self.extent
+
+    def center(self, n):
+        k = n - self.t0
+        return self.x0 + self.dx * k, self.y0 + self.dy * k
+
+    def pieces(self, start):
+        return ((start, NEVER, self.x0, self.y0, self.dx, self.dy, self.t0),)
+
+
+class _Lure:
+    #trayectoria exacta (mismas sumas de float que Lure.update) desde el tick del lance
+
+    def __init__(self, sprite, seq, cast, xs, ys, dies):
+        self.sprite = sprite
+        self.seq = seq
+        self.cast = cast
+        self.xs = xs
+        self.ys = ys
+        self.dies = dies  # ultimo tick en que barre (sale de pantalla o pesca)
+        self.version = 0
+
+    def ext(self):
+        w, h = self.sprite.rect.size
+        return w - w // 2, h - h // 2
+
+    def pieces(self, start):
+        vx, vy = self.sprite.velocity
+        return ((start, self.dies, self.xs[1], self.ys[1], vx, vy, self.cast),)
+
+
+class _Boat:
+    #tramo con las mismas teclas desde el tick s: lineal y clampeado contra los bordes
+
+    def __init__(self, sprite, seq, controls):
+        self.sprite = sprite
+        self.seq = seq
+        self.controls = controls
+        self.keys = tuple(controls.values())
+        self.held = (False,) * len(self.keys)
+        self.seg = (-1, sprite.rect.x, sprite.rect.y, 0, 0)
+        self.reach = (0, 0)
+        self.move_end = -1  # ultimo tick en que se mueve (con el tramo actual)
+        self.stepped_at = None
+        self.dead = False
+        self.version = 0
+
+    def _xy(self, n):
+        s, left, top, dx, dy = self.seg
+        if n == s:
+            return left, top
+        r = self.sprite.rect
+        b = self.sprite.bounds
+        return (min(max(left + dx * (n - s), b.left), b.right - r.width),
+                min(max(top + dy * (n - s), b.top), b.bottom - r.height))
+
+    def place(self, n):
+        #hundido queda donde esta (solo lo corren las mordidas)
+        if not self.dead:
+            self.sprite.rect.topleft = self._xy(n)
+
+    def ext(self):
+        w, h = self.sprite.rect.size
+        return w - w // 2, h - h // 2
+
+    def pieces(self, start):
+        r = self.sprite.rect
+        w2, h2 = r.width // 2, r.height // 2
+        s, left, top, dx, dy = self.seg
+        if self.dead:
+            return ((start, NEVER, r.centerx, r.centery, 0, 0, 0),)
+        kx, ky = self.reach
+        out = []
+        done = 0
+        for k in sorted({kx, ky}):
+            if k > done:
+                x, y = self._xy(s + done)
+                out.append((s + done, s + k, x + w2, y + h2, dx if kx > done else 0, dy if ky > done else 0, s + done))
+                done = k
+        x, y = self._xy(s + done)
+        out.append((s + done, NEVER, x + w2, y + h2, 0, 0, 0))
+        return out
+
+
+class EventSim:
+    def __init__(self, game, seed, policy):
+        self.game = game
+        self.policy = policy
+        self.keys = headless.start_match(game, seed)
+        self.ms, self.elapsed, self.left, dts = _timeline(GAME_TIME_SECONDS, FPS)
+        self.end = len(self.ms) - 1
+        self.anim0 = game.animator.time_ms
+        self.anim = list(accumulate(dts, initial=self.anim0))[1:]
+        self.steps = [dt * FPS / 1000 for dt in dts]
+        self.heap = []
+        self.count = 0
+        self.boats = [_Boat(game.player, 0, game.controls_p1), _Boat(game.player2, 1, game.controls_p2)]
+        self.seq = len(self.boats)
+        self.fish = {}
+        self.obstacles = {}
+        self.lures = {}
+        self.stepped = []
+        self.armed = {}
+        self.clip_sizes = {}
+        self.fish_tick = self.obstacle_tick = -1
+        self.spawn_version = 0
+        self.idle_version = 0
+        self.idle_at = None
+        self.frames = 0
+        self._plan_spawn()
+        self._plan_idle(0)
+
+    def _ms(self, n):
+        return self.ms[n] if n >= 0 else 0
+
+    def _push(self, n, phase, handler, obj, version):
+        if n <= self.end:
+            self.count += 1
+            heapq.heappush(self.heap, (n, phase, self.count, handler, obj, version))
+
+    def _sync(self, n):
+        game = self.game
+        game.virtual_ms = self.ms[n]
+        game.elapsed_s = self.elapsed[n]
+        game.time_left = self.left[n]
+        game.animator.time_ms = self.anim[n]
+
+    def run(self, max_frames=None):
+        game = self.game
+        keys = self.keys
+        act = self.policy.act
+        heap = self.heap
+        stop = max_frames is not None and max_frames <= self.end
+        limit = max_frames if stop else self.end
+        down = keys.down
+        last = set()
+        for n in range(limit):
+            #la politica se consulta cada frame; la simulacion solo en los ticks con algo
+            casts = act(game, n, keys)
+            if down != last:
+                last = set(down)
+                for boat in self.boats:
+                    held = tuple([keys[k] for k in boat.keys])
+                    if held != boat.held:
+                        boat.held = held
+                        if not boat.dead:
+                            self._push(n, BOAT, self._restep, boat, 0)
+            if (casts or self.armed or (heap and heap[0][0] == n)) and self._tick(n, casts):
+                return self.frames
+        self._settle(limit - 1)
+        if stop:
+            self.frames = limit
+            return limit
+        #tick del "Time's up!": los lances entran, el update corta antes de mover nada
+        casts = act(game, self.end, keys)
+        self._sync(self.end)
+        if casts:
+            game.handle_playing_events([pygame.event.Event(pygame.KEYDOWN, key=k) for k in casts])
+        game.time_left = 0
+        game.animator.time_ms = self.anim[self.end - 1] if self.end else self.anim0
+        game.trigger_game_over("Time's up!")
+        self.frames = self.end + 1
+        return self.frames
+
+    def _settle(self, n):
+        #deja el juego como lo dejaria el loop por ticks en el tick n
+        if n >= 0:
+            self._sync(n)
+            for boat in self.boats:
+                boat.place(n)
+            for track in list(self.fish.values()) + list(self.obstacles.values()):
+                self._place(track, n)
+
+    def _tick(self, n, casts):
+        game = self.game
+        self._sync(n)
+        if casts:
+            for boat in self.boats:
+                boat.place(n - 1)
+            before = len(game.lures)
+            game.handle_playing_events([pygame.event.Event(pygame.KEYDOWN, key=k) for k in casts])
+            for sprite in list(game.lures.spritedict)[before:]:
+                self._add_lure(sprite, n)
+
+        heap = self.heap
+        moved = False
+        while heap and heap[0][0] == n:
+            if heap[0][1] >= MOVE and not moved:
+                moved = True
+                self._step_all(n)
+            _, _, _, handler, obj, version = heapq.heappop(heap)
+            handler(obj, version, n)
+        if not moved:
+            self._step_all(n)
+
+        if self.armed and self._checks(n):
+            self._settle(n)
+            game.trigger_game_over("Both boats were wrecked!")
+            self.frames = n + 1
+            return True
+        return False
+
+    #spawns: el timer de update_playing resuelto con busqueda binaria sobre el reloj
+    def _due(self, last, start, low):
+        ramp = self.game.spawn_ramp
+        base = self._ms(last)
+        lo, hi = last + 1, self.end
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ms[mid] - base >= max(low, start - int(self.elapsed[mid] * ramp)):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _plan_spawn(self):
+        game = self.game
+        self.spawn_version += 1
+        due = min(self._due(self.fish_tick, game.fish_interval_start, game.fish_interval_min),
+                  self._due(self.obstacle_tick, game.obstacle_interval_start, game.obstacle_interval_min))
+        self._push(due, SPAWN, self._spawn, None, self.spawn_version)
+
+    def _spawn(self, _, version, n):
+        if version != self.spawn_version:
+            return
+        game = self.game
+        ramp = int(self.elapsed[n] * game.spawn_ramp)
+        game.fish_spawn_interval = max(game.fish_interval_min, game.fish_interval_start - ramp)
+        game.obstacle_spawn_interval = max(game.obstacle_interval_min, game.obstacle_interval_start - ramp)
+        fish, obstacles = len(game.fish_group), len(game.obstacles)
+        game.spawn_entities()
+        if len(game.fish_group) > fish:
+            self.fish_tick = n
+            self._add_fish(_newest(game.fish_group), n, n - 1)
+        if len(game.obstacles) > obstacles:
+            self.obstacle_tick = n
+            self._add_obstacle(_newest(game.obstacles), n)
+        self._plan_spawn()
+
+    #tiburon por quietud: sale delay ms despues del ultimo tick en que se movio algun bote
+    def _plan_idle(self, start):
+        self.idle_version += 1
+        quiet = max(boat.move_end for boat in self.boats)
+        if (self.idle_at is not None and self.idle_at >= quiet) or quiet >= self.end:
+            return
+        due = bisect_left(self.ms, self._ms(quiet) + self.game.idle_shark_delay_ms)
+        self._push(max(due, start), IDLE, self._idle, None, self.idle_version)
+
+    def _idle(self, _, version, n):
+        if version != self.idle_version:
+            return
+        game = self.game
+        for boat in self.boats:
+            boat.place(n)
+        before = len(game.obstacles)
+        game.spawn_idle_predator()
+        self.idle_at = n
+        if len(game.obstacles) > before:
+            self._add_obstacle(_newest(game.obstacles), n)
+
+    #botes: update real en cada cambio de teclas (o despues de una mordida), lineal en el medio
+    def _restep(self, boat, _, n):
+        if boat.dead or boat.stepped_at == n:
+            return
+        boat.stepped_at = n
+        sprite = boat.sprite
+        boat.place(n - 1)
+        prev = sprite.rect.center
+        sprite.update(self.keys, boat.controls)
+        moved = sprite.rect.center != prev
+
+        keys, controls, speed = self.keys, boat.controls, sprite.speed
+        dx = dy = 0
+        if keys[controls["left"]]:
+            dx = -speed
+        if keys[controls["right"]]:
+            dx = speed
+        if keys[controls["up"]]:
+            dy = -speed
+        if keys[controls["down"]]:
+            dy = speed
+        r, b = sprite.rect, sprite.bounds
+        boat.seg = (n, r.x, r.y, dx, dy)
+        boat.reach = (_reach(r.x, dx, b.left, b.right - r.width), _reach(r.y, dy, b.top, b.bottom - r.height))
+        last = min(boat.move_end, n - 1)
+        boat.move_end = n + max(boat.reach) if moved else last
+        boat.version += 1
+        self._boat_windows(boat, n)
+        self._plan_idle(n)
+
+    def _hurt(self, boat, n):
+        boat.sprite.take_damage(1)
+        if boat.sprite.is_sunk and not boat.dead:
+            boat.dead = True
+            boat.move_end = min(boat.move_end, n)
+            boat.version += 1
+            self._boat_windows(boat, n)
+            self._plan_idle(n + 1)
+
+    def _pushed(self, boat, n):
+        r = boat.sprite.rect
+        if boat.dead:
+            boat.version += 1
+            self._boat_windows(boat, n + 1)
+        else:
+            #hasta el update del tick siguiente queda donde lo dejo la mordida
+            boat.seg = (n, r.x, r.y, 0, 0)
+            boat.reach = (0, 0)
+            self._push(n + 1, BOAT, self._restep, boat, 0)
+
+    #peces, obstaculos y cebos
+    def _sizes(self, clip_id):
+        sizes = self.clip_sizes.get(clip_id)
+        if sizes is None:
+            clip = self.game.animator.clips[clip_id]
+            sizes = self.clip_sizes[clip_id] = (tuple(f.get_size() for f in clip.frames), clip.frame_ms)
+        return sizes
+
+    def _track(self, sprite, clip_id, n):
+        self.seq += 1
+        if clip_id is None:
+            return _Track(sprite, self.seq, n, (sprite.image.get_size(),), None, 0)
+        sizes, frame_ms = self._sizes(clip_id)
+        return _Track(sprite, self.seq, n, sizes, frame_ms, sprite.phase)
+
+    def _add_fish(self, sprite, n, t0):
+        #t0 = n - 1: sale del timer antes del update y se mueve en este mismo tick
+        track = self._track(sprite, sprite.base_clip, n)
+        track.t0 = t0
+        track.dx = _step(sprite.direction * sprite.speed)
+        self.fish[sprite] = track
+        if track.dx is None:
+            self._add_stepped(track)
+        else:
+            self._push(self._next_bounce(track, t0), MOVE, self._bounce, track, 0)
+        self._fish_windows(track, n)
+
+    def _add_obstacle(self, sprite, n):
+        track = self._track(sprite, sprite.clip, n)
+        track.t0 = n - 1
+        track.dx, track.dy = _step(sprite.vx), _step(sprite.vy)
+        self.obstacles[sprite] = track
+        if track.dx is None or track.dy is None:
+            self._add_stepped(track)
+        else:
+            self._push(self._next_cull(track, n - 1), MOVE, self._cull, track, 0)
+        self._obstacle_windows(track, n)
+
+    def _add_stepped(self, track):
+        track.stepped = True
+        self.stepped.append(track)
+
+    def _add_lure(self, sprite, n):
+        vx, vy = sprite.velocity
+        px, py = sprite.pos
+        r, b = sprite.rect, sprite.bounds
+        guess = []
+        if vx:
+            guess.append(((b.right + r.width - px) if vx > 0 else (px - b.left + r.width)) / abs(vx))
+        if vy:
+            guess.append(((b.bottom + r.height - py) if vy > 0 else (py - b.top + r.height)) / abs(vy))
+        count = int(min(guess)) + 3 if guess else self.end
+        while True:
+            steps = self.steps[n:n + count]
+            xs = list(accumulate([vx * s for s in steps], initial=px))
+            ys = list(accumulate([vy * s for s in steps], initial=py))
+            if self._outside(sprite, xs[-1], ys[-1]) or n + count > self.end:
+                break
+            count *= 2
+        dies = NEVER
+        if self._outside(sprite, xs[-1], ys[-1]):
+            lo, hi = 1, len(xs) - 1
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._outside(sprite, xs[mid], ys[mid]):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            dies = n + lo - 1
+        self.seq += 1
+        lure = _Lure(sprite, self.seq, n, xs, ys, dies)
+        self.lures[sprite] = lure
+        self._push(dies, MOVE, self._lure_out, lure, 0)
+        for track in self.fish.values():
+            self._catch_window(lure, track, n)
+
+    def _outside(self, sprite, x, y):
+        #la misma salida de pantalla que Lure.update
+        r = sprite.rect
+        r.center = (x, y)
+        b = sprite.bounds
+        return r.right < b.left or r.left > b.right or r.bottom < b.top or r.top > b.bottom
+
+    def _kill(self, track, table):
+        track.sprite.kill()
+        track.alive = False
+        track.version += 1
+        del table[track.sprite]
+        if track.stepped:
+            self.stepped.remove(track)
+
+    def _place(self, track, n):
+        if not track.stepped:
+            r = track.sprite.rect
+            r.size = _frame_size(track, self.anim[n])
+            r.center = track.center(n)
+
+    def _place_update(self, track, n):
+        #como queda el rect justo despues de update() en el tick n (imagen del tick anterior)
+        r = track.sprite.rect
+        r.size = _frame_size(track, self.anim[n] if n == track.born else self.anim[n - 1])
+        r.center = track.center(n)
+
+    def _next_bounce(self, track, after):
+        #primer tick en que el pez podria tocar un borde con el ancho mas grande de su clip
+        after = max(after, track.t0)
+        wide = track.widest
+        c = track.x0 - track.dx * track.t0
+        spans = (_ticks(c, track.dx, -NEVER, wide // 2 - 1, after + 1, NEVER),
+                 _ticks(c, track.dx, WIDTH - (wide - wide // 2) + 1, NEVER, after + 1, NEVER))
+        return min((span[0] for span in spans if span), default=NEVER)
+
+    def _bounce(self, track, version, n):
+        if version != track.version or not track.alive:
+            return
+        sprite = track.sprite
+        self._place_update(track, n)
+        if sprite.rect.left < 0 or sprite.rect.right > WIDTH:
+            sprite._bounce_x()
+            track.x0, track.t0 = sprite.rect.centerx, n
+            track.dx = _step(sprite.direction * sprite.speed)
+            track.version += 1
+            self._fish_windows(track, n)
+        self._push(self._next_bounce(track, n), MOVE, self._bounce, track, track.version)
+
+    def _next_cull(self, track, after):
+        #primer tick en que el obstaculo podria quedar fuera de bounds con su frame mas chico
+        after = max(after, track.t0)
+        b = track.sprite.bounds
+        w, h = track.smallest
+        cx = track.x0 - track.dx * track.t0
+        cy = track.y0 - track.dy * track.t0
+        spans = (_ticks(cx, track.dx, -NEVER, b.left - (w - w // 2) - 1, after + 1, NEVER),
+                 _ticks(cx, track.dx, b.right + w // 2 + 1, NEVER, after + 1, NEVER),
+                 _ticks(cy, track.dy, -NEVER, b.top - (h - h // 2) - 1, after + 1, NEVER),
+                 _ticks(cy, track.dy, b.bottom + h // 2 + 1, NEVER, after + 1, NEVER))
+        return min((span[0] for span in spans if span), default=NEVER)
+
+    def _cull(self, track, version, n):
+        if not track.alive:
+            return
+        self._place_update(track, n)
+        track.sprite._cull()
+        if track.sprite.alive():
+            self._push(self._next_cull(track, n), MOVE, self._cull, track, 0)
+        else:
+            self._kill(track, self.obstacles)
+
+    def _lure_out(self, lure, _, n):
+        if lure.dies == n:
+            lure.sprite.kill()
+            del self.lures[lure.sprite]
+
+    def _step_all(self, n):
+        #los de velocidad .5 justa: update real y el frame de animacion, como el loop por ticks
+        if not self.stepped:
+            return
+        dt = self.ms[n] - self._ms(n - 1)
+        for track in list(self.stepped):
+            sprite = track.sprite
+            sprite.update(dt)
+            if not sprite.alive():
+                self._kill(track, self.fish if sprite in self.fish else self.obstacles)
+            elif track.frame_ms is not None:
+                size = _frame_size(track, self.anim[n])
+                if size != sprite.rect.size:
+                    center = sprite.rect.center
+                    sprite.rect.size = size
+                    sprite.rect.center = center
+
+    #ventanas: tramo de ticks en que dos cosas pueden tocarse; dentro se prueba tick a tick
+    def _arm(self, kind, a, b, first, last, start):
+        key = (kind, a.seq, b.seq)
+        if first is None:
+            self.armed.pop(key, None)
+        elif first <= start:
+            self.armed[key] = (last, kind, a, b)
+        else:
+            self.armed.pop(key, None)
+            self._push(first, ARM, self._arm_event, (key, last, kind, a, b), (a.version, b.version))
+
+    def _arm_event(self, entry, version, n):
+        key, last, kind, a, b = entry
+        if version == (a.version, b.version):
+            self.armed[key] = (last, kind, a, b)
+
+    def _boat_window(self, kind, boat, track, start):
+        if track.stepped:
+            first, last = start, NEVER
+        else:
+            bx, by = boat.ext()
+            tx, ty = track.ext()
+            pad = boat.sprite.speed + 2
+            first, last = _window(boat.pieces(start), track.pieces(start), bx + tx + pad, by + ty + pad, start)
+        self._arm(kind, boat, track, first, last, start)
+
+    def _catch_window(self, lure, track, start):
+        if track.stepped:
+            first, last = start, lure.dies
+        else:
+            #el cebo barre su tramo del tick y su posicion lineal difiere en centesimas
+            vx, vy = lure.sprite.velocity
+            lx, ly = lure.ext()
+            tx, ty = track.ext()
+            first, last = _window(lure.pieces(start), track.pieces(start),
+                                  lx + tx + abs(vx) * 1.1 + 2, ly + ty + abs(vy) * 1.1 + 2, start)
+        self._arm(CATCH, lure, track, first, last, start)
+
+    def _fish_windows(self, track, start):
+        for lure in self.lures.values():
+            self._catch_window(lure, track, start)
+        if track.sprite.is_predator:
+            for boat in self.boats:
+                self._boat_window(BITE, boat, track, start)
+
+    def _obstacle_windows(self, track, start):
+        for boat in self.boats:
+            self._boat_window(SMASH, boat, track, start)
+
+    def _boat_windows(self, boat, start):
+        for track in self.obstacles.values():
+            self._boat_window(SMASH, boat, track, start)
+        for track in self.fish.values():
+            if track.sprite.is_predator:
+                self._boat_window(BITE, boat, track, start)
+
+    #pruebas exactas, en el orden de update_playing; True si se hundieron los dos botes
+    def _checks(self, n):
+        #los peces repuestos por una pesca ya entran en las mordidas de este tick
+        catches = self._armed(n, CATCH)
+        if catches:
+            self._catches(n, catches)
+        smashes = self._armed(n, SMASH)
+        if smashes:
+            self._smash(n, smashes)
+        bites = self._armed(n, BITE)
+        if bites:
+            self._bites(n, bites)
+        return all(boat.sprite.health <= 0 for boat in self.boats)
+
+    def _armed(self, n, wanted):
+        pairs = []
+        for key, (last, kind, a, b) in list(self.armed.items()):
+            if kind != wanted:
+                continue
+            if last < n or not b.alive or (kind == CATCH and a.dies < n):
+                del self.armed[key]
+            else:
+                pairs.append((a, b))
+        return pairs
+
+    def _catches(self, n, pairs):
+        #lure_catches con solo los peces que pueden estar en algun tramo
+        game = self.game
+        lures = sorted({lure for lure, track in pairs}, key=_seq)
+        fish = sorted({track for lure, track in pairs}, key=_seq)
+        for track in fish:
+            self._place(track, n)
+        game.fish_grid.rebuild([track.sprite for track in fish])
+        contacts = []
+        for order, lure in enumerate(lures):
+            sprite = lure.sprite
+            i = n - lure.cast
+            sprite.prev_pos = (lure.xs[i], lure.ys[i])
+            sprite.pos = (lure.xs[i + 1], lure.ys[i + 1])
+            sprite.rect.center = sprite.pos
+            w, h = sprite.rect.size
+            candidates = game.fish_grid.query_segment(sprite.prev_pos, sprite.pos, max(w, h) / 2)
+            for t, target in game.collider.sweep(sprite, sprite.prev_pos, sprite.pos, candidates):
+                contacts.append((t, order, lure, target))
+        if not contacts:
+            return
+        contacts.sort(key=_contact_order)
+        used = set()
+        caught = []
+        for t, order, lure, target in contacts:
+            if lure in used or target in used:
+                continue
+            used.add(lure)
+            used.add(target)
+            lure.sprite.kill()
+            lure.dies = n
+            self.lures.pop(lure.sprite, None)
+            track = self.fish[target]
+            self._kill(track, self.fish)
+            caught.append((target, lure.sprite))
+        for fish, lure in caught:
+            gained = 50 if fish.is_predator else 20
+            if lure.owner == "P2":
+                game.score_p2 += gained
+            else:
+                game.score += gained
+            self._add_fish(game.respawn_fish(), n, n)
+
+    def _smash(self, n, pairs):
+        hits = []
+        for boat in self.boats:
+            tracks = sorted({track for b, track in pairs if b is boat}, key=_seq)
+            hit = False
+            if tracks:
+                boat.place(n)
+            for track in tracks:
+                if track.alive:
+                    self._place(track, n)
+                    if self.game.collider(boat.sprite, track.sprite):
+                        self._kill(track, self.obstacles)
+                        hit = True
+            hits.append(hit)
+        for boat, hit in zip(self.boats, hits):
+            if hit:
+                self._hurt(boat, n)
+
+    def _bites(self, n, pairs):
+        armed = set(pairs)
+        tracks = sorted({track for boat, track in pairs}, key=_seq)
+        for boat in self.boats:
+            boat.place(n)
+        pushed = [False, False]
+        i = 0
+        while i < len(tracks):
+            track = tracks[i]
+            i += 1
+            self._place(track, n)
+            for index, boat in enumerate(self.boats):
+                if not (pushed[index] or (boat, track) in armed):
+                    continue
+                if self.game.collider(boat.sprite, track.sprite):
+                    self._hurt(boat, n)
+                    boat.sprite.rect.y += 15
+                    self._pushed(boat, n)
+                    if not any(pushed):
+                        #el bote se corrio: el resto de los depredadores se prueba contra el nuevo rect
+                        tracks[i:] = [t for t in self.fish.values() if t.sprite.is_predator and t.seq > track.seq]
+                    pushed[index] = True
+
+
+def supported(game, policy):
+    #lo que cubre el modelo cerrado; el resto (rio, cardumenes, CPU, masks...) va por ticks
+    return (type(policy) in headless.POLICIES.values() and not game.river and not game.schooling
+            and not game.cpu and not game.governor and not game.particles and not game.telemetry
+            and not game.latency and not game.collider.pixel_perfect and game.idle_shark_delay_ms > 0)
+
+
+def play_match(game, seed, policy, max_frames=None):
+    #mismo resultado que headless.play_match; si la config no esta cubierta, es esa misma
+    if not supported(game, policy):
+        return headless.play_match(game, seed, policy, max_frames)
+    sim = EventSim(game, seed, policy)
+    return headless.match_result(game, seed, sim.run(max_frames))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Event-driven headless matches, checked against the per-tick loop")
+    parser.add_argument("--matches", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", default="random", choices=sorted(headless.POLICIES))
+    args = parser.parse_args(argv)
+
+    template = headless.make_game()
+    #los dos lados se reusan partida tras partida y cada uno se compara contra la misma semilla en
+    #un fork limpio: asi tambien se ve si algo de la partida anterior cambia el resultado
+    by_tick, by_event = headless.fork_game(template), headless.fork_game(template)
+    tick_s = event_s = 0.0
+    mismatches = 0
+    for seed in range(args.seed, args.seed + args.matches):
+        policy = headless.POLICIES[args.policy]
+        fresh = headless.play_match(headless.fork_game(template), seed, policy(seed))
+        start = time.perf_counter()
+        expected = headless.play_match(by_tick, seed, policy(seed))
+        tick_s += time.perf_counter() - start
+        start = time.perf_counter()
+        got = play_match(by_event, seed, policy(seed))
+        event_s += time.perf_counter() - start
+        if expected != fresh or got != fresh:
+            mismatches += 1
+            pad = " " * (6 + len(str(seed)))
+            print(f"seed {seed}: fresh    {fresh}\n{pad}per-tick {expected}\n{pad}events   {got}")
+    n = args.matches
+    print(f"{n} matches ({args.policy}): per-tick {tick_s * 1000 / n:.1f} ms/match, "
+          f"events {event_s * 1000 / n:.1f} ms/match ({tick_s / event_s:.1f}x), "
+          f"{mismatches} mismatches against a fresh game")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
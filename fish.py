@@ -1,8 +1,11 @@
 import random
 import pygame
 
+from assets import solid_image
 from constants import (
     BASE_FISH_SPEED,
+    FPS,
+    SCHOOL_BOUNDS,
     HEIGHT,
     WIDTH,
     BLUE,
@@ -12,27 +15,29 @@ from constants import (
 
 #class peces 
 class Fish(pygame.sprite.Sprite):
+    school_bounds = SCHOOL_BOUNDS  # el modo rio lo cambia por el alto del mundo
 
-   #buscamos las imagenes
+   #buscamos los clips (animacion compartida, el pez solo guarda clip + phase)
     def __init__(self, x, y, is_predator=False,
-                 friendly_images=None, predator_images=None):
+                 friendly_clips=None, predator_clips=None, animator=None):
         
         super().__init__() #llama al init para iniciar sprites
         self.is_predator = is_predator
+        self.animator = animator
 
-        image_pool = predator_images if is_predator else friendly_images
+        clip_pool = predator_clips if is_predator else friendly_clips
         self.base_image = None
         self.alt_image = None
+        self.base_clip = self.alt_clip = self.clip = None
+        self.phase = 0
 
-    #escojemos img
-        if image_pool:
-            chosen = random.choice(image_pool)
-            self.base_image = chosen.copy()
-            self.alt_image = pygame.transform.flip(self.base_image, True, False) #imagen para cuando voltee
+    #escojemos clip
+        if clip_pool and animator:
+            self.base_clip = random.choice(clip_pool)
+            self.alt_clip = animator.flipped(self.base_clip) #clip para cuando voltee
+            self.phase = int(x) % len(animator.clips[self.base_clip].frames)
+            self.base_image = animator.frame(self.base_clip, self.phase)
         else:
-            self.base_image = pygame.Surface((40, 20), pygame.SRCALPHA)
-            self.alt_image = pygame.Surface((40, 20), pygame.SRCALPHA) #transparencia
-
             if is_predator:#shark
                 color1 = RED
                 color2 = (255, 100, 100)
@@ -40,11 +45,9 @@ class Fish(pygame.sprite.Sprite):
                 color1 = BLUE
                 color2 = (100, 150, 255)
 
-            self.base_image.fill(color1)
-            self.alt_image.fill(color2)
+            self.base_image = solid_image((40, 20), color1, pygame.SRCALPHA) #transparencia
+            self.alt_image = solid_image((40, 20), color2, pygame.SRCALPHA)
 
-        if self.alt_image is None:
-            self.alt_image = self.base_image
 
     #dirrecion, velocidad y pos
         self.image = self.base_image
@@ -54,10 +57,36 @@ class Fish(pygame.sprite.Sprite):
         self.direction = random.choice([-1, 1])
         self._apply_direction_image()
 
+        #modo endless: el pez desaparece al cumplir su tiempo de vida
+        self.age_ms = 0
+        self.lifetime_ms = None
+
+        #steering (cardumenes): velocidad 2D y posicion float; Schooling escribe vx, vy
+        self.steered = False
+        self.vx = float(self.direction * self.speed)
+        self.vy = 0.0
+        self.fx = float(self.rect.centerx)
+        self.fy = float(self.rect.centery)
+
+        #simulacion barata cuando esta lejos de la camara (modo rio)
+        self.far_dt = 0
+        self.far_slot = None
+
     def update(self, dt_ms):
+        self.age_ms += dt_ms
+        if self.lifetime_ms is not None and self.age_ms >= self.lifetime_ms:
+            self.kill()
+            return
+
+        if self.steered:
+            self._steered_move(dt_ms)
+            return
 
         self.rect.x += self.direction * self.speed
+        self._bounce_x()
+
     #moviminento de peces con rebote de screen
+    def _bounce_x(self):
         if self.rect.left < 0:
             self.rect.left = 0
             self.direction = 1
@@ -67,11 +96,59 @@ class Fish(pygame.sprite.Sprite):
             self.direction = -1
             self._apply_direction_image()
             
+    def _steered_move(self, dt_ms):
+        steps = dt_ms * FPS / 1000
+        self.fx += self.vx * steps
+        self.fy += self.vy * steps
+        #rebote contra los bordes del rio
+        left, top, right, bottom = self.school_bounds
+        half_w = self.rect.width / 2
+        half_h = self.rect.height / 2
+        if self.fx < left + half_w:
+            self.fx = left + half_w
+            self.vx = abs(self.vx)
+        elif self.fx > right - half_w:
+            self.fx = right - half_w
+            self.vx = -abs(self.vx)
+        if self.fy < top + half_h:
+            self.fy = top + half_h
+            self.vy = abs(self.vy)
+        elif self.fy > bottom - half_h:
+            self.fy = bottom - half_h
+            self.vy = -abs(self.vy)
+        self.rect.center = (self.fx, self.fy)
+
+        direction = 1 if self.vx >= 0 else -1
+        if direction != self.direction:
+            self.direction = direction
+            self._apply_direction_image()
+
+    def update_far(self, dt_ms):
+        #lejos de la camara: el mismo movimiento pero con el dt acumulado de varios ticks
+        self.age_ms += dt_ms
+        if self.lifetime_ms is not None and self.age_ms >= self.lifetime_ms:
+            self.kill()
+            return
+
+        if self.steered:
+            self._steered_move(dt_ms)
+            return
+
+        self.rect.x += round(self.direction * self.speed * dt_ms * FPS / 1000)
+        self._bounce_x()
+
     #que cambie la img a la pocicion que va el pez
     def _apply_direction_image(self):
-        prev_center = self.rect.center
-        if self.direction < 0 and self.alt_image:
+        if self.base_clip is not None:
+            self.clip = self.alt_clip if self.direction < 0 else self.base_clip
+            self.image = self.animator.frame(self.clip, self.phase)
+        elif self.direction < 0 and self.alt_image:
             self.image = self.alt_image
         else:
             self.image = self.base_image
-        self.rect = self.image.get_rect(center=prev_center)
+        #rect en el lugar, mismo centro (sin Rect nuevo)
+        size = self.image.get_size()
+        if size != self.rect.size:
+            center = self.rect.center
+            self.rect.size = size
+            self.rect.center = center
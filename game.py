@@ -1,17 +1,42 @@
 import math
+import os
 import random
+import time
 from pathlib import Path
 import pygame
-from assets import (load_image, load_music, load_sound,)
+from animation import AnimationClock, swim_cycle
+from assets import (load_font, load_image, load_music, load_sound, rotation_bucket, set_atlas, track_loaded,)
+from collision import Collider
+from spatial import UniformGrid
+from schooling import Schooling
+from governor import FrameGovernor
+from latency import FramePacer, LatencyTracer
+from leaderboard import Leaderboard
+from telemetry import TelemetryLog
+from memory import MemoryAccountant
+from startup import StartupProfiler
+from capture import FrameCapture
+from gcpolicy import AllocationCounter, GameplayGC, freeze_loaded
+from world import River
+from opponent import CpuOpponent
+from hotreload import HotReload
+import particles
+import atlas
 from constants import ( 
+    ATLAS_DIR,
+    ATLAS_ENABLED,
     BOAT_IMAGE_MAX_SIZE,
     BASE_OBSTACLE_SPEED,
     FISH_IMAGE_MAX_SIZE,
     FISH_SPAWN_INTERVAL,
+    FISH_SPAWN_MIN_INTERVAL,
     FPS,
     GAME_TIME_SECONDS,
     HEIGHT,
     OBSTACLE_SPAWN_INTERVAL,
+    OBSTACLE_SPAWN_MIN_INTERVAL,
+    PREDATOR_CHANCE,
+    SPAWN_RAMP_MS_PER_SECOND,
     RIVER_BLUE,
     STATE_GAME_OVER,
     STATE_MENU,
@@ -22,6 +47,61 @@ from constants import (
     RED,
     IDLE_SHARK_DELAY_MS,
     IDLE_SHARK_SPEED,
+    PIXEL_PERFECT_COLLISION,
+    ROTATION_BUCKET_DEGREES,
+    SHOW_COLLISION_STATS,
+    SPATIAL_CELL,
+    LATENCY_LATE_LATCH,
+    LATENCY_TRACE,
+    MEMORY_ACCOUNTING,
+    MEMORY_BUDGETS_MB,
+    MEMORY_SAMPLE_MS,
+    MEMORY_TRACEMALLOC,
+    REPORT_DIR,
+    LEADERBOARD_ENABLED,
+    LEADERBOARD_FILE,
+    TELEMETRY_DIR,
+    TELEMETRY_ENABLED,
+    TELEMETRY_MAX_BYTES,
+    GOVERNOR_ENABLED,
+    GOVERNOR_MAX_FISH,
+    GOVERNOR_MAX_OBSTACLES,
+    ENDLESS_FISH_LIFETIME_MS,
+    ENDLESS_MAX_FISH,
+    ENDLESS_MAX_OBSTACLES,
+    ENDLESS_OBSTACLE_LIFETIME_MS,
+    ENDLESS_RAMP_TAU_S,
+    FISH_FRAME_MS,
+    OBSTACLE_FRAME_MS,
+    PREDATOR_FRAME_MS,
+    PARTICLES_ENABLED,
+    PARTICLE_CAPACITY,
+    FONT_FILE,
+    STARTUP_PROFILE,
+    GC_GAMEPLAY_MODE,
+    HOT_RELOAD,
+    HOT_RELOAD_POLL_MS,
+    ALLOC_COUNTER,
+    MAX_HEALTH,
+    SCHOOLING_ENABLED,
+    SCHOOLING_NUMPY,
+    SCHOOL_RADIUS,
+    SCHOOL_SEPARATION,
+    SCHOOL_CHASE_RADIUS,
+    CAPTURE_DIR,
+    CAPTURE_ENABLED,
+    CAPTURE_EVERY,
+    CAPTURE_FORMAT,
+    CAPTURE_POOL,
+    RIVER_ENABLED,
+    RIVER_LENGTH_SCREENS,
+    RIVER_CHUNK_HEIGHT,
+    RIVER_NEAR_MARGIN,
+    RIVER_ACTIVE_SCREENS,
+    RIVER_FAR_EVERY,
+    CPU_OPPONENT,
+    CPU_DIFFICULTY,
+    CPU_BUDGETS_MS,
 )
 from boats import PlayerBoat
 from fish import Fish
@@ -51,59 +131,62 @@ def _load_sequence(base_path, names, **kwargs):
     return frames
 
 
-def _rotate_frames(frames, angle):
-    #rota los frames para cuando sale por otros angulos
-    if not frames:
-        return []
-    
-    return [pygame.transform.rotate(f, angle) for f in frames]
+def _contact_order(contact):
+    return contact[0], contact[1]
 
 
 class LuckyLuresGame:
-    def __init__(self):
-        pygame.init()
-        pygame.mixer.init()
-
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-
-        pygame.display.set_caption("Lucky Lures: River Rush") #hay que cambiarlo me thinks
+    def __init__(self, headless=False, startup=None, use_atlas=ATLAS_ENABLED):
+        #headless: sin ventana ni audio (simulacion en otro proceso, servidores, etc.)
+        self.headless = headless
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        #solo los subsistemas que se usan; el mixer se abre despues del primer frame (start_audio)
+        self.startup = startup if startup else StartupProfiler()
+        with self.startup.phase("sdl_init"):
+            pygame.display.init()
+            pygame.font.init()
+
+        with self.startup.phase("set_mode"):
+            self.screen = pygame.display.get_surface() if headless else None
+            if self.screen is None:
+                self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+            pygame.display.set_caption("Lucky Lures: River Rush") #hay que cambiarlo me thinks
 
         self.clock = pygame.time.Clock()
-
-        #font sizes
-        self.font_big = pygame.font.SysFont("arial", 48)
-        self.font_med = pygame.font.SysFont("arial", 28)
-        self.font_small = pygame.font.SysFont("arial", 20)
+        self.pacer = FramePacer(self.clock, FPS, late_latch=LATENCY_LATE_LATCH, watch_input=LATENCY_TRACE)
+        self.latency = LatencyTracer() if LATENCY_TRACE else None
 
         base_path = Path(__file__).resolve().parent #consigue la carpeta parent para cargar asssets
         assets_dir = base_path / "assets"
+        self.base_path = base_path
 
-        self.splash_snd = load_sound(str(assets_dir / "splash.wav"))
-        self.hit_snd = load_sound(str(assets_dir / "hit.wav"))
+        #font sizes (archivo de font directo, sin escanear las fonts del sistema)
+        with self.startup.phase("fonts"):
+            self.font_big = load_font(str(base_path / FONT_FILE), 48)
+            self.font_med = load_font(str(base_path / FONT_FILE), 28)
+            self.font_small = load_font(str(base_path / FONT_FILE), 20)
 
-        #sound for game over
+        #audio: se carga en start_audio
+        self.splash_snd = None
+        self.hit_snd = None
         self.game_over_snd = None
-        for candidate in (
-            "game-over-deep-male-voice-clip-352695.mp3",
-            
-        ):
-            self.game_over_snd = load_sound(str(assets_dir / candidate))
-            if self.game_over_snd:
-                break
-
-        music_loaded = False #por defalut, se cambia a true si no hay error al cargarla
-
-        mp3_candidate = next((p for p in assets_dir.glob("*.mp3")), None)
-
-        if mp3_candidate:
-            music_loaded = load_music(str(mp3_candidate))
-        if not music_loaded:
-            music_loaded = load_music(str(assets_dir / "river_theme.ogg"))
-        if music_loaded:
-            pygame.mixer.music.set_volume(0.45)
-            pygame.mixer.music.play(-1)
-        self.music_loaded = music_loaded
-
+        self.music_loaded = False
+        self.audio_started = False
+        self.first_paint_done = False
+
+        #sprites como subsurfaces del atlas; sin atlas cada imagen sale de su archivo
+        if use_atlas:
+            with self.startup.phase("atlas"):
+                set_atlas(atlas.load(str(base_path / ATLAS_DIR), base_path))
+        #recarga en caliente: se anota cada imagen cargada para poder reemplazarla
+        hot_reload = HOT_RELOAD and not headless
+        if hot_reload:
+            track_loaded()
+
+        assets_start = time.perf_counter()
         
         self.bg_image = _load_first_image(
             base_path,
@@ -248,6 +331,7 @@ class LuckyLuresGame:
             colorkey=(255, 255, 255),
         )
         self.predator_fish_images.extend(predator_frames)
+        self.predator_swim_frames = predator_frames
 
 
         #puse esto por si las moscas, si añadimos luego mas predators
@@ -295,6 +379,22 @@ class LuckyLuresGame:
             colorkey=(255, 255, 255),
         )
 
+        #clips de animacion compartidos por todas las entidades
+        self.animator = AnimationClock()
+        self.obstacle_clip = self.animator.add("shark_swim", self.obstacle_frames, OBSTACLE_FRAME_MS)
+        self.friendly_fish_clips = [
+            self.animator.add(f"fish_{i}", swim_cycle(img), FISH_FRAME_MS)
+            for i, img in enumerate(self.friendly_fish_images)
+        ]
+        self.predator_fish_clips = []
+        if self.predator_swim_frames:
+            self.predator_fish_clips.append(
+                self.animator.add("predator_swim", self.predator_swim_frames, PREDATOR_FRAME_MS))
+        for i, img in enumerate(self.predator_fish_images):
+            if img not in self.predator_swim_frames:
+                self.predator_fish_clips.append(
+                    self.animator.add(f"predator_{i}", swim_cycle(img), FISH_FRAME_MS))
+        self.startup.add("assets", assets_start)
 
         #base
         self.state = STATE_MENU
@@ -318,11 +418,87 @@ class LuckyLuresGame:
 
         self.player = None
         self.player2 = None
-        self.last_player_move_time = pygame.time.get_ticks()
+        #reloj virtual (ms) para partidas headless; None = reloj de pygame
+        self.virtual_ms = None
+
+        #dificultad: se copian de constants para poder variarlas por partida (sweeps)
+        self.fish_interval_start = FISH_SPAWN_INTERVAL
+        self.fish_interval_min = FISH_SPAWN_MIN_INTERVAL
+        self.obstacle_interval_start = OBSTACLE_SPAWN_INTERVAL
+        self.obstacle_interval_min = OBSTACLE_SPAWN_MIN_INTERVAL
+        self.spawn_ramp = SPAWN_RAMP_MS_PER_SECOND
+        self.predator_chance = PREDATOR_CHANCE
+        self.obstacle_speed = BASE_OBSTACLE_SPEED
+        self.idle_shark_delay_ms = IDLE_SHARK_DELAY_MS
+        self.idle_shark_speed = IDLE_SHARK_SPEED
+
+        self.endless = False
+        self.elapsed_s = 0.0
+        self.fish_lifetime_ms = ENDLESS_FISH_LIFETIME_MS
+        self.obstacle_lifetime_ms = ENDLESS_OBSTACLE_LIFETIME_MS
+        self.endless_max_fish = ENDLESS_MAX_FISH
+        self.endless_max_obstacles = ENDLESS_MAX_OBSTACLES
+        self.endless_ramp_tau = ENDLESS_RAMP_TAU_S
+
+        self.last_player_move_time = self.ticks()
         self.idle_threat_triggered = False
 
         self.time_left = GAME_TIME_SECONDS
 
+        self.collider = Collider(pixel_perfect=PIXEL_PERFECT_COLLISION)
+        self.fish_grid = UniformGrid(SPATIAL_CELL)
+        self.schooling = None
+        if SCHOOLING_ENABLED:
+            self.schooling = Schooling(SCHOOL_RADIUS, SCHOOL_SEPARATION, SCHOOL_CHASE_RADIUS,
+                                       use_numpy=SCHOOLING_NUMPY)
+        #buffers del frame de juego, se vacian y se reusan
+        self._moving_lures = []
+        self._contacts = []
+        self._sweep_hits = []
+        self._caught = []
+        self._used = set()
+
+        #se calienta el cache al arrancar para que game over nunca espere al disco
+        self.leaderboard = None
+        if LEADERBOARD_ENABLED and not headless:
+            self.leaderboard = Leaderboard(str(base_path / LEADERBOARD_FILE))
+        self.match_seed = None
+
+        self.telemetry = None
+        if TELEMETRY_ENABLED:
+            self.telemetry = TelemetryLog(str(base_path / TELEMETRY_DIR), max_bytes=TELEMETRY_MAX_BYTES)
+
+        self.governor = None
+        if GOVERNOR_ENABLED and not headless:
+            self.governor = FrameGovernor(1000.0 / FPS, max_fish=GOVERNOR_MAX_FISH,
+                                          max_obstacles=GOVERNOR_MAX_OBSTACLES)
+
+        self.memory = None
+        if MEMORY_ACCOUNTING:
+            self.memory = MemoryAccountant(self, sample_ms=MEMORY_SAMPLE_MS,
+                                           budgets_mb=MEMORY_BUDGETS_MB,
+                                           report_dir=str(base_path / REPORT_DIR),
+                                           use_tracemalloc=MEMORY_TRACEMALLOC)
+
+        #grabacion de la partida (escritor en otro proceso, descarta frames si se atrasa)
+        self.capture = None
+        if CAPTURE_ENABLED and not headless:
+            self.capture = FrameCapture(str(base_path / CAPTURE_DIR), self.screen, fmt=CAPTURE_FORMAT,
+                                        pool=CAPTURE_POOL, every=CAPTURE_EVERY)
+
+        #rio largo: camara, fondo por chunks y entidades lejanas con update reducido
+        self.river = None
+        if RIVER_ENABLED:
+            self.river = River(RIVER_LENGTH_SCREENS, (WIDTH, HEIGHT), chunk_h=RIVER_CHUNK_HEIGHT,
+                               near_margin=RIVER_NEAR_MARGIN, active_screens=RIVER_ACTIVE_SCREENS,
+                               far_every=RIVER_FAR_EVERY, bg_image=self.bg_image)
+
+        #splashes, estelas y golpes; headless no dibuja asi que no las crea
+        self.particles = None
+        if PARTICLES_ENABLED and particles.available() and not headless:
+            bounds = tuple(self.river.world) if self.river else (0, 0, WIDTH, HEIGHT)
+            self.particles = particles.ParticleSystem(PARTICLE_CAPACITY, bounds=bounds)
+
     #controlers p1 y p2
         self.controls_p1 = {
             "up": pygame.K_w,
@@ -339,30 +515,134 @@ class LuckyLuresGame:
             "right": pygame.K_RIGHT,
         }
 
-    def reset_game(self):
+        #que teclas sigue el tracer de latencia
+        self.input_kinds = {
+            pygame.K_SPACE: ("cast", "P1"),
+            pygame.K_RSHIFT: ("cast", "P2"),
+            pygame.K_RETURN: ("cast", "P2"),
+        }
+        for controls, owner in ((self.controls_p1, "P1"), (self.controls_p2, "P2")):
+            for key in controls.values():
+                self.input_kinds[key] = ("move", owner)
+
+        #P2 manejado por la CPU (ignora controls_p2 y el lanzamiento de P2 del teclado)
+        self.cpu = None
+        if CPU_OPPONENT:
+            #spawn_zone: la misma zona de spawn_entities, el rival evita quedarse donde aparecen peces
+            self.cpu = CpuOpponent(self.controls_p2, budget_ms=CPU_BUDGETS_MS[CPU_DIFFICULTY],
+                                   spawn_zone=(50, 80, WIDTH - 50, HEIGHT - 250))
+
+        #HUD: textos cacheados por valor y cuadritos de vida prearmados
+        self._hud_cache = {}
+        self._hp_rects = (
+            [pygame.Rect(10 + i * 18, 35, 15, 15) for i in range(MAX_HEALTH)],
+            [pygame.Rect(WIDTH - 25 - i * 18, 35, 15, 15) for i in range(MAX_HEALTH)],
+        )
+
+        #gc: assets congelados, gc ciclico apagado mientras se juega
+        self.gc_policy = GameplayGC(GC_GAMEPLAY_MODE)
+        self.allocs = AllocationCounter() if ALLOC_COUNTER else None
+        if GC_GAMEPLAY_MODE:
+            freeze_loaded()
+
+        #constants.py y assets/ se miran entre frames (run)
+        self.hot_reload = HotReload(self, HOT_RELOAD_POLL_MS) if hot_reload else None
+
+    def start_audio(self):
+        #mixer, sonidos y musica; se llama despues del primer frame para no retrasar la ventana
+        if self.audio_started or self.headless:
+            return
+        self.audio_started = True
+        with self.startup.phase("audio"):
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                return
+            assets_dir = self.base_path / "assets"
+
+            self.splash_snd = load_sound(str(assets_dir / "splash.wav"))
+            self.hit_snd = load_sound(str(assets_dir / "hit.wav"))
+
+            #sound for game over
+            for candidate in (
+                "game-over-deep-male-voice-clip-352695.mp3",
+
+            ):
+                self.game_over_snd = load_sound(str(assets_dir / candidate))
+                if self.game_over_snd:
+                    break
+
+            music_loaded = False #por defalut, se cambia a true si no hay error al cargarla
+
+            mp3_candidate = next((p for p in assets_dir.glob("*.mp3")), None)
+
+            if mp3_candidate:
+                music_loaded = load_music(str(mp3_candidate))
+            if not music_loaded:
+                music_loaded = load_music(str(assets_dir / "river_theme.ogg"))
+            if music_loaded:
+                pygame.mixer.music.set_volume(0.45)
+                pygame.mixer.music.play(-1)
+            self.music_loaded = music_loaded
+
+    def after_first_paint(self):
+        self.first_paint_done = True
+        self.startup.first_frame()
+        self.start_audio()
+        if STARTUP_PROFILE:
+            print(self.startup.report())
+            self.startup.write(str(self.base_path / REPORT_DIR / "startup.jsonl"))
+
+    def ticks(self):
+        if self.virtual_ms is not None:
+            return self.virtual_ms
+        return pygame.time.get_ticks()
+
+    def reset_game(self, seed=None, endless=False):
 
 
         self.all_sprites.empty()
         self.fish_group.empty()
         self.obstacles.empty()
         self.lures.empty()
-
-        self.player = PlayerBoat(WIDTH // 2 - 100, HEIGHT - 100, sprite_image=self.boat_image, sunken_image=self.sunken_image, name="P1")
-        self.player2 = PlayerBoat(WIDTH // 2 + 100, HEIGHT - 100, sprite_image=self.boat_image, sunken_image=self.sunken_image, name="P2")
+        if self.particles:
+            self.particles.clear()
+        if self.cpu:
+            self.cpu.reset()
+        #reloj de animacion desde cero: los frames (y el tamano de los rects) de cada pez
+        #dependen de el, con la misma semilla tiene que salir la misma partida
+        self.animator.time_ms = 0.0
+
+        #en modo rio se arranca al fondo del mundo (rio abajo)
+        if self.river:
+            self.river.reset()
+        oy = self.spawn_y()
+        self.player = PlayerBoat(WIDTH // 2 - 100, HEIGHT - 100 + oy, sprite_image=self.boat_image, sunken_image=self.sunken_image, name="P1")
+        self.player2 = PlayerBoat(WIDTH // 2 + 100, HEIGHT - 100 + oy, sprite_image=self.boat_image, sunken_image=self.sunken_image, name="P2")
         self.all_sprites.add(self.player, self.player2)
+        if self.river:
+            self.player.bounds = self.player2.bounds = self.river.camera.view
+            self.river.follow((self.player, self.player2), snap=True)
 
         self.score = 0
         self.score_p2 = 0
 
         self.time_left = GAME_TIME_SECONDS
+        self.elapsed_s = 0.0
+        self.endless = endless
         self.game_over_reason = ""
 
-        current_time = pygame.time.get_ticks()
+        #semilla por partida, se guarda con el resultado
+        self.match_seed = random.randrange(1 << 31) if seed is None else seed
+        random.seed(self.match_seed)
+        self.emit("match_start")
+
+        current_time = self.ticks()
 
         self.last_fish_spawn = current_time
         self.last_obstacle_spawn = current_time
-        self.fish_spawn_interval = FISH_SPAWN_INTERVAL
-        self.obstacle_spawn_interval = OBSTACLE_SPAWN_INTERVAL
+        self.fish_spawn_interval = self.fish_interval_start
+        self.obstacle_spawn_interval = self.obstacle_interval_start
         self.last_player_move_time = current_time
 
         self.idle_threat_triggered = False
@@ -377,19 +657,37 @@ class LuckyLuresGame:
 
         self.game_over_reason = reason
         self.state = STATE_GAME_OVER
+        self.record_match()
 
-        pygame.mixer.music.stop()
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
         if self.game_over_snd:
             self.game_over_snd.play()
 
+    def emit(self, kind, **fields):
+        #evento de telemetria con tiempo relativo al inicio de la partida
+        if self.telemetry:
+            elapsed_ms = self.elapsed_s * 1000
+            self.telemetry.emit(kind, elapsed_ms, self.match_seed, **fields)
+
+    def record_match(self):
+        self.emit("match_end", reason=self.game_over_reason,
+                  duration_s=round(self.elapsed_s, 2), endless=self.endless,
+                  scores={"P1": self.score, "P2": self.score_p2})
+        if not self.leaderboard:
+            return
+        self.leaderboard.record_match({"P1": self.score, "P2": self.score_p2},
+                                      self.elapsed_s,
+                                      self.game_over_reason, self.match_seed)
+
     def handle_menu_events(self, events):
 
         for event in events:
             if event.type == pygame.QUIT:
                 return False
             
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
-                self.reset_game()
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_e):
+                self.reset_game(endless=event.key == pygame.K_e)
                 self.state = STATE_PLAYING
         return True
     
@@ -405,39 +703,43 @@ class LuckyLuresGame:
                 if event.key == pygame.K_ESCAPE or event.key == pygame.K_p:
                     self.state = STATE_PAUSED
 
-                    #reeling keys
+                    #reeling keys (sale hacia donde se movio el bote, diagonales incluidas)
                 if event.key == pygame.K_SPACE and self.player and self.player.health > 0:
-                    if sum(1 for l in self.lures if l.owner == "P1") < 3:
-
-
-                        lure = Lure(self.player.rect.centerx,
-                                    self.player.rect.centery,
-                                    self.player.direction,
-                                    sprite_image=self.lure_image,
-                                    owner="P1")
-                        
-                        self.all_sprites.add(lure)
-                        self.lures.add(lure)
-
-                        if self.splash_snd:
-                            self.splash_snd.play()
+                    self.cast_lure(self.player, "P1", self.player.heading)
                 #multiple casting
-                if event.key in (pygame.K_RSHIFT, pygame.K_RETURN) and self.player2 and self.player2.health > 0:
-                    if sum(1 for l in self.lures if l.owner == "P2") < 3:
-
-                        lure = Lure(self.player2.rect.centerx,
-                                    self.player2.rect.centery,
-                                    self.player2.direction,
-                                    sprite_image=self.lure_image,
-                                    owner="P2")
-                        
-                        self.all_sprites.add(lure)
-                        self.lures.add(lure)
-
-                        if self.splash_snd:
-                            self.splash_snd.play()
+                if (event.key in (pygame.K_RSHIFT, pygame.K_RETURN) and self.player2 and self.player2.health > 0
+                        and not self.cpu):
+                    self.cast_lure(self.player2, "P2", self.player2.heading)
+
+            #click: P1 apunta el cebo al mouse
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.player and self.player.health > 0:
+                aim = (event.pos[0] - self.player.rect.centerx, event.pos[1] - self.player.rect.centery)
+                if aim != (0, 0):
+                    self.cast_lure(self.player, "P1", aim)
         return True
 
+    def cast_lure(self, boat, owner, direction):
+        if sum(1 for l in self.lures if l.owner == owner) >= 3:
+            return
+        lure = Lure(boat.rect.centerx,
+                    boat.rect.centery,
+                    direction,
+                    sprite_image=self.lure_image,
+                    owner=owner)
+        if self.river:
+            lure.bounds = self.river.camera.view
+
+        self.all_sprites.add(lure)
+        self.lures.add(lure)
+        if self.latency:
+            self.latency.effect("cast", owner)
+        angle = round(math.degrees(math.atan2(lure.velocity[1], lure.velocity[0])))
+        self.emit("cast", owner=owner, dir=boat.direction, angle=angle)
+        self.burst("splash", boat.rect.center)
+
+        if self.splash_snd:
+            self.splash_snd.play()
+
     def handle_paused_events(self, events):
         for event in events:
 
@@ -464,109 +766,186 @@ class LuckyLuresGame:
         pass
 
 
+    def spawn_y(self):
+        #los spawns se calculan en coordenadas de pantalla; en modo rio se corren a la vista
+        return self.river.spawn_offset() if self.river else 0
+
     def spawn_entities(self):
-        now = pygame.time.get_ticks()
+        now = self.ticks()
+        oy = self.spawn_y()
 
-        if now - self.last_fish_spawn >= self.fish_spawn_interval:
+        #con spawn_cap se difiere el spawn (sin mover el timer) hasta que haya lugar
+        if (now - self.last_fish_spawn >= self.fish_spawn_interval and
+                self._spawn_room(len(self.fish_group), self.endless_max_fish, "max_fish")):
             self.last_fish_spawn = now
-            y = random.randint(80, HEIGHT - 250)
+            y = random.randint(80, HEIGHT - 250) + oy
             x = random.randint(50, WIDTH - 50)
 
-            is_predator = random.random() < 0.3
+            is_predator = random.random() < self.predator_chance
 
             fish = Fish(x, y, is_predator,
-                        friendly_images=self.friendly_fish_images,
-                        predator_images=self.predator_fish_images)
+                        friendly_clips=self.friendly_fish_clips,
+                        predator_clips=self.predator_fish_clips,
+                        animator=self.animator)
             
-            self.all_sprites.add(fish)
-            self.fish_group.add(fish)
+            self.add_fish(fish)
 
-        if now - self.last_obstacle_spawn >= self.obstacle_spawn_interval:
+        if (now - self.last_obstacle_spawn >= self.obstacle_spawn_interval and
+                self._spawn_room(len(self.obstacles), self.endless_max_obstacles, "max_obstacles")):
             self.last_obstacle_spawn = now
             #desoues de 30 segundos, tiburones vienen de cualquier lado
 
 
-            if self.time_left <= GAME_TIME_SECONDS / 2 and self.obstacle_frames:
+            if self.elapsed_s >= GAME_TIME_SECONDS / 2 and self.obstacle_clip is not None:
 
                 direction = random.choice(["UP", "DOWN", "LEFT", "RIGHT"])
                 if direction == "DOWN":
                     x = random.randint(40, WIDTH - 40)
-                    frames = _rotate_frames(self.obstacle_frames, 0)
-                    obstacle = Obstacle(x, -20, frames=frames, velocity=(0, BASE_OBSTACLE_SPEED + random.uniform(-1, 2)))
+                    clip = self.shark_clip(0)
+                    obstacle = Obstacle(x, -20 + oy, clip=clip, animator=self.animator, velocity=(0, self.obstacle_speed + random.uniform(-1, 2)))
                 
                 elif direction == "UP":
                     x = random.randint(40, WIDTH - 40)
-                    frames = _rotate_frames(self.obstacle_frames, 180)
-                    obstacle = Obstacle(x, HEIGHT + 20, frames=frames, velocity=(0, -(BASE_OBSTACLE_SPEED + random.uniform(-1, 2))))
+                    clip = self.shark_clip(180)
+                    obstacle = Obstacle(x, HEIGHT + 20 + oy, clip=clip, animator=self.animator, velocity=(0, -(self.obstacle_speed + random.uniform(-1, 2))))
                 
                 elif direction == "LEFT":
-                    y = random.randint(40, HEIGHT - 40)
-                    frames = _rotate_frames(self.obstacle_frames, -90)
-                    obstacle = Obstacle(WIDTH + 20, y, frames=frames, velocity=(-(BASE_OBSTACLE_SPEED + random.uniform(-1, 2)), 0))
+                    y = random.randint(40, HEIGHT - 40) + oy
+                    clip = self.shark_clip(-90)
+                    obstacle = Obstacle(WIDTH + 20, y, clip=clip, animator=self.animator, velocity=(-(self.obstacle_speed + random.uniform(-1, 2)), 0))
                 
                 else:  # RIGHT
-                    y = random.randint(40, HEIGHT - 40)
-                    frames = _rotate_frames(self.obstacle_frames, 90)
-                    obstacle = Obstacle(-20, y, frames=frames, velocity=((BASE_OBSTACLE_SPEED + random.uniform(-1, 2)), 0))
+                    y = random.randint(40, HEIGHT - 40) + oy
+                    clip = self.shark_clip(90)
+                    obstacle = Obstacle(-20, y, clip=clip, animator=self.animator, velocity=((self.obstacle_speed + random.uniform(-1, 2)), 0))
             else:
 
                 x = random.randint(40, WIDTH - 40)
-                obstacle = Obstacle(x, -20, frames=self.obstacle_frames)
-
+                obstacle = Obstacle(x, -20 + oy, clip=self.obstacle_clip, speed=self.obstacle_speed,
+                                    animator=self.animator)
+
+
+            self.add_obstacle(obstacle)
+
+    def respawn_fish(self):
+        #cada pez pescado se repone con uno nuevo en la zona de spawn
+        x = random.randint(50, WIDTH - 50)
+        y = random.randint(80, HEIGHT - 250) + self.spawn_y()
+
+        fish = Fish(x, y, random.random() < self.predator_chance,
+                    friendly_clips=self.friendly_fish_clips,
+                    predator_clips=self.predator_fish_clips,
+                    animator=self.animator)
+        self.add_fish(fish)
+        return fish
+
+    def shark_clip(self, angle):
+        #clip del tiburon rotado para cuando sale por otros angulos (cacheado por bucket)
+        if self.obstacle_clip is None:
+            return None
+        angle = rotation_bucket(angle, ROTATION_BUCKET_DEGREES)
+        if angle == 0:
+            return self.obstacle_clip
+        return self.animator.rotated(self.obstacle_clip, angle)
+
+    def add_fish(self, fish):
+        if self.endless:
+            fish.lifetime_ms = self.fish_lifetime_ms
+        fish.steered = self.schooling is not None
+        if self.river:
+            fish.school_bounds = self.river.school_bounds
+        self.all_sprites.add(fish)
+        self.fish_group.add(fish)
+
+    def add_obstacle(self, obstacle):
+        if self.endless:
+            obstacle.lifetime_ms = self.obstacle_lifetime_ms
+        if self.river:
+            obstacle.bounds = self.river.regions.active
+        self.all_sprites.add(obstacle)
+        self.obstacles.add(obstacle)
 
-            self.all_sprites.add(obstacle)
-            self.obstacles.add(obstacle)
+    def _spawn_room(self, live, endless_cap, governor_cap):
+        #se difiere el spawn (sin mover el timer) si hay tope de poblacion
+        if self.endless and live >= endless_cap:
+            return False
+        if self.governor and not self.governor.spawn_allowed(live, getattr(self.governor, governor_cap)):
+            return False
+        return True
 
     #funcion que previene que el jugador se quede quieto
     def spawn_idle_predator(self):
-        alive_players = [p for p in (self.player, self.player2) if p and p.health > 0]
-        if not alive_players:
+        p1_alive = bool(self.player and self.player.health > 0)
+        p2_alive = bool(self.player2 and self.player2.health > 0)
+        if not (p1_alive or p2_alive):
             return
 
-        target = random.choice(alive_players)
-        player_pos = pygame.math.Vector2(target.rect.center)
+        #mismo consumo de random que random.choice sobre los vivos
+        if p1_alive and p2_alive:
+            target = self.player2 if random.randrange(2) else self.player
+        else:
+            random.randrange(1)
+            target = self.player if p1_alive else self.player2
+        px, py = target.rect.center
 
         #de donde vendra el ataque
         side = random.choice(("TOP", "BOTTOM", "LEFT", "RIGHT"))
 
         if side == "TOP":
-            spawn_pos = pygame.math.Vector2(random.randint(40, WIDTH - 40), -60)
+            sx, sy = random.randint(40, WIDTH - 40), -60
         elif side == "BOTTOM":
-            spawn_pos = pygame.math.Vector2(random.randint(40, WIDTH - 40), HEIGHT + 60)
+            sx, sy = random.randint(40, WIDTH - 40), HEIGHT + 60
         elif side == "LEFT":
-            spawn_pos = pygame.math.Vector2(-60, random.randint(40, HEIGHT - 40))
+            sx, sy = -60, random.randint(40, HEIGHT - 40)
         else:  #derecha
-            spawn_pos = pygame.math.Vector2(WIDTH + 60, random.randint(40, HEIGHT - 40))
-
-        direction = player_pos - spawn_pos
+            sx, sy = WIDTH + 60, random.randint(40, HEIGHT - 40)
+        sy += self.spawn_y()
 
-        if direction.length() == 0:
-            direction = pygame.math.Vector2(0, 1)
+        dx, dy = px - sx, py - sy
+        length = math.hypot(dx, dy)
+        if length == 0:
+            dx, dy, length = 0, 1, 1
 
-        velocity = direction.normalize() * IDLE_SHARK_SPEED #veloz
-        angle = math.degrees(math.atan2(velocity.x, velocity.y))
-        frames = _rotate_frames(self.obstacle_frames, angle)
+        vx = dx / length * self.idle_shark_speed #veloz
+        vy = dy / length * self.idle_shark_speed
+        angle = math.degrees(math.atan2(vx, vy))
+        clip = self.shark_clip(angle)
 
-        obstacle = Obstacle(int(spawn_pos.x), int(spawn_pos.y),
-                            frames=frames, velocity=(velocity.x, velocity.y))
+        obstacle = Obstacle(sx, sy, clip=clip, animator=self.animator, velocity=(vx, vy))
         
-        self.all_sprites.add(obstacle)
-        self.obstacles.add(obstacle)
+        self.add_obstacle(obstacle)
+        self.emit("idle_shark", target=target.name, side=side)
 
     def update_playing(self, dt_ms):
 
-        self.time_left -= dt_ms / 1000.0
-        #timer
-        if self.time_left <= 0:
-            self.time_left = 0
-            self.trigger_game_over("Time's up!")
-            return
+        self.collider.begin_frame()
+        self.gc_policy.tick()
+        self.elapsed_s += dt_ms / 1000.0
+        #timer (endless no tiene)
+        if not self.endless:
+            self.time_left -= dt_ms / 1000.0
+            if self.time_left <= 0:
+                self.time_left = 0
+                self.trigger_game_over("Time's up!")
+                return
+
+        elapsed = self.elapsed_s
+        if self.endless:
+            #curva que se aplana: se acerca al minimo sin pasarse
+            fade = math.exp(-elapsed / self.endless_ramp_tau)
+            self.fish_spawn_interval = int(self.fish_interval_min + (self.fish_interval_start - self.fish_interval_min) * fade)
+            self.obstacle_spawn_interval = int(self.obstacle_interval_min + (self.obstacle_interval_start - self.obstacle_interval_min) * fade)
+        else:
+            ramp = int(elapsed * self.spawn_ramp)
+            self.fish_spawn_interval = max(self.fish_interval_min, self.fish_interval_start - ramp)
+            self.obstacle_spawn_interval = max(self.obstacle_interval_min, self.obstacle_interval_start - ramp)
 
-        elapsed = GAME_TIME_SECONDS - self.time_left
-        self.fish_spawn_interval = max(600, 1500 - int(elapsed * 10))
-        self.obstacle_spawn_interval = max(700, 2000 - int(elapsed * 10))
+        #reloj de animacion global (el governor lo puede poner a media velocidad)
+        self.animator.advance(dt_ms, self.governor.anim_rate if self.governor else 1.0)
+        if self.particles:
+            self.particles.update(dt_ms)
 
-        keys = pygame.key.get_pressed()
+        keys = self.read_keys()
         self.spawn_entities()
 
         moved = False
@@ -576,75 +955,96 @@ class LuckyLuresGame:
             prev_center = self.player.rect.center
             self.player.update(keys, self.controls_p1)
             moved = moved or (self.player.rect.center != prev_center)
+            self._wake(self.player, prev_center)
+            self._trace_movement(keys, self.controls_p1, "P1", self.player.rect.center != prev_center)
 
         if self.player2 and self.player2.health > 0:
+            if self.cpu:
+                keys = self.cpu.control(self, keys)
             prev_center2 = self.player2.rect.center
             self.player2.update(keys, self.controls_p2)
             moved = moved or (self.player2.rect.center != prev_center2)
+            self._wake(self.player2, prev_center2)
+            self._trace_movement(keys, self.controls_p2, "P2", self.player2.rect.center != prev_center2)
+
+        if self.river:
+            self.river.follow((self.player, self.player2))
 
         if moved:
-            self.last_player_move_time = pygame.time.get_ticks()
+            self.last_player_move_time = self.ticks()
             self.idle_threat_triggered = False
 
-        now_ticks = pygame.time.get_ticks()
+        now_ticks = self.ticks()
         if (not self.idle_threat_triggered and
-                now_ticks - self.last_player_move_time >= IDLE_SHARK_DELAY_MS):
+                now_ticks - self.last_player_move_time >= self.idle_shark_delay_ms):
             self.spawn_idle_predator()
             self.idle_threat_triggered = True
 
-        for fish in self.fish_group:
-            fish.update(dt_ms)
-        for obs in self.obstacles:
-            obs.update(dt_ms)
-        for lure in self.lures:
-            lure.update()
-
-        hits = pygame.sprite.groupcollide(self.fish_group, self.lures, True, True)
-
-        for fish, lures_hit in hits.items():
+        if self.river:
+            self._update_world(dt_ms)
+        else:
+            if self.schooling:
+                self.schooling.apply(self.fish_group.sprites())
+            for fish in self.fish_group:
+                fish.update(dt_ms)
+            for obs in self.obstacles:
+                obs.update(dt_ms)
+        moving_lures = self._moving_lures  # los que salen de pantalla igual barren su ultimo tramo
+        moving_lures.clear()
+        moving_lures.extend(self.lures)
+        for lure in moving_lures:
+            lure.update(dt_ms)
+
+        #frames actuales de todas las animaciones en una sola pasada
+        self.animator.resolve(self.fish_group)
+        self.animator.resolve(self.obstacles)
+
+        for fish, lure in self.lure_catches(moving_lures):
             gained = 50 if fish.is_predator else 20
-            owner = lures_hit[0].owner if lures_hit else "P1"
+            owner = lure.owner
 
             if owner == "P2":
                 self.score_p2 += gained
             else:
                 self.score += gained
+            self.emit("catch", owner=owner, predator=fish.is_predator, points=gained)
+            self.burst("catch", fish.rect.center)
+            self.respawn_fish()
 
-            x = random.randint(50, WIDTH - 50)
-            y = random.randint(80, HEIGHT - 250)
-
-            new_fish = Fish(x, y, random.random() < 0.3,
-                            friendly_images=self.friendly_fish_images,
-                            predator_images=self.predator_fish_images)
-            self.all_sprites.add(new_fish)
-            self.fish_group.add(new_fish)
-
-        player_obstacle_hits = pygame.sprite.spritecollide(self.player, self.obstacles, True) if self.player else []
-        player2_obstacle_hits = pygame.sprite.spritecollide(self.player2, self.obstacles, True) if self.player2 else []
+        player_obstacle_hits = self._smash_obstacles(self.player)
+        player2_obstacle_hits = self._smash_obstacles(self.player2)
 
 
         if player_obstacle_hits and self.player:
             self.player.take_damage(1)
+            self.emit("obstacle_hit", player="P1", hp=self.player.health)
+            self.burst("hit", self.player.rect.center)
             if self.hit_snd:
                 self.hit_snd.play()
 
         if player2_obstacle_hits and self.player2:
             self.player2.take_damage(1)
+            self.emit("obstacle_hit", player="P2", hp=self.player2.health)
+            self.burst("hit", self.player2.rect.center)
             if self.hit_snd:
                 self.hit_snd.play()
 
-        preds = [f for f in self.fish_group if f.is_predator]
-
-        for fish in preds:
+        for fish in self.fish_group:
+            if not fish.is_predator:
+                continue
 
-            if self.player and self.player.rect.colliderect(fish.rect):
+            if self.player and self.collider(self.player, fish):
                 self.player.take_damage(1)
+                self.emit("bite", player="P1", hp=self.player.health)
+                self.burst("hit", self.player.rect.center)
                 self.player.rect.y += 15
                 if self.hit_snd:
                     self.hit_snd.play()
 
-            if self.player2 and self.player2.rect.colliderect(fish.rect):
+            if self.player2 and self.collider(self.player2, fish):
                 self.player2.take_damage(1)
+                self.emit("bite", player="P2", hp=self.player2.health)
+                self.burst("hit", self.player2.rect.center)
                 self.player2.rect.y += 15
                 if self.hit_snd:
                     self.hit_snd.play()
@@ -652,6 +1052,89 @@ class LuckyLuresGame:
         if (self.player and self.player.health <= 0) and (self.player2 and self.player2.health <= 0):
             self.trigger_game_over("Both boats were wrecked!")
 
+    def _update_world(self, dt_ms):
+        #cerca de la camara update completo (y cardumen); lejos update_far cada tantos ticks;
+        #fuera de la zona activa se descartan. El costo depende de lo que hay cerca, no del largo
+        regions = self.river.regions
+        if self.schooling:
+            self.schooling.apply([f for f in self.fish_group if regions.near.colliderect(f.rect)])
+        for fish in self.fish_group:
+            if regions.step(fish, dt_ms):
+                fish.update(dt_ms)
+        for obs in self.obstacles:
+            if regions.step(obs, dt_ms):
+                obs.update(dt_ms)
+
+    def _smash_obstacles(self, boat):
+        #como spritecollide(dokill=True) pero sin armar la lista de golpes
+        if not boat:
+            return False
+        hit = False
+        for obs in self.obstacles:
+            if self.collider(boat, obs):
+                obs.kill()
+                hit = True
+        return hit
+
+    def lure_catches(self, lures):
+        #colision barrida: cada cebo contra los peces cerca del tramo que recorrio este tick
+        #(consulta al grid, no a todos los peces). Se resuelve por orden de contacto a lo
+        #largo del camino: cada cebo se queda con el primer pez, y cada pez con el primer cebo
+        self.fish_grid.rebuild(self.fish_group)
+        contacts = self._contacts
+        hits = self._sweep_hits
+        contacts.clear()
+        for order, lure in enumerate(lures):
+            w, h = lure.rect.size
+            candidates = self.fish_grid.query_segment(lure.prev_pos, lure.pos, max(w, h) / 2)
+            hits.clear()
+            for t, fish in self.collider.sweep(lure, lure.prev_pos, lure.pos, candidates, hits):
+                contacts.append((t, order, lure, fish))
+        caught = self._caught
+        caught.clear()
+        if not contacts:
+            return caught
+        contacts.sort(key=_contact_order)
+
+        used = self._used
+        used.clear()
+        for t, order, lure, fish in contacts:
+            if lure in used or fish in used:
+                continue
+            used.add(lure)
+            used.add(fish)
+            lure.kill()
+            fish.kill()
+            caught.append((fish, lure))
+        return caught
+
+    def burst(self, name, pos, direction=None):
+        if self.particles:
+            self.particles.emit(name, pos[0], pos[1], direction)
+
+    def _wake(self, boat, prev_center):
+        #estela detras del bote, hacia atras del movimiento
+        dx = boat.rect.centerx - prev_center[0]
+        dy = boat.rect.centery - prev_center[1]
+        if self.particles and (dx or dy):
+            length = math.hypot(dx, dy)
+            back_x = boat.rect.centerx - dx / length * boat.rect.height * 0.4
+            back_y = boat.rect.centery - dy / length * boat.rect.height * 0.4
+            self.particles.emit("wake", back_x, back_y, (-dx, -dy))
+
+    def _trace_movement(self, keys, controls, owner, moved):
+        if not self.latency:
+            return
+        if any(keys[k] for k in controls.values()):
+            self.latency.sample(("hold", owner))
+        if moved:
+            self.latency.effect("move", owner)
+            self.latency.effect("hold", owner)
+
+    def read_keys(self):
+        #teclas presionadas; se reemplaza cuando el input viene de otro lado
+        return pygame.key.get_pressed()
+
     def update_paused(self, dt_ms):
         pass
 
@@ -660,7 +1143,9 @@ class LuckyLuresGame:
 
     def draw_river_background(self):
 
-        if self.bg_image:
+        if self.governor and self.governor.flat_background:
+            self.screen.fill(RIVER_BLUE)
+        elif self.bg_image:
             bg_height = self.bg_image.get_height()
             y_offset = int(self.bg_offset) % bg_height
             start_y = y_offset - bg_height
@@ -680,23 +1165,33 @@ class LuckyLuresGame:
                                  (0, y, WIDTH, band_height // 2))
 
     def draw_hud(self):
-        #socre boards
-        text_score1 = self.font_small.render(f"P1 Score: {self.score}", True, WHITE)
+        #socre boards (se re-renderiza solo cuando cambia el valor)
+        text_score1 = self._hud_text("score1", self.score, "P1 Score: {}")
         self.screen.blit(text_score1, (10, 10))
 
-        text_score2 = self.font_small.render(f"P2 Score: {self.score_p2}", True, WHITE)
+        text_score2 = self._hud_text("score2", self.score_p2, "CPU Score: {}" if self.cpu else "P2 Score: {}")
         self.screen.blit(text_score2, (WIDTH - text_score2.get_width() - 10, 10))
 
-        text_time = self.font_small.render(f"Time: {int(self.time_left)}s", True, WHITE)
+        shown = self.elapsed_s if self.endless else self.time_left
+        text_time = self._hud_text("time", int(shown), "Time: {}s")
         self.screen.blit(text_time, (WIDTH // 2 - text_time.get_width() // 2, 10))
 
         #players hp
-        if self.player:
-            for i in range(self.player.health):
-                pygame.draw.rect(self.screen, RED, (10 + i * 18, 35, 15, 15))
-        if self.player2:
-            for i in range(self.player2.health):
-                pygame.draw.rect(self.screen, RED, (WIDTH - 25 - i * 18, 35, 15, 15))
+        for boat, rects in ((self.player, self._hp_rects[0]), (self.player2, self._hp_rects[1])):
+            if boat:
+                for i in range(min(boat.health, len(rects))):
+                    pygame.draw.rect(self.screen, RED, rects[i])
+
+        if SHOW_COLLISION_STATS:
+            text_stats = self.font_small.render(self.collider.stats_text(), True, WHITE)
+            self.screen.blit(text_stats, (10, HEIGHT - 30))
+
+    def _hud_text(self, slot, value, fmt):
+        cached = self._hud_cache.get(slot)
+        if cached is None or cached[0] != value:
+            cached = (value, self.font_small.render(fmt.format(value), True, WHITE))
+            self._hud_cache[slot] = cached
+        return cached[1]
 
     def draw_menu(self):
 
@@ -704,7 +1199,7 @@ class LuckyLuresGame:
 
         #enter screen
         title = self.font_big.render("Lucky Lures: River Rush", True, WHITE)
-        msg = self.font_med.render("Press ENTER to Start", True, WHITE)
+        msg = self.font_med.render("Press ENTER to Start, E for Endless", True, WHITE)
         tip = self.font_small.render("Move with WASD/Arrows, SPACE to cast, P to pause.", True, WHITE)
 
         self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, HEIGHT // 3))
@@ -713,21 +1208,44 @@ class LuckyLuresGame:
 
     def draw_playing(self):
 
-        self.draw_river_background()
+        oy = 0
+        if self.river:
+            oy = self.river.camera.view.top
+            if self.governor and self.governor.flat_background:
+                self.screen.fill(RIVER_BLUE)
+            else:
+                self.river.draw_background(self.screen)
+        else:
+            self.draw_river_background()
         #dibujar el fishingl ine
-       
-        for lure in self.lures:
+        lures = self.lures if not self.governor or self.governor.draw_lines else ()
+        for lure in lures:
             if lure.owner == "P2" and self.player2:
-                start_pos = self.player2.rect.center
+                start_x, start_y = self.player2.rect.center
             else:
                 if not self.player:
                     continue
-                start_pos = self.player.rect.center
-            pygame.draw.line(self.screen, WHITE, start_pos, lure.rect.center, 2)
+                start_x, start_y = self.player.rect.center
+            pygame.draw.line(self.screen, WHITE, (start_x, start_y - oy),
+                             (lure.rect.centerx, lure.rect.centery - oy), 2)
 
-        self.all_sprites.draw(self.screen)
+        if self.river:
+            self._draw_visible(self.river.camera.view)
+        else:
+            self.all_sprites.draw(self.screen)
+        if self.particles:
+            self.particles.draw(self.screen, oy)
         self.draw_hud()
 
+    def _draw_visible(self, view):
+        #solo lo que cae en la vista, pasado a coordenadas de pantalla
+        blit = self.screen.blit
+        top = view.top
+        for sprite in self.all_sprites:
+            rect = sprite.rect
+            if view.colliderect(rect):
+                blit(sprite.image, (rect.x, rect.y - top))
+
 
 
     def draw_paused(self):
@@ -756,13 +1274,15 @@ class LuckyLuresGame:
         title = self.font_big.render("Game Over", True, WHITE)
         reason = self.font_med.render(self.game_over_reason, True, WHITE)
         score_text = self.font_med.render(f"P1 Score: {self.score}", True, WHITE)
-        score_text_p2 = self.font_med.render(f"P2 Score: {self.score_p2}", True, WHITE)
+        #con la CPU jugando de P2 se la nombra igual que en el HUD
+        p2_name = "CPU" if self.cpu else "P2"
+        score_text_p2 = self.font_med.render(f"{p2_name} Score: {self.score_p2}", True, WHITE)
 
 
         if self.score > self.score_p2:
             winner_text = f"P1 Wins!"
         elif self.score_p2 > self.score:
-            winner_text = f"P2 Wins!"
+            winner_text = f"{p2_name} Wins!"
         else:
             winner_text = "Tie Game!"
 
@@ -779,37 +1299,109 @@ class LuckyLuresGame:
         self.screen.blit(winner_render, (WIDTH // 2 - winner_render.get_width() // 2, HEIGHT // 3 + 190))
         self.screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, HEIGHT // 3 + 230))
 
+        #mejores puntajes desde el cache (nunca lee disco aqui)
+        if self.leaderboard:
+            best = self.leaderboard.top_scores(3)
+            if best:
+                line = "Top: " + " | ".join(f"{player} {score}" for player, score, _ in best)
+                top_text = self.font_small.render(line, True, WHITE)
+                self.screen.blit(top_text, (WIDTH // 2 - top_text.get_width() // 2, HEIGHT // 3 + 270))
+
+    def step(self, events, dt_ms):
+        #eventos + simulacion del estado actual, sin dibujar
+        previous_state = self.state
+        if self.state == STATE_MENU:
+            running = self.handle_menu_events(events)
+            self.update_menu(dt_ms)
+
+        elif self.state == STATE_PLAYING:
+            running = self.handle_playing_events(events)
+            if running:
+                self.update_playing(dt_ms)
+
+        elif self.state == STATE_PAUSED:
+            running = self.handle_paused_events(events)
+            self.update_paused(dt_ms)
+
+        else:
+            running = self.handle_game_over_events(events)
+            self.update_game_over(dt_ms)
+
+        #gc en los cambios de estado (pausa, game over, menu), nunca a mitad de partida
+        if self.state != previous_state:
+            self.gc_policy.on_state(self.state == STATE_PLAYING)
+        return running
+
+    def draw(self):
+        if self.state == STATE_MENU:
+            self.draw_menu()
+        elif self.state == STATE_PLAYING:
+            self.draw_playing()
+        elif self.state == STATE_PAUSED:
+            self.draw_paused()
+        else:
+            self.draw_game_over()
+
     def run(self):
 
         running = True
         #main loop
         while running:
-            dt_ms = self.clock.tick(FPS)
+            dt_ms = self.pacer.wait()
+            if self.hot_reload:
+                self.hot_reload.poll(pygame.time.get_ticks())
+            work_start = time.perf_counter()
+            counting = self.allocs and self.state == STATE_PLAYING
+            if counting:
+                self.allocs.begin()
 
             events = pygame.event.get()
-
-            if self.state == STATE_MENU:
-                running = self.handle_menu_events(events)
-                self.update_menu(dt_ms)
-                self.draw_menu()
-
-            elif self.state == STATE_PLAYING:
-                running = self.handle_playing_events(events)
-                if not running:
-                    break
-                self.update_playing(dt_ms)
-                self.draw_playing()
-
-            elif self.state == STATE_PAUSED:
-                running = self.handle_paused_events(events)
-                self.update_paused(dt_ms)
-                self.draw_paused()
-
-            elif self.state == STATE_GAME_OVER:
-                running = self.handle_game_over_events(events)
-                self.update_game_over(dt_ms)
-                self.draw_game_over()
-
+            if self.memory:
+                self.memory.maybe_sample(pygame.time.get_ticks())
+                if any(e.type == pygame.KEYDOWN and e.key == pygame.K_F3 for e in events):
+                    self.memory.overlay = not self.memory.overlay
+            if self.latency:
+                self.latency.polled(events, self.input_kinds if self.state == STATE_PLAYING else {},
+                                    self.pacer.input_seen)
+
+            running = self.step(events, dt_ms)
+            if not running:
+                break
+            if self.latency:
+                self.latency.mark("sim")
+            self.draw()
+
+            if self.memory and self.memory.overlay:
+                self.memory.draw_overlay(self.screen, self.font_small)
+            if self.latency:
+                self.latency.mark("draw")
+            self.pacer.work_done()
             pygame.display.flip()
-
+            self.pacer.presented()
+            if self.capture:
+                self.capture.grab(self.screen)
+            if not self.first_paint_done:
+                self.after_first_paint()
+            if counting and self.state == STATE_PLAYING:
+                self.allocs.end()
+            if self.governor:
+                self.governor.record((time.perf_counter() - work_start) * 1000)
+            if self.latency:
+                self.latency.presented()
+
+        if self.latency:
+            print(self.latency.report())
+        self.close()
         pygame.quit()
+
+    def close(self):
+        #vacia los writers en segundo plano antes de salir
+        if self.leaderboard:
+            self.leaderboard.close()
+        if self.telemetry:
+            self.telemetry.close()
+        if self.capture:
+            print(self.capture.close())
+            self.capture = None
+        if self.cpu:
+            print(self.cpu.report())
@@ -0,0 +1,73 @@
+import gc
+import sys
+
+
+#gc durante el juego: los assets se congelan despues de cargar (el gc no los vuelve a recorrer),
+#el gc ciclico se apaga mientras se juega y se corre en pausa / cambios de estado
+
+
+def freeze_loaded():
+    #todo lo que existe hasta ahora (assets, clips, caches) pasa a la generacion permanente
+    gc.collect()
+    gc.freeze()
+
+
+class GameplayGC:
+    def __init__(self, enabled=True, safety_threshold=50000):
+        self.enabled = enabled
+        #red de seguridad: si igual se acumulan muchos objetos nuevos, un collect de gen 0
+        self.safety_threshold = safety_threshold
+        self.collections = 0
+        self.safety_collections = 0
+
+    def on_state(self, playing):
+        if not self.enabled:
+            return
+        if playing:
+            gc.collect()
+            gc.disable()
+        else:
+            gc.enable()
+            gc.collect()
+        self.collections += 1
+
+    def tick(self):
+        if self.enabled and not gc.isenabled() and gc.get_count()[0] > self.safety_threshold:
+            gc.collect(0)
+            self.safety_collections += 1
+
+
+class AllocationCounter:
+    #bloques netos que deja cada frame (sys.getallocatedblocks antes/despues)
+
+    def __init__(self, report_every=600):
+        self.report_every = report_every
+        self.start = 0
+        self.frames = 0
+        self.total = 0
+        self.worst = 0
+        self.zero_frames = 0
+        self.last = 0
+
+    def begin(self):
+        self.start = sys.getallocatedblocks()
+
+    def end(self):
+        self.last = sys.getallocatedblocks() - self.start
+        self.frames += 1
+        self.total += self.last
+        if self.last > self.worst:
+            self.worst = self.last
+        if self.last <= 0:
+            self.zero_frames += 1
+        if self.report_every and self.frames % self.report_every == 0:
+            print(self.report())
+            self.reset()
+
+    def reset(self):
+        self.frames = self.total = self.worst = self.zero_frames = 0
+
+    def report(self):
+        frames = max(1, self.frames)
+        return (f"[alloc] {self.frames} frames: mean {self.total / frames:+.2f} blocks/frame, "
+                f"worst {self.worst:+d}, {self.zero_frames / frames:.0%} frames with no net blocks")
@@ -0,0 +1,81 @@
+from collections import deque
+
+
+#niveles en el orden en que se recorta calidad
+LEVELS = (
+    "full",
+    "slow_animation",   # reloj de animacion a mitad de velocidad
+    "no_fishing_lines",
+    "flat_background",  # fill en vez del blit del fondo
+    "spawn_cap",        # difiere spawns si hay demasiados peces/obstaculos
+)
+
+
+def _p90(values):
+    ordered = sorted(values)
+    return ordered[int(0.9 * (len(ordered) - 1))]
+
+
+class FrameGovernor:
+    #mira el tiempo de trabajo por frame (sin el sleep del tick) y baja/sube calidad
+
+    def __init__(self, budget_ms, window=45, over_ratio=1.0, recover_ratio=0.7,
+                 cooldown_frames=45, recover_frames=180, max_fish=25, max_obstacles=12,
+                 log=print):
+        self.budget_ms = budget_ms
+        self.samples = deque(maxlen=window)
+        self.over_ratio = over_ratio
+        self.recover_ratio = recover_ratio
+        self.cooldown_frames = cooldown_frames
+        self.recover_frames = recover_frames
+        self.max_fish = max_fish
+        self.max_obstacles = max_obstacles
+        self.log = log
+        self.level = 0
+        self.since_change = 0
+        self.headroom_frames = 0
+        self.changes = []
+
+    def record(self, work_ms):
+        self.samples.append(work_ms)
+        self.since_change += 1
+        if len(self.samples) < self.samples.maxlen:
+            return
+
+        p90 = _p90(self.samples)
+        if p90 > self.budget_ms * self.over_ratio:
+            self.headroom_frames = 0
+            if self.since_change >= self.cooldown_frames and self.level < len(LEVELS) - 1:
+                self._set(self.level + 1, f"p90 work {p90:.1f} ms > budget {self.budget_ms:.1f} ms")
+        elif p90 < self.budget_ms * self.recover_ratio:
+            self.headroom_frames += 1
+            if self.headroom_frames >= self.recover_frames and self.level > 0:
+                self._set(self.level - 1, f"p90 work {p90:.1f} ms < {self.recover_ratio:.0%} of budget "
+                                          f"for {self.headroom_frames} frames")
+        else:
+            self.headroom_frames = 0
+
+    def _set(self, level, reason):
+        previous = self.level
+        self.level = level
+        self.since_change = 0
+        self.headroom_frames = 0
+        self.samples.clear()
+        self.changes.append((previous, level, reason))
+        if self.log:
+            self.log(f"[governor] {LEVELS[previous]} -> {LEVELS[level]}: {reason}")
+
+    @property
+    def anim_rate(self):
+        return 0.5 if self.level >= 1 else 1.0
+
+    @property
+    def draw_lines(self):
+        return self.level < 2
+
+    @property
+    def flat_background(self):
+        return self.level >= 3
+
+    def spawn_allowed(self, live, cap):
+        return self.level < 4 or live < cap
@@ -0,0 +1,203 @@
+import argparse
+import copy
+import random
+import sys
+
+import pygame
+
+from constants import FPS, MAX_HEALTH, STATE_GAME_OVER, STATE_PLAYING
+
+
+#partidas sin ventana con reloj virtual: mismo seed + misma politica = mismo resultado
+
+
+def frame_dt(frame, fps=FPS):
+    #16/17 ms alternados, suma exacta de 1000 ms por segundo
+    return (frame + 1) * 1000 // fps - frame * 1000 // fps
+
+
+class HeldKeys:
+    #reemplazo de pygame.key.get_pressed con un set de teclas
+    def __init__(self):
+        self.down = set()
+
+    def __getitem__(self, key):
+        return key in self.down
+
+
+class IdlePolicy:
+    name = "idle"
+
+    def __init__(self, seed):
+        pass
+
+    def act(self, game, frame, keys):
+        return ()
+
+
+class RandomPolicy:
+    #mantiene una direccion por un rato y lanza al azar; rng propio para no tocar el de la partida
+    name = "random"
+
+    def __init__(self, seed, hold_frames=(10, 60), cast_chance=0.03):
+        self.rng = random.Random(seed ^ 0x5EED)
+        self.hold_frames = hold_frames
+        self.cast_chance = cast_chance
+        self.until = {}
+
+    def act(self, game, frame, keys):
+        events = []
+        for controls, cast_key in ((game.controls_p1, pygame.K_SPACE), (game.controls_p2, pygame.K_RSHIFT)):
+            if frame >= self.until.get(cast_key, 0):
+                keys.down.difference_update(controls.values())
+                choice = self.rng.choice((None, "up", "down", "left", "right"))
+                if choice:
+                    keys.down.add(controls[choice])
+                self.until[cast_key] = frame + self.rng.randint(*self.hold_frames)
+            if self.rng.random() < self.cast_chance:
+                events.append(cast_key)
+        return events
+
+
+class SweepPolicy:
+    #guion fijo: cada bote barre de lado a lado y lanza cada medio segundo
+    name = "sweep"
+
+    def __init__(self, seed, period_frames=120, cast_every=30):
+        self.period = period_frames
+        self.cast_every = cast_every
+
+    def act(self, game, frame, keys):
+        keys.down.clear()
+        going_left = (frame // self.period) % 2 == 0
+        keys.down.add(game.controls_p1["left" if going_left else "right"])
+        keys.down.add(game.controls_p2["right" if going_left else "left"])
+        if frame % self.cast_every == 0:
+            return (pygame.K_SPACE, pygame.K_RSHIFT)
+        return ()
+
+
+POLICIES = {p.name: p for p in (IdlePolicy, RandomPolicy, SweepPolicy)}
+
+
+def make_game():
+    from game import LuckyLuresGame
+    game = LuckyLuresGame(headless=True)
+    game.splash_snd = game.hit_snd = game.game_over_snd = None
+    return game
+
+
+def fork_game(template):
+    #otra partida que comparte con el template lo que es de solo lectura (imagenes, clips,
+    #fonts); grupos, reloj de animacion, grids y buffers son propios. Cuesta mucho menos
+    #que make_game, para tener cientos de partidas en un proceso
+    from collision import Collider
+    from gcpolicy import GameplayGC
+    from spatial import UniformGrid
+    game = copy.copy(template)
+    game.animator = template.animator.fork()
+    game.all_sprites = pygame.sprite.Group()
+    game.fish_group = pygame.sprite.Group()
+    game.obstacles = pygame.sprite.Group()
+    game.lures = pygame.sprite.Group()
+    game.player = game.player2 = None
+    game.collider = Collider(pixel_perfect=template.collider.pixel_perfect)
+    game.fish_grid = UniformGrid(template.fish_grid.cell)
+    if template.schooling:
+        game.schooling = copy.copy(template.schooling)
+        game.schooling.grid = UniformGrid(template.schooling.reach)
+    if template.river:
+        game.river = template.river.fork()
+    game._moving_lures = []
+    game._contacts = []
+    game._sweep_hits = []
+    game._caught = []
+    game._used = set()
+    game._hud_cache = {}
+    #el gc y la telemetria son del proceso, no de cada partida
+    game.gc_policy = GameplayGC(enabled=False)
+    game.cpu = template.cpu.fork() if template.cpu else None
+    game.telemetry = None
+    game.latency = None
+    game.allocs = None
+    game.virtual_ms = None
+    return game
+
+
+def apply_tuning(game, params):
+    for name, value in params.items():
+        if not hasattr(game, name):
+            raise AttributeError(f"unknown tuning parameter: {name}")
+        setattr(game, name, value)
+
+
+def start_match(game, seed, endless=False):
+    keys = HeldKeys()
+    game.read_keys = lambda: keys
+    game.virtual_ms = 0
+    game.reset_game(seed=seed, endless=endless)
+    game.state = STATE_PLAYING
+    return keys
+
+
+def step_match(game, frame, policy, keys):
+    events = [pygame.event.Event(pygame.KEYDOWN, key=k) for k in policy.act(game, frame, keys)]
+    dt = frame_dt(frame)
+    game.virtual_ms += dt
+    game.step(events, dt)
+
+
+def play_match(game, seed, policy, max_frames=None):
+    #corre una partida completa en STATE_PLAYING y devuelve metricas
+    keys = start_match(game, seed)
+
+    frame = 0
+    while game.state == STATE_PLAYING and (max_frames is None or frame < max_frames):
+        step_match(game, frame, policy, keys)
+        frame += 1
+    return match_result(game, seed, frame)
+
+
+def match_result(game, seed, frame):
+    return {
+        "seed": seed,
+        "frames": frame,
+        "survival_s": round(frame / FPS, 3),
+        "reason": game.game_over_reason,
+        "score_p1": game.score,
+        "score_p2": game.score_p2,
+        "damage_p1": MAX_HEALTH - game.player.health,
+        "damage_p2": MAX_HEALTH - game.player2.health,
+        "game_over": game.state == STATE_GAME_OVER,
+    }
+
+
+def replay_check(game, seeds, policy_name="random"):
+    #cada semilla dos veces seguidas en el mismo juego: nada de la partida anterior
+    #(reloj de animacion, grids, rival) puede cambiar el resultado
+    mismatches = []
+    for seed in seeds:
+        policy = POLICIES[policy_name]
+        first = play_match(game, seed, policy(seed))
+        second = play_match(game, seed, policy(seed))
+        if first != second:
+            mismatches.append((seed, first, second))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Determinism check: every seed twice on one reused game")
+    parser.add_argument("--matches", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", default="random", choices=sorted(POLICIES))
+    args = parser.parse_args(argv)
+
+    mismatches = replay_check(make_game(), range(args.seed, args.seed + args.matches), args.policy)
+    for seed, first, second in mismatches:
+        print(f"seed {seed}: first  {first}\n{' ' * (6 + len(str(seed)))}second {second}")
+    print(f"{args.matches} seeds ({args.policy}) replayed on one game: {len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+import os
+import runpy
+import sys
+import time
+
+import pygame
+
+import assets
+import collision
+import constants
+from boats import PlayerBoat
+
+
+#recarga en caliente (HOT_RELOAD): entre frames se miran tamano/mtime de constants.py y de las
+#imagenes cargadas. Un cambio se aplica cuando el archivo queda quieto dos polls seguidos (el
+#editor termino de escribir). Solo se decodifica lo que cambio; las variantes de esas imagenes
+#(flip, rotacion, escala) se rehacen y se cambian en los sprites vivos
+
+IMAGE_EXTS = (".png", ".jpg", ".gif")
+
+#constante -> atributo de dificultad del juego (solo si sigue igual, ej. no lo cambio un sweep)
+GAME_ATTRS = {
+    "FISH_SPAWN_INTERVAL": "fish_interval_start",
+    "FISH_SPAWN_MIN_INTERVAL": "fish_interval_min",
+    "OBSTACLE_SPAWN_INTERVAL": "obstacle_interval_start",
+    "OBSTACLE_SPAWN_MIN_INTERVAL": "obstacle_interval_min",
+    "SPAWN_RAMP_MS_PER_SECOND": "spawn_ramp",
+    "PREDATOR_CHANCE": "predator_chance",
+    "BASE_OBSTACLE_SPEED": "obstacle_speed",
+    "IDLE_SHARK_DELAY_MS": "idle_shark_delay_ms",
+    "IDLE_SHARK_SPEED": "idle_shark_speed",
+    "ENDLESS_FISH_LIFETIME_MS": "fish_lifetime_ms",
+    "ENDLESS_OBSTACLE_LIFETIME_MS": "obstacle_lifetime_ms",
+    "ENDLESS_MAX_FISH": "endless_max_fish",
+    "ENDLESS_MAX_OBSTACLES": "endless_max_obstacles",
+    "ENDLESS_RAMP_TAU_S": "endless_ramp_tau",
+}
+#clip -> constante de su duracion por frame (los demas clips usan FISH_FRAME_MS)
+CLIP_FRAME_MS = {"shark_swim": "OBSTACLE_FRAME_MS", "predator_swim": "PREDATOR_FRAME_MS"}
+IMAGE_SIZES = ("BOAT_IMAGE_MAX_SIZE", "FISH_IMAGE_MAX_SIZE")
+#ventana, reloj y subsistemas se arman una vez al arrancar
+RESTART = ("WIDTH", "HEIGHT", "FPS")
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _needs_restart(name):
+    return name in RESTART or name.endswith(("_ENABLED", "_DIR"))
+
+
+class HotReload:
+    def __init__(self, game, poll_ms=250):
+        self.game = game
+        self.poll_ms = poll_ms
+        self.next_poll = 0
+        self.constants_path = os.path.abspath(constants.__file__)
+        self.assets_dir = str(game.base_path / "assets")
+        self.stamps = {path: _stamp(path) for path in self._paths()}
+        self.pending = {}  # path -> stamp visto en el poll anterior, todavia sin aplicar
+        self.listing = self._listing()
+        self.reloads = 0
+
+    def _paths(self):
+        paths = {self.constants_path}
+        paths.update(key[0] for key in assets.loaded or ())
+        return paths
+
+    def _listing(self):
+        try:
+            return {name for name in os.listdir(self.assets_dir) if name.lower().endswith(IMAGE_EXTS)}
+        except OSError:
+            return set()
+
+    def poll(self, now_ms):
+        if now_ms < self.next_poll:
+            return
+        self.next_poll = now_ms + self.poll_ms
+        ready = []
+        for path in self._paths():
+            stamp = _stamp(path)
+            if stamp == self.stamps.get(path):
+                self.pending.pop(path, None)
+            elif self.pending.get(path, False) == stamp:
+                self.stamps[path] = stamp
+                del self.pending[path]
+                ready.append(path)
+            else:
+                self.pending[path] = stamp
+
+        listing = self._listing()
+        for name in sorted(listing - self.listing):
+            print(f"[reload] new asset {name}: restart to load it")
+        self.listing = listing
+        if ready:
+            self.apply(ready)
+
+    def apply(self, paths):
+        start = time.perf_counter()
+        notes = []
+        if self.constants_path in paths:
+            notes += self.reload_constants()
+        changed = set(paths)
+        keys = [key for key in assets.loaded or () if key[0] in changed]
+        if keys:
+            notes += self.reload_images([(key, key) for key in keys])
+        self.reloads += 1
+        print(f"[reload] {'; '.join(notes)} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    def reload_constants(self):
+        try:
+            fresh = runpy.run_path(self.constants_path)
+        except Exception as e:
+            #el archivo a medio editar no rompe la partida: quedan los valores de antes
+            return [f"constants.py not applied ({type(e).__name__}: {e})"]
+        changed = {}
+        restart = []
+        for name, value in fresh.items():
+            if not name.isupper():
+                continue
+            if not hasattr(constants, name):
+                restart.append(name)
+            elif value != getattr(constants, name):
+                if _needs_restart(name):
+                    restart.append(name)
+                else:
+                    changed[name] = (getattr(constants, name), value)
+
+        #los modulos importan con from constants import X: se cambia X en cada modulo del juego
+        #que todavia tiene el valor viejo (el mismo objeto)
+        base = os.path.dirname(self.constants_path)
+        for module in list(sys.modules.values()):
+            path = getattr(module, "__file__", None)
+            if not path or os.path.dirname(os.path.abspath(path)) != base:
+                continue
+            values = vars(module)
+            for name, (old, value) in changed.items():
+                if name in values and values[name] is old:
+                    values[name] = value
+
+        notes = [f"constants: {', '.join(sorted(changed)) or 'no changes'}"]
+        notes += self._apply_constants(changed)
+        if restart:
+            notes.append(f"restart for {', '.join(sorted(restart))}")
+        return notes
+
+    def _apply_constants(self, changed):
+        game = self.game
+        for name, attr in GAME_ATTRS.items():
+            if name in changed and getattr(game, attr) == changed[name][0]:
+                setattr(game, attr, changed[name][1])
+
+        #entidades vivas: la velocidad base se corre (peces) o se escala (tiburones, senuelos)
+        if "BASE_FISH_SPEED" in changed:
+            old, new = changed["BASE_FISH_SPEED"]
+            delta = new - old
+            for fish in game.fish_group:
+                fish.speed += delta
+                fish.vx += delta if fish.vx >= 0 else -delta
+        if "BASE_OBSTACLE_SPEED" in changed:
+            old, new = changed["BASE_OBSTACLE_SPEED"]
+            if old:
+                for obstacle in game.obstacles:
+                    obstacle.vx *= new / old
+                    obstacle.vy *= new / old
+        if "LURE_SPEED" in changed:
+            old, new = changed["LURE_SPEED"]
+            if old:
+                for lure in game.lures:
+                    lure.velocity = (lure.velocity[0] * new / old, lure.velocity[1] * new / old)
+        if "PLAYER_SPEED" in changed:
+            old, new = changed["PLAYER_SPEED"]
+            for boat in game.all_sprites:
+                if isinstance(boat, PlayerBoat) and boat.speed == old:
+                    boat.speed = new
+
+        for clip in game.animator.clips:
+            name = CLIP_FRAME_MS.get(clip.name.split(":")[0], "FISH_FRAME_MS")
+            if name in changed and clip.frame_ms == changed[name][0]:
+                clip.frame_ms = changed[name][1]
+
+        #otro tamano maximo: se vuelven a decodificar las imagenes que se cargaron con el viejo
+        resized = []
+        for name in IMAGE_SIZES:
+            if name in changed:
+                old, new = changed[name]
+                resized += [(key, (key[0], new) + key[2:]) for key in assets.loaded or () if key[1] == old]
+        if resized:
+            return self.reload_images(resized)
+        return []
+
+    def reload_images(self, changes):
+        swap = {}  # id(surface vieja) -> (vieja, nueva)
+        names = []
+        for old_key, new_key in changes:
+            old = assets.loaded.pop(old_key)
+            #sin atlas: la hoja tiene la version vieja del archivo
+            new = assets._decode_image(*new_key)
+            if new is None:
+                assets.loaded[old_key] = old
+                names.append(f"{os.path.basename(old_key[0])} (unreadable, kept)")
+                continue
+            assets.loaded[new_key] = new
+            names.append(os.path.basename(new_key[0]))
+            if not new_key[2]:
+                #el fondo es la unica imagen sin alpha; en el juego va escalado a la pantalla
+                self._swap_background(new)
+            else:
+                swap[id(old)] = (old, new)
+        variants = self._rebuild_variants(swap)
+        if swap:
+            self._swap(swap)
+        return [f"images: {', '.join(names)} (+{variants} variants)"]
+
+    def _swap_background(self, image):
+        game = self.game
+        if image.get_size() != (constants.WIDTH, constants.HEIGHT):
+            image = pygame.transform.smoothscale(image, (constants.WIDTH, constants.HEIGHT))
+        game.bg_image = image
+        if game.river:
+            game.river.bg_image = image
+            #los chunks se repintan con el fondo nuevo a medida que vuelven a entrar
+            chunks = game.river.chunks
+            chunks.pool.extend(chunks.chunks.values())
+            chunks.chunks.clear()
+
+    def _rebuild_variants(self, swap):
+        #en orden de insercion: la variante de una variante (rotacion de un flip) viene despues,
+        #cuando su fuente ya esta en swap
+        cache = assets._variant_cache
+        count = 0
+        for key, (source, result) in list(cache.items()):
+            entry = swap.get(id(source))
+            if entry is None or entry[0] is not source:
+                continue
+            del cache[key]
+            if key[0] == "flip":
+                image = assets.flipped(entry[1])
+            elif key[0] == "rot":
+                image = assets.rotated(entry[1], key[2])
+            else:
+                image = assets.scaled(entry[1], key[2])
+            swap[id(result)] = (result, image)
+            count += 1
+        return count
+
+    def _swap(self, swap):
+        def fresh(surface):
+            entry = swap.get(id(surface))
+            return entry[1] if entry is not None and entry[0] is surface else surface
+
+        game = self.game
+        for attr in ("boat_image", "lure_image", "sunken_image"):
+            setattr(game, attr, fresh(getattr(game, attr)))
+        for attr in ("friendly_fish_images", "predator_fish_images", "predator_swim_frames", "obstacle_frames"):
+            setattr(game, attr, [fresh(image) for image in getattr(game, attr)])
+        for clip in game.animator.clips:
+            clip.frames = tuple(fresh(frame) for frame in clip.frames)
+
+        for sprite in game.all_sprites:
+            for attr in ("image", "base_image", "alt_image", "sunken_image"):
+                value = getattr(sprite, attr, None)
+                if value is not None:
+                    setattr(sprite, attr, fresh(value))
+            images = getattr(sprite, "images", None)
+            if isinstance(images, dict):
+                sprite.images = {k: fresh(v) for k, v in images.items()}
+            if sprite.image.get_size() != sprite.rect.size:
+                sprite.rect = sprite.image.get_rect(center=sprite.rect.center)
+
+        for old, new in swap.values():
+            entry = collision._mask_cache.get(id(old))
+            if entry is not None and entry[0] is old:
+                del collision._mask_cache[id(old)]
@@ -0,0 +1,165 @@
+import time
+from collections import deque
+
+import pygame
+
+
+#etapas en orden: cola (esperando el tick), simulacion, dibujo, flip
+STAGES = ("wait", "sim", "draw", "flip")
+
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class LatencyTracer:
+    #sigue cada KEYDOWN desde que se lee hasta el primer frame presentado con su efecto
+
+    def __init__(self, history=2000, max_frames=1):
+        #input sin efecto en max_frames frames (ej. ya hay 3 lures) se descarta
+        self.max_frames = max_frames
+        self.frame = 0
+        self.pending = []
+        self.samples = {}
+        self.history = history
+        self.dropped = 0
+        self.last_poll = None
+        self.marks = {}
+        self.effects = set()
+        self.estimated = 0
+
+    def polled(self, events, input_kinds, seen=None):
+        now = time.perf_counter()
+        #seen: cuando el pacer vio el input en cola mientras esperaba (medido). Sin eso no hay
+        #timestamp por evento y se asume llegada uniforme desde el poll anterior (estimado)
+        prev = self.last_poll if self.last_poll is not None else now
+        arrival = seen if seen is not None else (prev + now) / 2.0
+        self.last_poll = now
+        self.frame += 1
+        self.marks = {"poll": now}
+        self.effects.clear()
+
+        for event in events:
+            if event.type != pygame.KEYDOWN:
+                continue
+            kind = input_kinds.get(event.key)
+            if kind:
+                self.pending.append((kind, arrival, self.frame))
+                if seen is None:
+                    self.estimated += 1
+
+    def sample(self, kind):
+        #muestra de movimiento leida con get_pressed dentro del frame
+        self.pending.append((kind, time.perf_counter(), self.frame))
+
+    def mark(self, stage):
+        self.marks[stage] = time.perf_counter()
+
+    def effect(self, kind, owner):
+        self.effects.add((kind, owner))
+
+    def presented(self):
+        now = time.perf_counter()
+        poll = self.marks.get("poll", now)
+        sim = self.marks.get("sim", poll)
+        draw = self.marks.get("draw", sim)
+
+        keep = []
+        for entry in self.pending:
+            key, arrival, frame = entry
+            if key in self.effects:
+                parts = (poll - arrival, sim - poll, draw - sim, now - draw)
+                bucket = self.samples.setdefault(key, deque(maxlen=self.history))
+                bucket.append((now - arrival, parts))
+            elif self.frame - frame + 1 >= self.max_frames:
+                self.dropped += 1
+            else:
+                keep.append(entry)
+        self.pending = keep
+        self.effects.clear()
+
+    def report(self):
+        lines = ["input latency (ms)  n  p50  p90  p99  max | " + " ".join(STAGES)]
+        for (kind, owner), bucket in sorted(self.samples.items()):
+            totals = sorted(s[0] * 1000 for s in bucket)
+            means = [sum(s[1][i] for s in bucket) * 1000 / len(bucket) for i in range(len(STAGES))]
+            lines.append(
+                f"{kind}/{owner}: {len(totals)} "
+                f"{_percentile(totals, 50):.1f} {_percentile(totals, 90):.1f} "
+                f"{_percentile(totals, 99):.1f} {totals[-1]:.1f} | "
+                + " ".join(f"{m:.1f}" for m in means)
+            )
+        lines.append(f"inputs without visible effect: {self.dropped}")
+        if self.estimated:
+            lines.append(f"wait estimated as half the poll interval for {self.estimated} inputs "
+                         f"(not seen in the queue while the pacer slept)")
+        return "\n".join(lines)
+
+
+class FramePacer:
+    #en modo normal es clock.tick; en late_latch duerme hasta justo antes del proximo
+    #frame menos el trabajo estimado, asi el input se lee lo mas tarde posible.
+    #watch_input (tracer de latencia): duerme de a 1 ms mirando la cola de eventos y anota en
+    #input_seen cuando aparecio el primer KEYDOWN, para medir la etapa "wait"
+
+    def __init__(self, clock, fps, late_latch=False, margin_ms=1.5, window=30, watch_input=False):
+        self.clock = clock
+        self.fps = fps
+        self.late_latch = late_latch
+        self.watch_input = watch_input
+        self.period = 1.0 / fps
+        self.margin = margin_ms / 1000.0
+        self.work = deque(maxlen=window)
+        self.last_present = None
+        self.last_wake = None
+        self.work_start = None
+        self.input_seen = None
+
+    def wait(self):
+        self.input_seen = None
+        if not self.late_latch and not self.watch_input:
+            return self.clock.tick(self.fps)
+
+        if not self.late_latch:
+            #mismo ritmo que clock.tick: un periodo desde el despertar anterior
+            if self.last_wake is not None:
+                self._sleep_until(self.last_wake + self.period)
+        elif self.last_present is not None:
+            work = sorted(self.work)
+            estimate = _percentile(work, 90) if work else 0.0
+            self._sleep_until(self.last_present + self.period - estimate - self.margin)
+        elif self.watch_input:
+            self._look()
+
+        wake = time.perf_counter()
+        dt_ms = 0 if self.last_wake is None else int(round((wake - self.last_wake) * 1000))
+        self.last_wake = wake
+        self.work_start = wake
+        return dt_ms
+
+    def _look(self):
+        #un input que llego durante el trabajo del frame se ve recien aca (cota inferior del wait)
+        if self.input_seen is None and pygame.event.peek(pygame.KEYDOWN):
+            self.input_seen = time.perf_counter()
+
+    def _sleep_until(self, target):
+        while True:
+            if self.watch_input:
+                self._look()
+            remaining = target - time.perf_counter()
+            if remaining <= 0:
+                return
+            if remaining > 0.002:
+                time.sleep(min(remaining - 0.002, 0.001) if self.watch_input else remaining - 0.002)
+
+    def work_done(self):
+        #work = desde que despierta hasta que termina de dibujar (sin el bloqueo del flip)
+        if self.late_latch and self.work_start is not None:
+            self.work.append(time.perf_counter() - self.work_start)
+
+    def presented(self):
+        self.last_present = time.perf_counter()
@@ -0,0 +1,143 @@
+import queue
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    seed INTEGER,
+    duration_s REAL NOT NULL,
+    reason TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores(score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores(player, match_id DESC);
+"""
+
+TOP_QUERY = """
+SELECT s.player, s.score, m.played_at FROM scores s JOIN matches m ON m.id = s.match_id
+ORDER BY s.score DESC LIMIT ?
+"""
+
+HISTORY_QUERY = """
+SELECT s.score, m.played_at, m.duration_s, m.reason FROM scores s JOIN matches m ON m.id = s.match_id
+WHERE s.player = ? ORDER BY s.match_id DESC LIMIT ?
+"""
+
+_STOP = object()
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def top_scores(conn, n=10):
+    return conn.execute(TOP_QUERY, (n,)).fetchall()
+
+
+def player_history(conn, player, limit=20):
+    return conn.execute(HISTORY_QUERY, (player, limit)).fetchall()
+
+
+class Leaderboard:
+    #el frame loop solo toca los caches en memoria; el disco es del thread escritor
+
+    def __init__(self, path, players=("P1", "P2"), top_n=10, history_n=20,
+                 batch_size=32, flush_s=0.5):
+        self.path = path
+        self.top_n = top_n
+        self.history_n = history_n
+        self.batch_size = batch_size
+        self.flush_s = flush_s
+        self.lock = threading.Lock()
+        self.top = []
+        self.history = {p: [] for p in players}
+        self.pending = queue.Queue()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._writer, name="leaderboard", daemon=True)
+        self.thread.start()
+
+    def record_match(self, scores, duration_s, reason, seed=None):
+        #scores: {jugador: puntos}. Actualiza el cache ya y encola el insert
+        played_at = time.time()
+        with self.lock:
+            for player, score in scores.items():
+                self.top.append((player, score, played_at))
+                self.history.setdefault(player, []).insert(0, (score, played_at, duration_s, reason))
+                del self.history[player][self.history_n:]
+            self.top.sort(key=lambda row: -row[1])
+            del self.top[self.top_n:]
+        self.pending.put((played_at, seed, duration_s, reason, dict(scores)))
+
+    def top_scores(self, n=None):
+        with self.lock:
+            return list(self.top[:n or self.top_n])
+
+    def player_history(self, player):
+        with self.lock:
+            return list(self.history.get(player, ()))
+
+    def close(self, timeout=2.0):
+        self.pending.put(_STOP)
+        self.thread.join(timeout)
+
+    def _warm(self, conn):
+        #las consultas van sin el lock (top_scores se pide en cada frame de game over); con el
+        #lock solo se mezcla lo leido con lo que se registro antes de terminar de calentar
+        top = top_scores(conn, self.top_n)
+        with self.lock:
+            merged = sorted(set(top) | set(self.top), key=lambda row: -row[1])
+            self.top = merged[:self.top_n]
+            players = list(self.history)
+        done = set()
+        while players:
+            rows = {player: player_history(conn, player, self.history_n) for player in players}
+            with self.lock:
+                for player, history in rows.items():
+                    self.history[player] = (self.history[player] + history)[:self.history_n]
+                done.update(rows)
+                #jugadores nuevos que aparecieron mientras se consultaba
+                players = [player for player in self.history if player not in done]
+        self.ready.set()
+
+    def _writer(self):
+        conn = connect(self.path)
+        self._warm(conn)
+        stop = False
+        while not stop:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.flush_s
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.pending.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stop = True
+                batch = [item for item in batch if item is not _STOP]
+            if batch:
+                self._insert(conn, batch)
+        conn.close()
+
+    def _insert(self, conn, batch):
+        with conn:
+            for played_at, seed, duration_s, reason, scores in batch:
+                cur = conn.execute(
+                    "INSERT INTO matches (played_at, seed, duration_s, reason) VALUES (?, ?, ?, ?)",
+                    (played_at, seed, duration_s, reason),
+                )
+                conn.executemany(
+                    "INSERT INTO scores (match_id, player, score) VALUES (?, ?, ?)",
+                    [(cur.lastrowid, player, score) for player, score in scores.items()],
+                )
@@ -1,6 +1,10 @@
+import math
+
 import pygame
 
+from assets import solid_image
 from constants import (
+    FPS,
     LURE_SPEED,
     WIDTH,
     HEIGHT,
@@ -8,31 +12,45 @@ from constants import (
 )
 
 
+#direcciones con nombre (las de los botes) como vectores
+DIRECTION_VECTORS = {
+    "UP": (0, -1),
+    "DOWN": (0, 1),
+    "LEFT": (-1, 0),
+    "RIGHT": (1, 0),
+}
+
+
 # clase de cebo
 class Lure(pygame.sprite.Sprite):
+    bounds = pygame.Rect(0, 0, WIDTH, HEIGHT)  # en modo rio: la vista de la camara
+
     def __init__(self, x, y, direction, sprite_image=None, owner="P1"):
         super().__init__()
         #buscamos imagen sino default
         if sprite_image:
-            self.image = sprite_image.copy()
+            self.image = sprite_image
         else:
-            self.image = pygame.Surface((10, 10))
-            self.image.fill(WHITE)
+            self.image = solid_image((10, 10), WHITE)
         self.rect = self.image.get_rect(center=(x, y))
+        #direction: nombre ("UP", ...) o vector (dx, dy) en cualquier angulo
+        dx, dy = DIRECTION_VECTORS.get(direction, (0, -1)) if isinstance(direction, str) else direction
+        length = math.hypot(dx, dy) or 1.0
+        self.velocity = (dx / length * LURE_SPEED, dy / length * LURE_SPEED)
         self.direction = direction
         self.owner = owner
+        #posicion real en float; el tramo del ultimo tick se usa para la colision barrida
+        self.pos = (float(x), float(y))
+        self.prev_pos = self.pos
+
+    #movimiento (LURE_SPEED px por frame de FPS, escalado por dt)
+    def update(self, dt_ms=1000 / FPS):
+        steps = dt_ms * FPS / 1000
+        self.prev_pos = self.pos
+        self.pos = (self.pos[0] + self.velocity[0] * steps, self.pos[1] + self.velocity[1] * steps)
+        self.rect.center = self.pos
 
-    #movimiento
-    def update(self):
-        if self.direction == "UP":
-            self.rect.y -= LURE_SPEED
-        elif self.direction == "DOWN":
-            self.rect.y += LURE_SPEED
-        elif self.direction == "LEFT":
-            self.rect.x -= LURE_SPEED
-        elif self.direction == "RIGHT":
-            self.rect.x += LURE_SPEED
-
-        if (self.rect.right < 0 or self.rect.left > WIDTH or
-                self.rect.bottom < 0 or self.rect.top > HEIGHT):
+        b = self.bounds
+        if (self.rect.right < b.left or self.rect.left > b.right or
+                self.rect.bottom < b.top or self.rect.top > b.bottom):
             self.kill()
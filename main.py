@@ -1,6 +1,17 @@
-from game import LuckyLuresGame
+import time
+_start = time.perf_counter()  # antes de importar pygame, para medir los imports
+
+from startup import StartupProfiler
+startup = StartupProfiler(_start)
+with startup.phase("imports"):
+    from constants import SPLIT_PROCESSES, SPLIT_UNCAPPED
+    from game import LuckyLuresGame
 #main call
 
 if __name__ == "__main__":
-    game = LuckyLuresGame()
-    game.run()
+    game = LuckyLuresGame(startup=startup)
+    if SPLIT_PROCESSES:
+        from splitmode import run_split
+        run_split(game, uncapped=SPLIT_UNCAPPED)
+    else:
+        game.run()
@@ -0,0 +1,170 @@
+import os
+import time
+import tracemalloc
+
+import pygame
+
+import assets
+import collision
+
+
+#atributos donde las entidades guardan surfaces
+ENTITY_SURFACE_ATTRS = ("image", "base_image", "alt_image", "images", "frames", "sunken_image")
+
+#assets compartidos que carga LuckyLuresGame.__init__
+GAME_ASSET_ATTRS = (
+    "bg_image", "boat_image", "lure_image", "sunken_image",
+    "friendly_fish_images", "predator_fish_images", "obstacle_frames",
+)
+
+MB = 1024 * 1024
+
+
+def surface_bytes(surface):
+    #una subsurface comparte pixels con su padre, no suma
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def _iter_surfaces(value):
+    if isinstance(value, pygame.Surface):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _iter_surfaces(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _iter_surfaces(v)
+
+
+class MemoryAccountant:
+    #bytes por clase de entidad y por asset; muestra cada sample_ms con un scan barato
+
+    def __init__(self, game, sample_ms=2000, budgets_mb=None, report_dir="reports",
+                 use_tracemalloc=False):
+        self.game = game
+        self.sample_ms = sample_ms
+        self.budgets = {k: v * MB for k, v in (budgets_mb or {}).items()}
+        self.report_dir = report_dir
+        self.last_sample = None
+        self.latest = {}
+        self.alarmed = set()
+        self.overlay = False
+        self.sample_cost_ms = 0.0
+        if use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def asset_table(self):
+        #nombre del asset -> bytes, con ids para saber que surfaces son compartidas
+        table = {}
+        ids = set()
+        for attr in GAME_ASSET_ATTRS:
+            for i, surface in enumerate(_iter_surfaces(getattr(self.game, attr, None))):
+                if id(surface) in ids:
+                    continue
+                ids.add(id(surface))
+                name = attr if isinstance(getattr(self.game, attr), pygame.Surface) else f"{attr}[{i}]"
+                table[name] = surface_bytes(surface)
+        #con atlas los sprites son subsurfaces (0 bytes): los pixels estan en las hojas
+        for i, sheet in enumerate(assets.atlas_sheets()):
+            table[f"atlas[{i}]"] = surface_bytes(sheet)
+        return table, ids
+
+    def entity_table(self, shared_ids):
+        #clase -> [instancias, bytes propios, bytes de assets compartidos referenciados];
+        #shared_ids: assets y variantes del cache, que ya se cuentan en su propio total
+        table = {}
+        seen = set()
+        for sprite in self.game.all_sprites:
+            row = table.setdefault(type(sprite).__name__, [0, 0, 0])
+            row[0] += 1
+            for attr in ENTITY_SURFACE_ATTRS:
+                for surface in _iter_surfaces(getattr(sprite, attr, None)):
+                    if id(surface) in seen:
+                        continue
+                    seen.add(id(surface))
+                    if id(surface) in shared_ids:
+                        row[2] += surface_bytes(surface)
+                    else:
+                        row[1] += surface_bytes(surface)
+        return table
+
+    def sample(self):
+        start = time.perf_counter()
+        assets_bytes, asset_ids = self.asset_table()
+        #flips, rotaciones y escalados salen del cache de variantes: van en "variants", no como
+        #bytes propios de la entidad (sino se cuentan dos veces en el total)
+        variants = {id(e[1]): e[1] for e in assets._variant_cache.values()}
+        entities = self.entity_table(asset_ids | variants.keys())
+
+        variant_bytes = sum(surface_bytes(surface) for surface in variants.values())
+        mask_bytes = sum(m.get_size()[0] * m.get_size()[1] // 8
+                         for _, m in collision._mask_cache.values())
+
+        totals = {
+            "assets": sum(assets_bytes.values()),
+            "entities": sum(row[1] for row in entities.values()),
+            "variants": variant_bytes,
+            "masks": mask_bytes,
+        }
+        if tracemalloc.is_tracing():
+            totals["python"] = tracemalloc.get_traced_memory()[0]
+        totals["total"] = sum(totals.values())
+        for name, row in entities.items():
+            totals[name] = row[1]
+
+        self.latest = {"assets": assets_bytes, "entities": entities, "totals": totals}
+        self.sample_cost_ms = (time.perf_counter() - start) * 1000
+        self.check_budgets()
+        return self.latest
+
+    def maybe_sample(self, now_ms):
+        if self.last_sample is None or now_ms - self.last_sample >= self.sample_ms:
+            self.last_sample = now_ms
+            self.sample()
+
+    def check_budgets(self):
+        totals = self.latest["totals"]
+        for key, limit in self.budgets.items():
+            used = totals.get(key, 0)
+            if used > limit and key not in self.alarmed:
+                self.alarmed.add(key)
+                path = self.write_report(f"{key} over budget: {used / MB:.1f} MB > {limit / MB:.1f} MB", key)
+                print(f"[memory] {key} over budget, report written to {path}")
+            elif used <= limit:
+                self.alarmed.discard(key)  #se rearma al bajar
+
+    def report_lines(self):
+        lines = []
+        totals = self.latest.get("totals", {})
+        for key in ("total", "assets", "entities", "variants", "masks", "python"):
+            if key in totals:
+                lines.append(f"{key}: {totals[key] / MB:.2f} MB")
+        for name, (count, own, shared) in sorted(self.latest.get("entities", {}).items()):
+            lines.append(f"{name} x{count}: own {own / 1024:.0f} KB, shared {shared / 1024:.0f} KB")
+        return lines
+
+    def write_report(self, reason, tag="report"):
+        #tag (el budget que salto) en el nombre: dos alarmas en el mismo segundo no se pisan
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, time.strftime("memory_%Y%m%d_%H%M%S") + f"_{tag}.txt")
+        with open(path, "w") as f:
+            f.write(reason + "\n\n")
+            f.write("\n".join(self.report_lines()) + "\n\nassets:\n")
+            for name, size in sorted(self.latest["assets"].items(), key=lambda kv: -kv[1]):
+                f.write(f"  {name}: {size / 1024:.0f} KB\n")
+            if tracemalloc.is_tracing():
+                f.write("\npython allocations (top 25 by file):\n")
+                for stat in tracemalloc.take_snapshot().statistics("filename")[:25]:
+                    f.write(f"  {stat}\n")
+        return path
+
+    def draw_overlay(self, screen, font):
+        lines = self.report_lines()
+        lines.append(f"sample {self.sample_cost_ms:.2f} ms")
+        y = 60
+        for line in lines:
+            text = font.render(line, True, (255, 255, 255))
+            screen.blit(text, (10, y))
+            y += text.get_height()
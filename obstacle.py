@@ -1,8 +1,10 @@
 import pygame
 import random
 
+from assets import solid_image
 from constants import (
     BASE_OBSTACLE_SPEED,
+    FPS,
     HEIGHT,
     WIDTH,
     GRAY,
@@ -10,38 +12,52 @@ from constants import (
 
 
 class Obstacle(pygame.sprite.Sprite):
-    
-    def __init__(self, x, y, frames=None, velocity=(0, 0)):
+    #fuera de esto se descarta; el modo rio lo cambia por la zona activa alrededor de la camara
+    bounds = pygame.Rect(-100, -100, WIDTH + 200, HEIGHT + 200)
+
+    def __init__(self, x, y, clip=None, velocity=(0, 0), speed=BASE_OBSTACLE_SPEED, animator=None):
         super().__init__()
-        #imagen velocidad y poss
-        self.frames = frames or []
-        if self.frames:
-            self.frame_idx = 0
-            self.image = self.frames[self.frame_idx].copy()
+        #imagen velocidad y poss; la animacion la resuelve el reloj global
+        self.clip = clip if animator else None
+        self.phase = 0
+        if self.clip is not None:
+            self.phase = animator.spawn_phase(clip)
+            self.image = animator.frame(clip, self.phase)
         else:
-            self.image = pygame.Surface((50, 30))
-            self.image.fill(GRAY)
+            self.image = solid_image((50, 30), GRAY)
         self.rect = self.image.get_rect(center=(x, y))
         self.vx, self.vy = velocity
         if self.vx == 0 and self.vy == 0:
-            base = BASE_OBSTACLE_SPEED + random.uniform(-1, 2)
+            base = speed + random.uniform(-1, 2)
             self.vx, self.vy = (0, base)
-        self.anim_timer = 0
-        self.anim_interval = 120  # milisegs
+        self.age_ms = 0
+        self.lifetime_ms = None
+        self.far_dt = 0
+        self.far_slot = None
         #movimeinto
     def update(self, dt_ms):
-        if self.frames:
-            self.anim_timer += dt_ms
-            if self.anim_timer >= self.anim_interval:
-                self.anim_timer = 0
-                self.frame_idx = (self.frame_idx + 1) % len(self.frames)
-                prev_center = self.rect.center
-                self.image = self.frames[self.frame_idx]
-                self.rect = self.image.get_rect(center=prev_center)
+        self.age_ms += dt_ms
+        if self.lifetime_ms is not None and self.age_ms >= self.lifetime_ms:
+            self.kill()
+            return
 
         self.rect.x += self.vx
         self.rect.y += self.vy
-        
-        #removes obs when off screen
-        if self.rect.top > HEIGHT + 100 or self.rect.bottom < -100 or self.rect.right < -100 or self.rect.left > WIDTH + 100:
+        self._cull()
+
+    def update_far(self, dt_ms):
+        #lejos de la camara (modo rio): dt acumulado de varios ticks
+        self.age_ms += dt_ms
+        if self.lifetime_ms is not None and self.age_ms >= self.lifetime_ms:
+            self.kill()
+            return
+        steps = dt_ms * FPS / 1000
+        self.rect.x += round(self.vx * steps)
+        self.rect.y += round(self.vy * steps)
+        self._cull()
+
+    #removes obs when off screen
+    def _cull(self):
+        b = self.bounds
+        if self.rect.top > b.bottom or self.rect.bottom < b.top or self.rect.right < b.left or self.rect.left > b.right:
             self.kill()
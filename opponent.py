@@ -0,0 +1,407 @@
+import math
+import time
+
+from constants import LURE_SPEED, WIDTH
+
+
+#rival de la CPU para P2: elige movimiento y lanzamientos simulando futuros cortos.
+#El estado se copia a tuplas de floats (nada de sprites ni Surfaces) y peces y obstaculos se
+#mueven en linea recta con rebote, asi la posicion en el tick t sale en O(1) y todos los
+#candidatos comparten la misma copia. La busqueda es anytime: un generador que avanza de a
+#pedazos chicos hasta que se acaba el presupuesto del frame y sigue en el frame siguiente;
+#cada decide_every ticks se toma la mejor accion encontrada hasta ahi
+
+MOVES = ((0, 0), (0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (1, -1), (-1, 1), (1, 1))
+CASTS = MOVES[1:]
+
+#entidad copiada: x, y, vx, vy, medio ancho, medio alto, limites x/y (None = sin rebote),
+#valor si se pesca, si muerde, y zona fuera de la cual desaparece (obstaculos)
+X, Y, VX, VY, HW, HH, XLO, XHI, YLO, YHI, VALUE, BITES, ALIVE = range(13)
+
+
+def _fold(p, lo, hi):
+    #posicion con rebotes entre lo y hi
+    span = hi - lo
+    if span <= 0:
+        return lo
+    p = (p - lo) % (2 * span)
+    return lo + (p if p <= span else 2 * span - p)
+
+
+def _at(e, t):
+    x = e[X] + e[VX] * t
+    y = e[Y] + e[VY] * t
+    if e[XLO] is not None:
+        x = _fold(x, e[XLO], e[XHI])
+    if e[YLO] is not None:
+        y = _fold(y, e[YLO], e[YHI])
+    alive = e[ALIVE]
+    if alive is not None and not (alive[0] <= x <= alive[2] and alive[1] <= y <= alive[3]):
+        return None
+    return x, y
+
+
+class _Keys:
+    #teclas de P2 las pone la CPU, el resto sale del teclado de verdad
+    def __init__(self, controls):
+        self.controls = set(controls.values())
+        self.held = set()
+        self.base = None
+
+    def __getitem__(self, key):
+        if key in self.controls:
+            return key in self.held
+        return self.base[key]
+
+
+class CpuOpponent:
+    def __init__(self, controls, budget_ms=1.0, units=None, horizon=45, decide_every=6,
+                 damage_weight=150.0, discount=0.985, spawn_zone=None, spawn_risk=1.0):
+        self.keys = _Keys(controls)
+        self.controls = controls
+        #presupuesto por frame, mirado despues de cada tick simulado; units = cantidad fija de
+        #pasos de un tick (partidas headless reproducibles)
+        self.budget_s = budget_ms / 1000.0
+        self.units = units
+        self.horizon = horizon
+        self.decide_every = decide_every
+        self.damage_weight = damage_weight
+        self.discount = discount
+        #zona donde aparecen peces nuevos (left, top, right, bottom en pantalla): un pez puede
+        #aparecer encima del bote y eso no se ve en la copia, se cobra spawn_risk por tick adentro
+        self.spawn_zone = spawn_zone
+        self.spawn_risk = spawn_risk
+
+        self.move = (0, 0)
+        self.tick = 0
+        self.commit_tick = 0
+        self.search = None
+        self.best_plan = None
+        self.best_score = None
+        self.best_cast = None
+        self.cast_score = 0.0
+        self.health = 0
+        self.seen = 0
+
+        self.frames = 0
+        self.think_s = 0.0
+        self.think_max = 0.0
+        self.over_budget = 0
+        self.decisions = 0
+        self.rollouts = 0
+        self.casts = 0
+        self.surprises = 0
+
+    def fork(self):
+        #mismo rival para otra partida (sin la busqueda ni las estadisticas)
+        return CpuOpponent(self.controls, self.budget_s * 1000, self.units, self.horizon,
+                           self.decide_every, self.damage_weight, self.discount,
+                           self.spawn_zone, self.spawn_risk)
+
+    def reset(self):
+        #partida nueva: arranca quieto y con una busqueda nueva
+        self.move = (0, 0)
+        self.tick = self.commit_tick = 0
+        self.search = None
+        self._drop_results()
+        self.keys.held.clear()
+
+    def control(self, game, keys):
+        #se llama una vez por tick antes de mover a P2; devuelve las teclas a usar
+        begin = time.perf_counter()
+        boat = game.player2
+        if self.tick >= self.commit_tick:
+            self._commit(game, boat)
+            self._plan(game, boat, self.decide_every)
+        elif self._surprised(game, boat):
+            #algo nuevo encima del bote o un golpe: se descarta la busqueda y se decide en este
+            #mismo tick con lo que alcance el presupuesto
+            self._drop_results()
+            self._plan(game, boat, 0)
+            self.surprises += 1
+        self._think(begin)
+        if self.commit_tick <= self.tick:
+            self._commit(game, boat)
+            self._plan(game, boat, self.decide_every)
+        self.tick += 1
+        self.keys.base = keys
+        spent = time.perf_counter() - begin
+        self.frames += 1
+        self.think_s += spent
+        self.think_max = max(self.think_max, spent)
+        if self.units is None and spent > self.budget_s * 1.5:
+            self.over_budget += 1
+        return self.keys
+
+    def _plan(self, game, boat, prefix):
+        self.search = self._search(self._snapshot(game, boat, prefix))
+        self.commit_tick = self.tick + prefix
+        self.health = boat.health
+        self.seen = len(game.fish_group) + len(game.obstacles)
+
+    def _surprised(self, game, boat):
+        if boat.health < self.health:
+            return True
+        count = len(game.fish_group) + len(game.obstacles)
+        if count <= self.seen:
+            self.seen = count
+            return False
+        self.seen = count
+        #aparecio algo: solo importa si cae cerca del bote
+        near = boat.rect.inflate(160, 160)
+        for o in game.obstacles:
+            if near.colliderect(o.rect):
+                return True
+        for f in game.fish_group:
+            if f.is_predator and near.colliderect(f.rect):
+                return True
+        return False
+
+    def _drop_results(self):
+        self.best_plan = None
+        self.best_score = None
+        self.best_cast = None
+        self.cast_score = 0.0
+
+    def _think(self, begin):
+        search = self.search
+        if search is None:
+            return
+        try:
+            if self.units is not None:
+                for _ in range(self.units):
+                    next(search)
+            else:
+                deadline = begin + self.budget_s
+                while time.perf_counter() < deadline:
+                    next(search)
+        except StopIteration:
+            self.search = None
+
+    def _commit(self, game, boat):
+        if self.best_plan is not None:
+            self.move = self.best_plan[0]
+            self.decisions += 1
+        held = self.keys.held
+        held.clear()
+        dx, dy = self.move
+        if dx:
+            held.add(self.controls["left" if dx < 0 else "right"])
+        if dy:
+            held.add(self.controls["up" if dy < 0 else "down"])
+        if self.best_cast is not None and self.cast_score > 0:
+            if sum(1 for l in game.lures if l.owner == "P2") < 3:
+                game.cast_lure(boat, "P2", self.best_cast)
+                self.casts += 1
+        self._drop_results()
+
+    def _snapshot(self, game, boat, prefix):
+        #copia barata: solo numeros
+        fish = []
+        for f in game.fish_group:
+            r = f.rect
+            hw, hh = r.width / 2, r.height / 2
+            if f.steered:
+                left, top, right, bottom = f.school_bounds
+                e = (r.centerx, r.centery, f.vx, f.vy, hw, hh,
+                     left + hw, right - hw, top + hh, bottom - hh)
+            else:
+                e = (r.centerx, r.centery, f.direction * f.speed, 0.0, hw, hh,
+                     hw, WIDTH - hw, None, None)
+            fish.append(e + (50 if f.is_predator else 20, f.is_predator, None))
+        obstacles = []
+        for o in game.obstacles:
+            r = o.rect
+            b = o.bounds
+            obstacles.append((r.centerx, r.centery, o.vx, o.vy, r.width / 2, r.height / 2,
+                              None, None, None, None, 0, True, (b.left, b.top, b.right, b.bottom)))
+        lures = []
+        for l in game.lures:
+            b = l.bounds
+            lures.append((l.pos[0], l.pos[1], l.velocity[0], l.velocity[1], l.rect.width / 2,
+                          (b.left, b.top, b.right, b.bottom)))
+        b = boat.bounds
+        lure_half = game.lure_image.get_width() / 2 if game.lure_image else 5
+        return {
+            "boat": (boat.rect.centerx, boat.rect.centery, boat.rect.width / 2, boat.rect.height / 2,
+                     boat.speed, boat.health),
+            "bounds": (b.left, b.top, b.right, b.bottom),
+            "fish": fish,
+            "hazards": obstacles + [e for e in fish if e[BITES]],
+            "lures": lures,
+            "lure_half": lure_half,
+            "move": self.move,
+            "prefix": prefix,
+            "spawn": self._spawn_zone(game),
+        }
+
+    def _spawn_zone(self, game):
+        if self.spawn_zone is None:
+            return None
+        left, top, right, bottom = self.spawn_zone
+        oy = game.spawn_y()
+        return left, top + oy, right, bottom + oy
+
+    def _search(self, snap):
+        yield
+        horizon = self.horizon
+        prefix = snap["prefix"]
+        #peces que ya van a caer en cebos en vuelo (de cualquiera de los dos)
+        claimed = set()
+        for x, y, vx, vy, half, bounds in snap["lures"]:
+            hit = yield from self._lure_path(snap, x, y, vx, vy, half, bounds, 0, claimed)
+            if hit is not None:
+                claimed.add(hit[1])
+
+        #movimientos de un tramo (el actual primero); hasta el commit el bote sigue con la
+        #accion actual, asi que todos arrancan igual
+        hazards = self._near_hazards(snap, horizon + prefix)
+        singles = []
+        order = sorted(MOVES, key=lambda m: m != snap["move"])
+        for move in order:
+            score = yield from self._rollout(snap, hazards, (move, move), claimed)
+            singles.append((score, move))
+
+        #lanzamientos desde donde va a estar el bote en el commit
+        x, y, hw, hh, speed, hp = snap["boat"]
+        start = self._walk(snap, x, y, snap["move"], prefix)
+        bounds = snap["bounds"]
+        for d in CASTS:
+            length = math.hypot(*d)
+            vx, vy = d[0] / length * LURE_SPEED, d[1] / length * LURE_SPEED
+            hit = yield from self._lure_path(snap, start[0], start[1], vx, vy, snap["lure_half"],
+                                             bounds, prefix, claimed)
+            if hit is not None:
+                score = snap["fish"][hit[1]][VALUE] * self.discount ** (hit[0] - prefix)
+                if score > self.cast_score:
+                    self.cast_score = score
+                    self.best_cast = d
+            yield
+
+        #si sobra tiempo: dos tramos sobre los mejores primeros tramos
+        singles.sort(reverse=True)
+        for _, first in singles[:3]:
+            for second in MOVES:
+                if second != first:
+                    yield from self._rollout(snap, hazards, (first, second), claimed)
+
+    def _walk(self, snap, x, y, move, ticks):
+        left, top, right, bottom = snap["bounds"]
+        _, _, hw, hh, speed, _ = snap["boat"]
+        x = min(max(x + move[0] * speed * ticks, left + hw), right - hw)
+        y = min(max(y + move[1] * speed * ticks, top + hh), bottom - hh)
+        return x, y
+
+    def _near_hazards(self, snap, ticks):
+        #solo lo que puede llegar a cruzarse con el bote dentro del horizonte
+        x, y, hw, hh, speed, _ = snap["boat"]
+        near = []
+        for e in snap["hazards"]:
+            reach = (speed + abs(e[VX]) + abs(e[VY])) * ticks + hw + hh + e[HW] + e[HH]
+            if abs(e[X] - x) < reach and abs(e[Y] - y) < reach:
+                near.append(e)
+        return near
+
+    def _lure_path(self, snap, x, y, vx, vy, half, bounds, t0, claimed):
+        #primer pez (tick, indice) que toca un cebo en linea recta hasta salir de la zona
+        left, top, right, bottom = bounds
+        limit = self.horizon * 2
+        #solo los peces que pueden llegar a la linea del cebo antes de que salga
+        speed = math.hypot(vx, vy) or 1.0
+        ux, uy = vx / speed, vy / speed
+        reach = limit * speed
+        fish = []
+        for i, e in enumerate(snap["fish"]):
+            if i in claimed:
+                continue
+            rx, ry = e[X] - x, e[Y] - y
+            along = rx * ux + ry * uy
+            slack = (abs(e[VX]) + abs(e[VY])) * limit + e[HW] + e[HH] + half
+            if -slack < along < reach + slack and abs(rx * uy - ry * ux) < slack:
+                fish.append((i, e))
+        t = t0
+        while fish and left <= x <= right and top <= y <= bottom and t < t0 + limit:
+            for i, e in fish:
+                p = _at(e, t)
+                if p and abs(p[0] - x) < e[HW] + half and abs(p[1] - y) < e[HH] + half:
+                    return t, i
+            x += vx
+            y += vy
+            t += 1
+            yield
+        return None
+
+    def _rollout(self, snap, hazards, plan, claimed):
+        #simula el bote tick por tick contra los peligros; plan = (tramo 1, tramo 2)
+        prefix = snap["prefix"]
+        horizon = self.horizon
+        left, top, right, bottom = snap["bounds"]
+        x, y, hw, hh, speed, hp = snap["boat"]
+        x, y = self._walk(snap, x, y, snap["move"], prefix)
+        score = 0.0
+        gone = set()
+        weight = 1.0
+        spawn = snap["spawn"]
+        risk = self.spawn_risk
+        for step in range(horizon):
+            t = prefix + step
+            dx, dy = plan[0] if step < horizon // 2 else plan[1]
+            x = min(max(x + dx * speed, left + hw), right - hw)
+            y = min(max(y + dy * speed, top + hh), bottom - hh)
+            for e in hazards:
+                if id(e) in gone:
+                    continue
+                p = _at(e, t)
+                if p and abs(p[0] - x) < e[HW] + hw and abs(p[1] - y) < e[HH] + hh:
+                    hp -= 1
+                    score -= self.damage_weight * weight
+                    if e[VALUE]:
+                        y = min(y + 15, bottom - hh)  # mordida: empuja al bote
+                    else:
+                        gone.add(id(e))  # el obstaculo se rompe
+                    if hp <= 0:
+                        score -= self.damage_weight * 20
+                        break
+            if hp <= 0:
+                break
+            if spawn and spawn[0] - hw < x < spawn[2] + hw and spawn[1] - hh < y < spawn[3] + hh:
+                score -= risk * weight
+            weight *= self.discount
+            yield
+        score += self._tail(snap, hazards, x, y, prefix + horizon, claimed) * weight
+        self.rollouts += 1
+        if self.best_score is None or score > self.best_score:
+            self.best_score = score
+            self.best_plan = plan
+        return score
+
+    def _tail(self, snap, hazards, x, y, t, claimed):
+        #al final del horizonte: mejor si queda alineado (fila, columna o diagonal) con un pez
+        #y lejos de lo que muerde (lo que aparezca despues del horizonte no se ve)
+        best = 0.0
+        for i, e in enumerate(snap["fish"]):
+            if i in claimed:
+                continue
+            p = _at(e, t)
+            if p is None:
+                continue
+            dx, dy = abs(p[0] - x), abs(p[1] - y)
+            miss = min(dx, dy, abs(dx - dy))
+            value = e[VALUE] * 0.5 * math.exp(-miss / 30) / (1 + math.hypot(dx, dy) / 400)
+            if value > best:
+                best = value
+        danger = 0.0
+        for e in hazards:
+            p = _at(e, t)
+            if p is None:
+                continue
+            gap = max(0.0, math.hypot(p[0] - x, p[1] - y) - e[HW] - e[HH])
+            danger = max(danger, math.exp(-gap / 40))
+        return best - self.damage_weight * 0.5 * danger
+
+    def report(self):
+        frames = max(1, self.frames)
+        mode = f"{self.units} units/frame" if self.units is not None else f"budget {self.budget_s * 1000:.2f} ms"
+        return (f"[cpu] {mode}: mean {self.think_s * 1000 / frames:.3f} ms, "
+                f"max {self.think_max * 1000:.3f} ms, {self.over_budget} frames over budget, "
+                f"{self.rollouts / max(1, self.decisions):.1f} rollouts/decision, {self.casts} casts")
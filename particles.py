@@ -0,0 +1,154 @@
+import math
+import time
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional; sin el no hay particulas
+    np = None
+
+
+#presets de emisores: cantidad, rango de velocidad (px/frame a 60fps), vida (ms), color, gravedad, cono
+EMITTERS = {
+    "splash": dict(count=36, speed=(1.0, 3.5), life=(250, 550), color=(200, 235, 255), gravity=0.12, spread=math.pi * 2),
+    "catch": dict(count=60, speed=(1.5, 4.5), life=(350, 750), color=(255, 215, 60), gravity=0.05, spread=math.pi * 2),
+    "hit": dict(count=50, speed=(2.0, 5.0), life=(250, 500), color=(255, 80, 60), gravity=0.0, spread=math.pi * 2),
+    "wake": dict(count=3, speed=(0.3, 1.0), life=(300, 700), color=(225, 245, 255), gravity=0.0, spread=math.pi / 3),
+}
+
+
+def available():
+    return np is not None
+
+
+class ParticleSystem:
+    #todas las particulas en arrays preasignados; las vivas estan compactadas al inicio
+
+    def __init__(self, capacity=16384, bounds=(0, 0, 900, 600), seed=None):
+        self.capacity = capacity
+        self.bounds = bounds
+        self.count = 0
+        #un solo bloque con una fila contigua por campo: x, y, vx, vy, life, max_life, gravity, r, g, b
+        #(el culling compacta una sola matriz en vez de un array por campo)
+        self.data = np.zeros((10, capacity), np.float32)
+        self.pos = self.data[0:2]
+        self.vel = self.data[2:4]
+        self.life = self.data[4]
+        self.max_life = self.data[5]
+        self.gravity = self.data[6]
+        self.color = self.data[7:10]
+        #rng propio: las particulas no tocan el random de la partida
+        self.rng = np.random.default_rng(seed)
+
+    def emit(self, name, x, y, direction=None, count=None):
+        preset = EMITTERS[name]
+        n = min(count or preset["count"], self.capacity - self.count)
+        if n <= 0:
+            return 0
+        s = slice(self.count, self.count + n)
+
+        base = 0.0 if direction is None else math.atan2(direction[1], direction[0])
+        angle = base + self.rng.uniform(-preset["spread"] / 2, preset["spread"] / 2, n)
+        speed = self.rng.uniform(*preset["speed"], n)
+        self.pos[0, s] = x
+        self.pos[1, s] = y
+        self.vel[0, s] = np.cos(angle) * speed
+        self.vel[1, s] = np.sin(angle) * speed
+        self.life[s] = self.rng.uniform(*preset["life"], n)
+        self.max_life[s] = self.life[s]
+        self.gravity[s] = preset["gravity"]
+        self.color[:, s] = np.array(preset["color"], np.float32)[:, None]
+        self.count += n
+        return n
+
+    def update(self, dt_ms):
+        n = self.count
+        if not n:
+            return
+        steps = dt_ms / (1000.0 / 60)  # velocidades estan en px por frame de 60fps
+        pos, vel = self.pos[:, :n], self.vel[:, :n]
+        vel[1] += self.gravity[:n] * steps
+        vel *= 0.985 ** steps
+        pos += vel * steps
+        self.life[:n] -= dt_ms
+
+        x0, y0, x1, y1 = self.bounds
+        alive = ((self.life[:n] > 0) & (pos[0] >= x0) & (pos[0] < x1)
+                 & (pos[1] >= y0) & (pos[1] < y1))
+        k = int(np.count_nonzero(alive))
+        if k == n:
+            return
+        self.data[:, :k] = self.data[:, :n][:, alive]
+        self.count = k
+
+    def draw(self, surface, offset_y=0):
+        #offset_y: top de la camara cuando las posiciones estan en coordenadas de mundo
+        n = self.count
+        if not n:
+            return
+        x = self.pos[0, :n].astype(np.intp)
+        y = self.pos[1, :n].astype(np.intp)
+        life = self.life[:n]
+        max_life = self.max_life[:n]
+        color = self.color[:, :n]
+        #siempre se recorta a la surface: con la camara arriba del rio offset_y es 0 y en
+        #coordenadas de mundo igual hay particulas mas abajo de la pantalla
+        y -= offset_y
+        w, h = surface.get_size()
+        keep = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+        if not keep.all():
+            x, y, life, max_life, color = x[keep], y[keep], life[keep], max_life[keep], color[:, keep]
+        #mezcla entera hacia el color de la particula segun la vida que le queda
+        fade = (life * 256 / max_life).astype(np.int32)
+        if surface.get_bytesize() != 4:
+            pixels = pygame.surfarray.pixels3d(surface)
+            under = pixels[x, y].astype(np.int32)
+            pixels[x, y] = under + (((color.T.astype(np.int32) - under) * fade[:, None]) >> 8)
+            del pixels  #suelta el lock de la surface
+            return
+        #32 bits: un solo gather/scatter de pixels mapeados, canales por shift
+        pixels = pygame.surfarray.pixels2d(surface)
+        under = pixels[x, y].astype(np.int64)
+        out = under & ~self._rgb_mask(surface)
+        for channel, shift in enumerate(surface.get_shifts()[:3]):
+            c = (under >> shift) & 255
+            c += ((color[channel].astype(np.int64) - c) * fade) >> 8
+            out |= c << shift
+        pixels[x, y] = out
+        del pixels
+
+    @staticmethod
+    def _rgb_mask(surface):
+        r, g, b, _ = surface.get_masks()
+        return r | g | b
+
+    def clear(self):
+        self.count = 0
+
+
+def benchmark(live=10000, frames=300):
+    surface = pygame.Surface((900, 600))
+    system = ParticleSystem(capacity=live * 2, seed=1)
+    update_ms = draw_ms = 0.0
+    for _ in range(frames):
+        #mantiene ~live particulas vivas reponiendo las que mueren
+        while system.count < live:
+            system.emit("catch", 450, 300, count=min(500, live - system.count))
+        start = time.perf_counter()
+        system.update(1000 / 60)
+        mid = time.perf_counter()
+        system.draw(surface)
+        end = time.perf_counter()
+        update_ms += (mid - start) * 1000
+        draw_ms += (end - mid) * 1000
+    return update_ms / frames, draw_ms / frames
+
+
+if __name__ == "__main__":
+    if not available():
+        raise SystemExit("numpy is required for particles")
+    for live in (1000, 5000, 10000):
+        update_ms, draw_ms = benchmark(live)
+        print(f"{live} particles: update {update_ms:.3f} ms, draw {draw_ms:.3f} ms, "
+              f"total {update_ms + draw_ms:.3f} ms/frame")
@@ -0,0 +1,254 @@
+import math
+import random
+import time
+
+from spatial import UniformGrid
+
+try:
+    import numpy as np
+except ImportError:  # sin numpy se usa el camino en python puro
+    np = None
+
+
+#steering de cardumenes: alineacion, cohesion y separacion entre peces del mismo tipo,
+#los depredadores persiguen peces amigos cercanos y los amigos huyen de ellos.
+#Vecinos por grid uniforme (celda = radio de consulta), nunca todos contra todos.
+#Cada pez necesita fx, fy (posicion float), vx, vy, speed (crucero) e is_predator
+
+
+class Schooling:
+    def __init__(self, radius=60, separation=24, chase_radius=140, align=0.05, cohesion=0.6,
+                 separate=0.5, chase=0.12, flee=0.25, max_force=0.3, use_numpy=True):
+        self.radius = radius
+        self.separation = separation
+        self.chase_radius = chase_radius
+        self.align = align
+        self.cohesion = cohesion
+        self.separate = separate
+        self.chase = chase
+        self.flee = flee
+        self.max_force = max_force
+        self.reach = max(radius, chase_radius)
+        self.grid = UniformGrid(self.reach)
+        self.use_numpy = use_numpy and np is not None
+
+    def apply(self, fishes):
+        #calcula la fuerza de cada pez y le deja la velocidad nueva en vx, vy
+        if not fishes:
+            return
+        if self.use_numpy:
+            self._apply_numpy(fishes)
+        else:
+            self._apply_python(fishes)
+
+    def _steer(self, fish, sx, sy):
+        #limita la fuerza y vuelve a la velocidad crucero del pez
+        limit = self.max_force * fish.speed
+        mag = math.hypot(sx, sy)
+        if mag > limit:
+            sx *= limit / mag
+            sy *= limit / mag
+        vx = fish.vx + sx
+        vy = fish.vy + sy
+        speed = math.hypot(vx, vy)
+        if speed > 0:
+            fish.vx = vx / speed * fish.speed
+            fish.vy = vy / speed * fish.speed
+
+    def _apply_python(self, fishes):
+        grid = self.grid
+        grid.rebuild(fishes)
+        radius2 = self.radius * self.radius
+        sep = self.separation
+        chase2 = self.chase_radius * self.chase_radius
+        forces = []
+        for fish in fishes:
+            x, y = fish.fx, fish.fy
+            count = 0
+            avx = avy = cx = cy = sx = sy = chx = chy = flx = fly = 0.0
+            for other in grid.query_radius(x, y, self.reach):
+                if other is fish:
+                    continue
+                dx = other.fx - x
+                dy = other.fy - y
+                d2 = dx * dx + dy * dy
+                if d2 == 0:
+                    continue
+                if other.is_predator == fish.is_predator:
+                    if d2 < radius2:
+                        count += 1
+                        avx += other.vx
+                        avy += other.vy
+                        cx += dx
+                        cy += dy
+                        d = math.sqrt(d2)
+                        if d < sep:
+                            push = (1 - d / sep) / d
+                            sx -= dx * push
+                            sy -= dy * push
+                elif d2 < chase2:
+                    d = math.sqrt(d2)
+                    if fish.is_predator:
+                        chx += dx / d
+                        chy += dy / d
+                    else:
+                        push = (1 - d / self.chase_radius) / d
+                        flx -= dx * push
+                        fly -= dy * push
+            forces.append(self._force(fish, count, avx, avy, cx, cy, sx, sy, chx, chy, flx, fly))
+        #se aplica despues de calcular todo, asi nadie ve velocidades ya actualizadas
+        for fish, (fx, fy) in zip(fishes, forces):
+            self._steer(fish, fx, fy)
+
+    def _force(self, fish, count, avx, avy, cx, cy, sx, sy, chx, chy, flx, fly):
+        fx = fy = 0.0
+        if count:
+            fx += self.align * (avx / count - fish.vx) + self.cohesion * cx / count / self.radius
+            fy += self.align * (avy / count - fish.vy) + self.cohesion * cy / count / self.radius
+        fx += self.separate * sx * fish.speed
+        fy += self.separate * sy * fish.speed
+        mag = math.hypot(chx, chy)
+        if mag > 0:
+            fx += self.chase * chx / mag * fish.speed
+            fy += self.chase * chy / mag * fish.speed
+        fx += self.flee * flx * fish.speed
+        fy += self.flee * fly * fish.speed
+        return fx, fy
+
+    def _pairs(self, px, py):
+        #pares (i, j) en celdas vecinas: orden por celda + searchsorted para cada una de las
+        #9 celdas alrededor, y los rangos se expanden con repeat/arange
+        n = len(px)
+        c = self.reach
+        cx = np.floor(px / c).astype(np.int64)
+        cy = np.floor(py / c).astype(np.int64)
+        cx -= cx.min()
+        cy -= cy.min()
+        width = int(cx.max()) + 3
+        key = (cy + 1) * width + (cx + 1)
+        order = np.argsort(key, kind="stable")
+        sorted_keys = key[order]
+        rows = np.arange(n)
+        left, right = [], []
+        for oy in (-1, 0, 1):
+            for ox in (-1, 0, 1):
+                neighbor = key + oy * width + ox
+                start = np.searchsorted(sorted_keys, neighbor, "left")
+                counts = np.searchsorted(sorted_keys, neighbor, "right") - start
+                total = int(counts.sum())
+                if not total:
+                    continue
+                offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                left.append(np.repeat(rows, counts))
+                right.append(order[np.repeat(start, counts) + offsets])
+        i = np.concatenate(left)
+        j = np.concatenate(right)
+        keep = i != j
+        return i[keep], j[keep]
+
+    def _apply_numpy(self, fishes):
+        n = len(fishes)
+        px = np.fromiter((f.fx for f in fishes), np.float64, n)
+        py = np.fromiter((f.fy for f in fishes), np.float64, n)
+        vx = np.fromiter((f.vx for f in fishes), np.float64, n)
+        vy = np.fromiter((f.vy for f in fishes), np.float64, n)
+        speed = np.fromiter((f.speed for f in fishes), np.float64, n)
+        pred = np.fromiter((f.is_predator for f in fishes), np.bool_, n)
+
+        i, j = self._pairs(px, py)
+        dx = px[j] - px[i]
+        dy = py[j] - py[i]
+        d2 = dx * dx + dy * dy
+        valid = d2 > 0
+        d = np.sqrt(np.where(valid, d2, 1.0))
+        same = pred[i] == pred[j]
+
+        def total(mask, values):
+            return np.bincount(i[mask], weights=values[mask], minlength=n)
+
+        flock = same & valid & (d2 < self.radius * self.radius)
+        count = np.bincount(i[flock], minlength=n)
+        safe = np.maximum(count, 1)
+        has = count > 0
+        fx = np.where(has, self.align * (total(flock, vx[j]) / safe - vx)
+                      + self.cohesion * total(flock, dx) / safe / self.radius, 0.0)
+        fy = np.where(has, self.align * (total(flock, vy[j]) / safe - vy)
+                      + self.cohesion * total(flock, dy) / safe / self.radius, 0.0)
+
+        close = flock & (d < self.separation)
+        push = (1 - d / self.separation) / d
+        fx -= self.separate * total(close, dx * push) * speed
+        fy -= self.separate * total(close, dy * push) * speed
+
+        near = ~same & valid & (d2 < self.chase_radius * self.chase_radius)
+        hunting = near & pred[i]
+        chx = total(hunting, dx / d)
+        chy = total(hunting, dy / d)
+        mag = np.hypot(chx, chy)
+        safe_mag = np.where(mag > 0, mag, 1.0)
+        fx += self.chase * chx / safe_mag * speed
+        fy += self.chase * chy / safe_mag * speed
+
+        fleeing = near & ~pred[i]
+        push = (1 - d / self.chase_radius) / d
+        fx -= self.flee * total(fleeing, dx * push) * speed
+        fy -= self.flee * total(fleeing, dy * push) * speed
+
+        #limite de fuerza y vuelta a la velocidad crucero
+        limit = self.max_force * speed
+        mag = np.hypot(fx, fy)
+        scale = np.where(mag > limit, limit / np.where(mag > 0, mag, 1.0), 1.0)
+        vx = vx + fx * scale
+        vy = vy + fy * scale
+        mag = np.hypot(vx, vy)
+        moving = mag > 0
+        vx = np.where(moving, vx / np.where(moving, mag, 1.0) * speed, vx)
+        vy = np.where(moving, vy / np.where(moving, mag, 1.0) * speed, vy)
+        for fish, nvx, nvy in zip(fishes, vx.tolist(), vy.tolist()):
+            fish.vx = nvx
+            fish.vy = nvy
+
+
+class _BenchFish:
+    __slots__ = ("rect", "fx", "fy", "vx", "vy", "speed", "is_predator")
+
+
+def _bench_school(n, rng, density):
+    #mundo que crece con n: la densidad (peces por pixel) se mantiene
+    import pygame
+    side = math.sqrt(n / density)
+    fishes = []
+    for _ in range(n):
+        f = _BenchFish()
+        f.fx = rng.uniform(0, side * 1.5)
+        f.fy = rng.uniform(0, side / 1.5)
+        angle = rng.uniform(0, math.tau)
+        f.speed = rng.uniform(2, 5)
+        f.vx = math.cos(angle) * f.speed
+        f.vy = math.sin(angle) * f.speed
+        f.is_predator = rng.random() < 0.15
+        f.rect = pygame.Rect(int(f.fx) - 20, int(f.fy) - 10, 40, 20)
+        fishes.append(f)
+    return fishes
+
+
+def benchmark(counts=(250, 500, 1000, 2000, 4000), frames=20, density=40 / (900 * 600)):
+    rng = random.Random(1)
+    modes = [("python", False)] + ([("numpy", True)] if np is not None else [])
+    for name, use_numpy in modes:
+        school = Schooling(use_numpy=use_numpy)
+        for n in counts:
+            fishes = _bench_school(n, rng, density)
+            start = time.perf_counter()
+            for _ in range(frames):
+                school.apply(fishes)
+                for f in fishes:
+                    f.fx += f.vx
+                    f.fy += f.vy
+                    f.rect.center = (f.fx, f.fy)
+            ms = (time.perf_counter() - start) * 1000 / frames
+            print(f"{name:>6} {n:5d} fish: {ms:8.2f} ms/frame, {ms * 1000 / n:6.2f} us/fish")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,491 @@
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import queue
+import random
+import sys
+import tempfile
+import time
+import zlib
+from collections import deque
+
+import pygame
+
+import headless
+from constants import FPS, REPORT_DIR, STATE_PLAYING
+from gcpolicy import freeze_loaded
+
+
+#servidor de partidas sin ventana ni audio para torneos: un proceso por core y en cada uno un
+#loop asyncio que avanza cientos de salas a FPS ticks por segundo (misma logica que el juego:
+#spawns, update_playing, colisiones y puntaje, con el reloj virtual de headless).
+#Cada sala vive en un solo worker (crc32 del nombre) y el cliente se conecta al unix socket
+#de ese worker. Protocolo: una linea JSON por mensaje
+#  cliente  -> {"join": "sala", "seed": 5, "endless": false}   seed y endless opcionales
+#              {"move": ["up", "left"], "cast": true}          teclas sostenidas y lanzar
+#  servidor -> {"joined": "sala", "slot": "P1"}, {"start": seed} cuando estan los dos,
+#              un snapshot cada --snapshot-every ticks y {"over": motivo, "score": [p1, p2]}
+#Las salas comparten el random del proceso: el seed sortea la partida pero no la repite
+#exacta (para repetir partidas esta headless.py)
+
+CAST_KEYS = {"P1": pygame.K_SPACE, "P2": pygame.K_RSHIFT}
+SEND_LIMIT = 256 * 1024  # si el cliente no lee, se saltean snapshots en vez de acumular
+
+
+def socket_path(directory, worker):
+    return os.path.join(directory, f"worker-{worker}.sock")
+
+
+def worker_for(room, workers):
+    return zlib.crc32(room.encode()) % workers
+
+
+def valid_message(message):
+    #un objeto JSON; move (si viene) es una lista de nombres y seed un entero
+    if not isinstance(message, dict):
+        return False
+    move = message.get("move", [])
+    if not isinstance(move, list) or not all(isinstance(name, str) for name in move):
+        return False
+    seed = message.get("seed")
+    return seed is None or isinstance(seed, int)
+
+
+def _quantile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * (len(values) - 1) + 0.5))] if values else 0.0
+
+
+class ClientInput:
+    #policy de headless armada con lo que mandan los clientes
+    def __init__(self):
+        self.casts = []
+
+    def act(self, game, frame, keys):
+        casts, self.casts = self.casts, []
+        return casts
+
+
+class Room:
+    def __init__(self, name, game, bucket, seed=None, endless=False, policy=None):
+        self.name = name
+        self.game = game
+        self.bucket = bucket
+        self.seed = seed
+        self.endless = endless
+        #sala de bots (carga sintetica): la policy mueve los dos botes, no hay clientes
+        self.bot = policy is not None
+        self.policy = policy or ClientInput()
+        self.clients = {"P1": None, "P2": None}
+        self.keys = None
+        self.frame = 0
+        self.started = False
+        self.closed = False
+        #jitter: cuanto se aleja cada intervalo entre ticks del periodo (ms)
+        self.jitter = deque(maxlen=FPS * 10)
+        self.last_step = None
+
+    def join(self, writer):
+        for slot in ("P1", "P2"):
+            if self.clients[slot] is None:
+                self.clients[slot] = writer
+                return slot
+        return None
+
+    def leave(self, slot):
+        self.clients[slot] = None
+
+    def full(self):
+        return all(self.clients.values())
+
+    def empty(self):
+        return not any(self.clients.values())
+
+    def start(self):
+        self.keys = headless.start_match(self.game, self.seed, self.endless)
+        self.frame = 0
+        self.started = True
+        self.last_step = None
+
+    def set_input(self, slot, message):
+        game = self.game
+        controls = game.controls_p1 if slot == "P1" else game.controls_p2
+        if "move" in message:
+            self.keys.down.difference_update(controls.values())
+            for name in message["move"]:
+                key = controls.get(name)
+                if key is not None:
+                    self.keys.down.add(key)
+        if message.get("cast"):
+            self.policy.casts.append(CAST_KEYS[slot])
+
+    def step(self, now, period):
+        if self.last_step is not None:
+            self.jitter.append(abs(now - self.last_step - period) * 1000)
+        self.last_step = now
+        headless.step_match(self.game, self.frame, self.policy, self.keys)
+        self.frame += 1
+
+    def snapshot(self):
+        game = self.game
+        return {
+            "tick": self.frame,
+            "time": round(game.elapsed_s if game.endless else game.time_left, 2),
+            "score": [game.score, game.score_p2],
+            "hp": [game.player.health, game.player2.health],
+            "boats": [list(game.player.rect.center), list(game.player2.rect.center)],
+            "fish": [[f.rect.centerx, f.rect.centery, int(f.is_predator)] for f in game.fish_group],
+            "obstacles": [list(o.rect.center) for o in game.obstacles],
+            "lures": [[l.rect.centerx, l.rect.centery, l.owner] for l in game.lures],
+        }
+
+
+class RoomServer:
+    def __init__(self, worker, workers, directory, slots=4, snapshot_every=3):
+        self.worker = worker
+        self.workers = workers
+        self.path = socket_path(directory, worker)
+        #una sola carga de assets por proceso; cada sala es un fork_game del template
+        self.template = headless.make_game()
+        freeze_loaded()
+        self.rooms = {}
+        #las salas se reparten en slots dentro de cada frame: el trabajo y la red se intercalan
+        self.buckets = [[] for _ in range(slots)]
+        self.snapshot_every = snapshot_every
+        self.stopping = False
+        self.clients = 0
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats_start = time.perf_counter()
+        self.busy_s = 0.0
+        self.ticks = 0
+        self.room_steps = 0
+        self.late = []
+        self.overruns = 0
+        self.matches = 0
+        self.skipped = 0
+
+    def add_room(self, name, seed=None, endless=False, policy=None):
+        bucket = min(range(len(self.buckets)), key=lambda i: len(self.buckets[i]))
+        room = Room(name, headless.fork_game(self.template), bucket, seed, endless, policy)
+        self.rooms[name] = room
+        self.buckets[bucket].append(room)
+        return room
+
+    def close_room(self, room):
+        room.closed = True
+        if self.rooms.get(room.name) is room:
+            del self.rooms[room.name]
+        if room in self.buckets[room.bucket]:
+            self.buckets[room.bucket].remove(room)
+
+    def _send(self, writer, message):
+        if writer is not None and not writer.is_closing():
+            writer.write((json.dumps(message) + "\n").encode())
+
+    def _broadcast(self, room, message, droppable=False):
+        data = None
+        for writer in room.clients.values():
+            if writer is None or writer.is_closing():
+                continue
+            if droppable and writer.transport.get_write_buffer_size() > SEND_LIMIT:
+                self.skipped += 1
+                continue
+            if data is None:
+                data = (json.dumps(message) + "\n").encode()
+            writer.write(data)
+
+    async def handle_client(self, reader, writer):
+        self.clients += 1
+        room = slot = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    self._send(writer, {"error": "bad json"})
+                    continue
+                if not valid_message(message):
+                    self._send(writer, {"error": "bad message"})
+                    continue
+                if room is not None and room.closed:
+                    room = slot = None  # termino la partida: el siguiente mensaje puede ser otro join
+                if room is not None:
+                    if room.started:
+                        room.set_input(slot, message)
+                    continue
+                name = message.get("join")
+                if not isinstance(name, str) or not name:
+                    self._send(writer, {"error": "join first"})
+                    continue
+                owner = worker_for(name, self.workers)
+                if owner != self.worker:
+                    self._send(writer, {"error": "wrong worker", "worker": owner})
+                    continue
+                room = self.rooms.get(name)
+                if room is None:
+                    room = self.add_room(name, message.get("seed"), bool(message.get("endless")))
+                slot = room.join(writer) if not room.bot else None
+                if slot is None:
+                    self._send(writer, {"error": "room full"})
+                    room = None
+                    continue
+                self._send(writer, {"joined": name, "slot": slot})
+                if room.full() and not room.started:
+                    room.start()
+                    self._broadcast(room, {"start": room.game.match_seed})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients -= 1
+            if room is not None and not room.closed:
+                room.leave(slot)
+                if room.empty():
+                    self.close_room(room)
+            writer.close()
+
+    def _finish(self, room):
+        game = room.game
+        self.matches += 1
+        self._broadcast(room, {"over": game.game_over_reason, "score": [game.score, game.score_p2],
+                               "ticks": room.frame})
+        if room.bot:
+            room.seed = None
+            room.start()
+        else:
+            #la sala queda libre; los clientes siguen conectados y mandan join para otra partida
+            self.close_room(room)
+
+    async def tick_loop(self, report, stop, report_s):
+        loop = asyncio.get_running_loop()
+        period = 1 / FPS
+        slot_period = period / len(self.buckets)
+        next_t = loop.time()
+        next_report = next_t + report_s
+        slot = 0
+        while not self.stopping:
+            next_t += slot_period
+            delay = next_t - loop.time()
+            #siempre se cede el loop aunque vayamos tarde, asi la red no se queda sin turno
+            await asyncio.sleep(max(0.0, delay))
+            now = loop.time()
+            if now - next_t > period:
+                #mas de un frame atrasado: se pierde el tiempo en vez de encadenar ticks
+                self.overruns += 1
+                next_t = now
+            begin = time.perf_counter()
+            for room in tuple(self.buckets[slot]):  # _finish puede cerrar salas
+                if not room.started:
+                    continue
+                tick_now = loop.time()
+                self.late.append((tick_now - next_t) * 1000)
+                room.step(tick_now, period)
+                self.room_steps += 1
+                if room.game.state != STATE_PLAYING:
+                    self._finish(room)
+                elif room.frame % self.snapshot_every == 0 and not room.bot:
+                    self._broadcast(room, room.snapshot(), droppable=True)
+            self.busy_s += time.perf_counter() - begin
+            slot = (slot + 1) % len(self.buckets)
+            if slot == 0:
+                self.ticks += 1
+            if now >= next_report:
+                next_report = now + report_s
+                report.put(self.stats())
+                self._reset_stats()
+                if stop.is_set():
+                    self.stopping = True
+
+    def stats(self):
+        wall = time.perf_counter() - self.stats_start
+        busy = self.busy_s / wall if wall else 0.0
+        #capacidad: salas que entrarian en un core al 100% con el costo medio por tick de esta ventana
+        per_core = self.room_steps / wall / FPS / busy if wall and busy else None
+        playing = [r for r in self.rooms.values() if r.started]
+        worst = sorted(((_quantile(r.jitter, 0.99), r.name) for r in playing), reverse=True)
+        return {
+            "worker": self.worker,
+            "rooms": len(playing),
+            "clients": self.clients,
+            "ticks_per_s": round(self.ticks / wall, 1) if wall else 0.0,
+            "busy": round(busy, 4),
+            "rooms_per_core": round(per_core) if per_core else None,
+            "late_p50_ms": round(_quantile(self.late, 0.5), 3),
+            "late_p99_ms": round(_quantile(self.late, 0.99), 3),
+            "jitter_p99_ms": {name: round(ms, 3) for ms, name in worst},
+            "overruns": self.overruns,
+            "matches": self.matches,
+            "skipped_snapshots": self.skipped,
+        }
+
+    async def serve(self, report, stop, report_s, bot_rooms):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self.handle_client, path=self.path)
+        for i in range(bot_rooms):
+            room = self.add_room(f"bot-{self.worker}-{i}", policy=headless.RandomPolicy(i))
+            room.start()
+        try:
+            await self.tick_loop(report, stop, report_s)
+        finally:
+            server.close()
+            await server.wait_closed()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+def _worker_main(worker, workers, directory, bot_rooms, report_s, slots, snapshot_every, report, stop):
+    server = RoomServer(worker, workers, directory, slots, snapshot_every)
+    try:
+        asyncio.run(server.serve(report, stop, report_s, bot_rooms))
+    except KeyboardInterrupt:
+        pass
+
+
+def _print_report(stats, log):
+    workers = sorted(stats.values(), key=lambda s: s["worker"])
+    for s in workers:
+        jitter = s["jitter_p99_ms"]
+        worst = ", ".join(f"{name} {ms:.2f}" for name, ms in list(jitter.items())[:3]) or "-"
+        per_core = s["rooms_per_core"] if s["rooms_per_core"] is not None else "n/a"
+        print(f"[server] worker {s['worker']}: {s['rooms']} rooms, {s['clients']} clients, "
+              f"{s['ticks_per_s']} ticks/s, busy {s['busy']:.1%} -> ~{per_core} rooms/core, "
+              f"late p50 {s['late_p50_ms']:.2f} / p99 {s['late_p99_ms']:.2f} ms, "
+              f"worst room jitter p99 {worst} ms, overruns {s['overruns']}")
+    rooms = sum(s["rooms"] for s in workers)
+    capacity = [s["rooms_per_core"] for s in workers if s["rooms_per_core"]]
+    if capacity:
+        print(f"[server] {rooms} rooms on {len(workers)} workers, "
+              f"~{min(capacity)} rooms/core at {FPS} ticks/s (worst worker)")
+    if log:
+        log.write(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "workers": workers}) + "\n")
+        log.flush()
+
+
+def serve(args):
+    os.makedirs(args.socket_dir, exist_ok=True)
+    ctx = mp.get_context("spawn")
+    report = ctx.Queue()
+    stop = ctx.Event()
+    bots = [args.bot_rooms // args.workers + (i < args.bot_rooms % args.workers) for i in range(args.workers)]
+    procs = [ctx.Process(target=_worker_main, name=f"room-worker-{i}",
+                         args=(i, args.workers, args.socket_dir, bots[i], args.report_s,
+                               args.slots, args.snapshot_every, report, stop), daemon=True)
+             for i in range(args.workers)]
+    for proc in procs:
+        proc.start()
+    print(f"[server] {args.workers} workers listening on {socket_path(args.socket_dir, '*')}")
+
+    log = None
+    if args.log:
+        os.makedirs(os.path.dirname(args.log) or ".", exist_ok=True)
+        log = open(args.log, "a")
+    deadline = time.monotonic() + args.duration if args.duration else None
+    latest = {}
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                stats = report.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in procs):
+                    break
+                continue
+            latest[stats["worker"]] = stats
+            if len(latest) == len(procs):
+                _print_report(latest, log)
+                latest = {}
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for proc in procs:
+            proc.join(args.report_s + 2)
+            if proc.is_alive():
+                proc.terminate()
+        if log:
+            log.close()
+    return 0
+
+
+async def _load_client(directory, workers, room, rng, counts, until):
+    #cliente de prueba: entra a la sala, cambia de direccion y lanza al azar
+    reader, writer = await asyncio.open_unix_connection(socket_path(directory, worker_for(room, workers)))
+    writer.write((json.dumps({"join": room}) + "\n").encode())
+
+    async def read():
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            if "over" in message:
+                counts["matches"] += 1
+                writer.write((json.dumps({"join": room}) + "\n").encode())
+            counts["messages"] += 1
+
+    reading = asyncio.ensure_future(read())
+    loop = asyncio.get_running_loop()
+    try:
+        while loop.time() < until and not reading.done():
+            move = rng.choice(([], ["up"], ["down"], ["left"], ["right"]))
+            writer.write((json.dumps({"move": move, "cast": rng.random() < 0.3}) + "\n").encode())
+            await asyncio.sleep(rng.uniform(0.1, 0.5))
+    finally:
+        reading.cancel()
+        writer.close()
+
+
+async def _load(args):
+    loop = asyncio.get_running_loop()
+    until = loop.time() + args.duration
+    counts = {"messages": 0, "matches": 0}
+    rng = random.Random(args.seed)
+    clients = [_load_client(args.socket_dir, args.workers, f"load-{i}", random.Random(rng.random()), counts, until)
+               for i in range(args.rooms) for _ in range(2)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*clients, return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    elapsed = time.perf_counter() - start
+    print(f"[load] {args.rooms} rooms / {len(clients)} clients for {elapsed:.1f}s: "
+          f"{counts['messages'] / elapsed:.0f} messages/s received, {counts['matches']} match ends, "
+          f"{len(errors)} client errors")
+    if errors:
+        print(f"[load] first error: {errors[0]!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless multi-room match server for Lucky Lures")
+    parser.add_argument("--socket-dir", default=os.path.join(tempfile.gettempdir(), "lucky_lures"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="server processes (one per core)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("serve", help="run the room server")
+    run.add_argument("--bot-rooms", type=int, default=0,
+                     help="rooms played by server-side bots (synthetic load, spread over workers)")
+    run.add_argument("--duration", type=float, default=0, help="seconds, 0 = until Ctrl+C")
+    run.add_argument("--report-s", type=float, default=5.0)
+    run.add_argument("--slots", type=int, default=4, help="tick slots per frame the rooms are spread over")
+    run.add_argument("--snapshot-every", type=int, default=3, help="ticks between state snapshots")
+    run.add_argument("--log", default=os.path.join(REPORT_DIR, "server.jsonl"),
+                     help="JSON line per report with per-room jitter ('' to disable)")
+
+    load = commands.add_parser("load", help="connect test clients to a running server")
+    load.add_argument("--rooms", type=int, default=50)
+    load.add_argument("--duration", type=float, default=30)
+    load.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return serve(args)
+    asyncio.run(_load(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
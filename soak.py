@@ -0,0 +1,150 @@
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import headless
+from constants import FPS, STATE_PLAYING
+
+
+#soak del modo endless: horas de juego headless, falla si memoria, entidades o frame time derivan
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _quarters(values):
+    n = max(1, len(values) // 4)
+    return values[:n], values[-n:]
+
+
+def check(windows, mem_growth_mb, entity_growth, frame_growth):
+    #compara el primer cuarto (despues del warmup) con el ultimo
+    failures = []
+    first, last = _quarters(windows)
+
+    py_first = statistics.fmean(w["py_bytes"] for w in first)
+    py_last = statistics.fmean(w["py_bytes"] for w in last)
+    if (py_last - py_first) / 1e6 > mem_growth_mb:
+        failures.append(f"python heap grew {(py_last - py_first) / 1e6:.2f} MB")
+
+    rss_first = statistics.fmean(w["rss"] for w in first)
+    rss_last = statistics.fmean(w["rss"] for w in last)
+    if (rss_last - rss_first) / 1e6 > mem_growth_mb:
+        failures.append(f"RSS grew {(rss_last - rss_first) / 1e6:.2f} MB")
+
+    for key in ("fish", "obstacles", "sprites"):
+        a = statistics.fmean(w[key] for w in first)
+        b = statistics.fmean(w[key] for w in last)
+        if b > a * entity_growth + 2:
+            failures.append(f"{key} grew from {a:.1f} to {b:.1f} on average")
+
+    p99_first = statistics.median(w["p99_ms"] for w in first)
+    p99_last = statistics.median(w["p99_ms"] for w in last)
+    if p99_last > p99_first * frame_growth + 0.2:
+        failures.append(f"p99 step time went from {p99_first:.2f} to {p99_last:.2f} ms")
+    return failures
+
+
+def run(hours, seed, policy_name, window_s, warmup_s, log_every, collect=False):
+    game = headless.make_game()
+    policy = headless.POLICIES[policy_name](seed)
+    keys = headless.start_match(game, seed, endless=True)
+    #invulnerables: el soak mide estabilidad, no supervivencia
+    game.player.health = game.player2.health = 10 ** 9
+    #start_match pone PLAYING sin pasar por step: la politica de gc se avisa aca, asi con
+    #GC_GAMEPLAY_MODE el soak corre con el gc ciclico apagado como una partida real
+    game.gc_policy.on_state(True)
+    try:
+        return _soak(game, policy, keys, hours, window_s, warmup_s, log_every, collect)
+    finally:
+        game.gc_policy.on_state(False)
+
+
+def _soak(game, policy, keys, hours, window_s, warmup_s, log_every, collect):
+    tracemalloc.start()
+    total_frames = int(hours * 3600 * FPS)
+    window_frames = int(window_s * FPS)
+    warmup_frames = int(warmup_s * FPS)
+    windows = []
+    times = []
+    counts = {"fish": 0, "obstacles": 0, "sprites": 0}
+    wall_start = time.perf_counter()
+
+    for frame in range(total_frames):
+        start = time.perf_counter()
+        headless.step_match(game, frame, policy, keys)
+        times.append((time.perf_counter() - start) * 1000)
+        if game.state != STATE_PLAYING:
+            return [f"match left PLAYING at frame {frame}: {game.game_over_reason}"], windows
+
+        counts["fish"] += len(game.fish_group)
+        counts["obstacles"] += len(game.obstacles)
+        counts["sprites"] += len(game.all_sprites)
+
+        if (frame + 1) % window_frames == 0:
+            if frame >= warmup_frames:
+                #collect antes de medir solo si se pide: sin el se ve la basura que junta el
+                #juego con el gc apagado
+                if collect:
+                    gc.collect()
+                times.sort()
+                windows.append({
+                    "t_s": (frame + 1) / FPS,
+                    "py_bytes": tracemalloc.get_traced_memory()[0],
+                    "rss": rss_bytes(),
+                    "p99_ms": times[int(0.99 * (len(times) - 1))],
+                    **{k: v / window_frames for k, v in counts.items()},
+                })
+                if log_every and len(windows) % log_every == 0:
+                    w = windows[-1]
+                    print(f"[soak] {w['t_s'] / 3600:.2f} h game time, {time.perf_counter() - wall_start:.0f} s wall: "
+                          f"fish {w['fish']:.1f} obstacles {w['obstacles']:.1f} "
+                          f"py {w['py_bytes'] / 1e6:.2f} MB rss {w['rss'] / 1e6:.1f} MB p99 {w['p99_ms']:.2f} ms")
+            times = []
+            counts = dict.fromkeys(counts, 0)
+
+    return None, windows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Endless-mode soak test (headless)")
+    parser.add_argument("--hours", type=float, default=2.0, help="game time to simulate")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--policy", default="random", choices=sorted(headless.POLICIES))
+    parser.add_argument("--window", type=float, default=60.0, help="seconds per sample window")
+    parser.add_argument("--warmup", type=float, default=300.0, help="seconds ignored at the start")
+    parser.add_argument("--max-mem-growth-mb", type=float, default=2.0)
+    parser.add_argument("--max-entity-growth", type=float, default=1.25)
+    parser.add_argument("--max-frame-growth", type=float, default=1.5)
+    parser.add_argument("--log-every", type=int, default=10, help="windows between progress lines")
+    parser.add_argument("--collect", action="store_true",
+                        help="gc.collect() before each sample (hides garbage the paused gc would keep)")
+    args = parser.parse_args(argv)
+
+    failures, windows = run(args.hours, args.seed, args.policy, args.window, args.warmup, args.log_every,
+                            args.collect)
+    if failures is None:
+        if len(windows) < 4:
+            failures = ["run too short to compare (need at least 4 windows after warmup)"]
+        else:
+            failures = check(windows, args.max_mem_growth_mb, args.max_entity_growth, args.max_frame_growth)
+    if failures:
+        for failure in failures:
+            print(f"[soak] FAIL: {failure}")
+        return 1
+    print(f"[soak] OK: {len(windows)} windows, steady memory, entity counts and step times")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import math
+
+
+class UniformGrid:
+    #grid uniforme de celdas cell x cell; cada sprite entra en todas las celdas que toca su rect.
+    #se reconstruye una vez por frame (pocos sprites, insertar es barato)
+
+    def __init__(self, cell=64):
+        self.cell = cell
+        self.cells = {}
+        #buffers reusados entre consultas (el resultado vale hasta la siguiente consulta)
+        self._found = {}
+        self._visited = set()
+        self._result = []
+
+    def rebuild(self, sprites):
+        #las listas de cada celda se vacian y se reusan; las que ya estaban vacias (sin sprites
+        #el frame anterior) se sueltan, asi en el rio el dict no crece con cada celda visitada
+        c = self.cell
+        cells = self.cells
+        for key in [key for key, bucket in cells.items() if not bucket]:
+            del cells[key]
+        for bucket in cells.values():
+            bucket.clear()
+        for sprite in sprites:
+            r = sprite.rect
+            for cx in range(r.left // c, (r.right - 1) // c + 1):
+                for cy in range(r.top // c, (r.bottom - 1) // c + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket is None:
+                        cells[(cx, cy)] = [sprite]
+                    else:
+                        bucket.append(sprite)
+
+    def query_segment(self, start, end, pad=0):
+        #sprites en celdas que toca el segmento engordado pad px; el costo depende del largo
+        #del segmento, no de cuantos sprites hay. Orden estable (orden de insercion)
+        c = self.cell
+        x0, y0 = start
+        x1, y1 = end
+        steps = max(1, int(math.hypot(x1 - x0, y1 - y0) / (c / 2)) + 1)
+        reach = pad + c / 4  # cubre el tramo entre dos muestras
+        found = self._found
+        visited = self._visited
+        found.clear()
+        visited.clear()
+        for i in range(steps + 1):
+            x = x0 + (x1 - x0) * i / steps
+            y = y0 + (y1 - y0) * i / steps
+            for cx in range(int((x - reach) // c), int((x + reach) // c) + 1):
+                for cy in range(int((y - reach) // c), int((y + reach) // c) + 1):
+                    if (cx, cy) in visited:
+                        continue
+                    visited.add((cx, cy))
+                    for sprite in self.cells.get((cx, cy), ()):
+                        found[sprite] = None
+        result = self._result
+        result.clear()
+        result.extend(found)
+        return result
+
+    def query_radius(self, x, y, r):
+        #sprites en las celdas que toca el cuadrado de lado 2r alrededor de (x, y);
+        #el que llama filtra por distancia real. Mismo buffer que query_segment
+        c = self.cell
+        found = self._found
+        found.clear()
+        cells = self.cells
+        for cx in range(int((x - r) // c), int((x + r) // c) + 1):
+            for cy in range(int((y - r) // c), int((y + r) // c) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for sprite in bucket:
+                        found[sprite] = None
+        result = self._result
+        result.clear()
+        result.extend(found)
+        return result
@@ -0,0 +1,444 @@
+import queue
+import struct
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import pygame
+
+import assets
+from constants import (
+    FPS,
+    STATE_GAME_OVER,
+    STATE_MENU,
+    STATE_PAUSED,
+    STATE_PLAYING,
+)
+
+
+#modo de dos procesos: simulacion escribe el estado en un ring de shared memory,
+#el proceso principal lee el ultimo estado completo y dibuja
+
+STATES = (STATE_MENU, STATE_PLAYING, STATE_PAUSED, STATE_GAME_OVER)
+REASONS = ("", "Time's up!", "Both boats were wrecked!")
+
+KIND_P1, KIND_P2, KIND_FISH, KIND_OBSTACLE, KIND_LURE = range(5)
+FLAG_P2 = 1
+
+MAX_ENTITIES = 512
+SLOTS = 4
+INPUT_SLOTS = 256
+EV_KEYDOWN, EV_QUIT = 1, 2
+
+#control: ultimo frame publicado, stop, mascara de teclas, indices del canal de input
+CONTROL = struct.Struct("<qqqqq")
+INPUT = struct.Struct("<ii")
+#slot: seq, estado, razon, hp1, hp2, n, time_left, scores, sonidos, tick, ticks/s, semilla,
+#tiempo jugado, endless
+HEADER = struct.Struct("<QBBbbHfiiIIQfqfB")
+RECORD = struct.Struct("<BBHii")
+
+INPUT_OFFSET = CONTROL.size
+SLOTS_OFFSET = INPUT_OFFSET + INPUT.size * INPUT_SLOTS
+SLOT_SIZE = HEADER.size + RECORD.size * MAX_ENTITIES
+TOTAL_SIZE = SLOTS_OFFSET + SLOT_SIZE * SLOTS
+
+
+class SharedStateRing:
+    #un escritor (sim) y un lector (render) por slot; seqlock por slot, sin locks
+
+    def __init__(self, name=None):
+        create = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=TOTAL_SIZE if create else 0)
+        self.buf = self.shm.buf
+        self.frame = 0
+        if create:
+            self.buf[:TOTAL_SIZE] = bytes(TOTAL_SIZE)
+            self._set_control(latest=-1)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self, unlink=False):
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+    #control
+    def control(self):
+        return CONTROL.unpack_from(self.buf, 0)
+
+    def _set_control(self, latest=None, stop=None, keymask=None, in_write=None, in_read=None):
+        current = list(self.control())
+        for i, value in enumerate((latest, stop, keymask, in_write, in_read)):
+            if value is not None:
+                current[i] = value
+        CONTROL.pack_into(self.buf, 0, *current)
+
+    #estado (sim -> render)
+    def publish(self, header, records):
+        self.frame += 1
+        offset = SLOTS_OFFSET + (self.frame % SLOTS) * SLOT_SIZE
+        count = min(len(records), MAX_ENTITIES)
+
+        struct.pack_into("<Q", self.buf, offset, 2 * self.frame - 1)  # escribiendo
+        HEADER.pack_into(self.buf, offset, 2 * self.frame - 1, *header[:4], count, *header[4:])
+        pos = offset + HEADER.size
+        for rec in records[:count]:
+            RECORD.pack_into(self.buf, pos, *rec)
+            pos += RECORD.size
+        struct.pack_into("<Q", self.buf, offset, 2 * self.frame)  # completo
+        struct.pack_into("<q", self.buf, 0, self.frame)
+
+    def read_latest(self, last_frame):
+        #devuelve (frame, header, records) o None si no hay nada nuevo/consistente
+        frame = struct.unpack_from("<q", self.buf, 0)[0]
+        if frame <= last_frame:
+            return None
+        offset = SLOTS_OFFSET + (frame % SLOTS) * SLOT_SIZE
+        header = HEADER.unpack_from(self.buf, offset)
+        if header[0] != 2 * frame:
+            return None
+        count = header[5]
+        data = bytes(self.buf[offset + HEADER.size: offset + HEADER.size + count * RECORD.size])
+        if struct.unpack_from("<Q", self.buf, offset)[0] != header[0]:
+            return None  # el escritor dio la vuelta mientras copiabamos
+        return frame, header, list(RECORD.iter_unpack(data))
+
+    #input (render -> sim), spsc: cada lado solo escribe su indice
+    def push_input(self, kind, key=0):
+        _, _, _, in_write, in_read = self.control()
+        if in_write - in_read >= INPUT_SLOTS:
+            return False
+        INPUT.pack_into(self.buf, INPUT_OFFSET + (in_write % INPUT_SLOTS) * INPUT.size, kind, key)
+        struct.pack_into("<q", self.buf, 24, in_write + 1)
+        return True
+
+    def drain_input(self):
+        _, _, _, in_write, in_read = self.control()
+        items = [INPUT.unpack_from(self.buf, INPUT_OFFSET + (i % INPUT_SLOTS) * INPUT.size)
+                 for i in range(in_read, in_write)]
+        struct.pack_into("<q", self.buf, 32, in_write)
+        return items
+
+    def set_keymask(self, mask):
+        struct.pack_into("<q", self.buf, 16, mask)
+
+    def keymask(self):
+        return struct.unpack_from("<q", self.buf, 16)[0]
+
+    def request_stop(self):
+        struct.pack_into("<q", self.buf, 8, 1)
+
+    def stop_requested(self):
+        return struct.unpack_from("<q", self.buf, 8)[0] != 0
+
+
+def control_keys(game):
+    #teclas de movimiento en orden fijo -> bit
+    return [k for controls in (game.controls_p1, game.controls_p2) for k in controls.values()]
+
+
+class _MaskKeys:
+    def __init__(self, keys, mask):
+        self.bits = {k: bool(mask >> i & 1) for i, k in enumerate(keys)}
+
+    def __getitem__(self, key):
+        return self.bits.get(key, False)
+
+
+class _SoundCounter:
+    #reemplaza los sonidos en la sim; el render los toca cuando sube el contador
+    def __init__(self):
+        self.count = 0
+
+    def play(self):
+        self.count += 1
+
+
+class ImageRegistry:
+    #id estable por imagen, descrito como derivacion de un asset (flip/rot/scale)
+
+    def __init__(self, game, updates=None):
+        self.game = game
+        self.updates = updates
+        self.ids = {}
+        self.next_id = 1
+        self.surfaces = {}
+        self.asset_keys = {}
+        for attr in ("boat_image", "lure_image", "sunken_image", "friendly_fish_images",
+                     "predator_fish_images", "obstacle_frames"):
+            value = getattr(game, attr)
+            if isinstance(value, list):
+                for i, surface in enumerate(value):
+                    self.asset_keys.setdefault(id(surface), ("asset", attr, i))
+            elif value is not None:
+                self.asset_keys.setdefault(id(value), ("asset", attr))
+
+    def key_for(self, surface):
+        key = self.asset_keys.get(id(surface))
+        if key:
+            return key
+        for (kind, *params), (source, result) in assets._variant_cache.items():
+            if result is not surface:
+                continue
+            if kind == "solid":
+                return ("solid", *params)
+            return (kind, self.key_for(source), *params[1:])
+        raise KeyError("image is not derived from a loaded asset")
+
+    def id_for(self, surface):
+        entry = self.ids.get(id(surface))
+        if entry is not None and entry[0] is surface:
+            return entry[1]
+        img_id = self.next_id
+        self.next_id += 1
+        self.ids[id(surface)] = (surface, img_id)
+        if self.updates is not None:
+            self.updates.put((img_id, self.key_for(surface)))
+        return img_id
+
+    def resolve(self, key):
+        kind = key[0]
+        if kind == "asset":
+            value = getattr(self.game, key[1])
+            return value[key[2]] if len(key) > 2 else value
+        if kind == "solid":
+            return assets.solid_image(*key[1:])
+        parent = self.resolve(key[1])
+        if kind == "flip":
+            return assets.flipped(parent)
+        if kind == "rot":
+            return assets.rotated(parent, key[2])
+        return assets.scaled(parent, key[2])
+
+    def add(self, img_id, key):
+        self.surfaces[img_id] = self.resolve(key)
+
+
+def _snapshot(game, registry, tick, tps):
+    records = []
+    for sprite in game.all_sprites:
+        if sprite is game.player:
+            kind, flags = KIND_P1, 0
+        elif sprite is game.player2:
+            kind, flags = KIND_P2, 0
+        elif sprite in game.fish_group:
+            kind, flags = KIND_FISH, 0
+        elif sprite in game.lures:
+            kind, flags = KIND_LURE, FLAG_P2 if sprite.owner == "P2" else 0
+        else:
+            kind, flags = KIND_OBSTACLE, 0
+        records.append((kind, flags, registry.id_for(sprite.image), sprite.rect.x, sprite.rect.y))
+
+    reason = REASONS.index(game.game_over_reason) if game.game_over_reason in REASONS else 0
+    header = (
+        STATES.index(game.state), reason,
+        game.player.health if game.player else -1,
+        game.player2.health if game.player2 else -1,
+        game.time_left, game.score, game.score_p2,
+        game.splash_snd.count, game.hit_snd.count, tick, tps,
+        game.match_seed if game.match_seed is not None else -1,
+        game.elapsed_s, game.endless,
+    )
+    return header, records
+
+
+def simulation_process(ring_name, updates, uncapped):
+    from game import LuckyLuresGame
+
+    ring = SharedStateRing(ring_name)
+    game = LuckyLuresGame(headless=True)
+    game.splash_snd = _SoundCounter()
+    game.hit_snd = _SoundCounter()
+    game.game_over_snd = None
+    keys = control_keys(game)
+    game.read_keys = lambda: _MaskKeys(keys, ring.keymask())
+    registry = ImageRegistry(game, updates)
+
+    clock = pygame.time.Clock()
+    tick = 0
+    window_start, window_ticks, tps = time.perf_counter(), 0, 0.0
+    while not ring.stop_requested():
+        dt_ms = clock.tick() if uncapped else clock.tick(FPS)
+        if uncapped:
+            dt_ms = 1000 // FPS  #la sim sigue avanzando a paso fijo
+
+        events = []
+        for kind, key in ring.drain_input():
+            if kind == EV_QUIT:
+                events.append(pygame.event.Event(pygame.QUIT))
+            else:
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+        if not game.step(events, dt_ms):
+            break
+
+        tick += 1
+        window_ticks += 1
+        now = time.perf_counter()
+        if now - window_start >= 1.0:
+            tps = window_ticks / (now - window_start)
+            window_start, window_ticks = now, 0
+        header, records = _snapshot(game, registry, tick, tps)
+        ring.publish(header, records)
+
+    ring.request_stop()
+    ring.close()
+    game.close()
+    pygame.quit()
+
+
+class _Proxy(pygame.sprite.Sprite):
+    #sprite minimo que el render reconstruye desde un record
+    def __init__(self):
+        super().__init__()
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.owner = "P1"
+        self.health = 0
+
+
+def run_split(game, uncapped=False, report_every_s=5.0):
+    #game es el LuckyLuresGame del proceso principal (ventana, audio, fonts)
+    #la telemetria la escribe la sim; aca record_match dejaria cada match_end dos veces
+    if game.telemetry:
+        game.telemetry.close()
+        game.telemetry = None
+    ctx = mp.get_context("spawn")
+    ring = SharedStateRing()
+    updates = ctx.Queue()
+    sim = ctx.Process(target=simulation_process, args=(ring.name, updates, uncapped), daemon=True)
+    sim.start()
+
+    registry = ImageRegistry(game)
+    keys = control_keys(game)
+    pool = []
+    last_frame = 0
+    last_state = STATE_MENU
+    splash_seen = hit_seen = 0
+    header = None
+
+    frames = 0
+    window_start = time.perf_counter()
+    fps = 0.0
+    last_report = window_start
+
+    running = True
+    while running and sim.is_alive():
+        if not uncapped:
+            game.clock.tick(FPS)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                ring.push_input(EV_QUIT)
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                ring.push_input(EV_KEYDOWN, event.key)
+        pressed = pygame.key.get_pressed()
+        ring.set_keymask(sum(1 << i for i, k in enumerate(keys) if pressed[k]))
+
+        while True:
+            try:
+                registry.add(*updates.get_nowait())
+            except queue.Empty:
+                break
+
+        latest = ring.read_latest(last_frame)
+        if latest is not None:
+            frame, header, records = latest
+            if all(rec[2] in registry.surfaces for rec in records):
+                last_frame = frame
+                _apply(game, header, records, registry, pool)
+                if game.river:
+                    game.river.follow((game.player, game.player2))
+
+        if header is None:
+            game.draw_menu()
+        else:
+            if game.state != last_state:
+                _on_state_change(game, last_state)
+                last_state = game.state
+            splash_seen = _play_new(game.splash_snd, header[9], splash_seen)
+            hit_seen = _play_new(game.hit_snd, header[10], hit_seen)
+            game.draw()
+            if uncapped:
+                text = game.font_small.render(f"sim {header[12]:.0f} t/s  render {fps:.0f} fps",
+                                              True, (255, 255, 255))
+                game.screen.blit(text, (10, 60))
+        pygame.display.flip()
+        if game.capture:
+            game.capture.grab(game.screen)
+        if not game.first_paint_done:
+            game.after_first_paint()
+
+        frames += 1
+        now = time.perf_counter()
+        if now - window_start >= 1.0:
+            fps = frames / (now - window_start)
+            window_start, frames = now, 0
+        if now - last_report >= report_every_s and header is not None:
+            last_report = now
+            print(f"[split] sim {header[12]:.1f} ticks/s, render {fps:.1f} frames/s")
+
+    ring.request_stop()
+    sim.join(timeout=2.0)
+    if header is not None:
+        print(f"[split] sim {header[12]:.1f} ticks/s, render {fps:.1f} frames/s, {header[11]} ticks")
+    ring.close(unlink=True)
+    game.close()
+    pygame.quit()
+
+
+def _play_new(sound, count, seen):
+    if count > seen and sound:
+        sound.play()
+    return count
+
+
+def _on_state_change(game, previous):
+    if game.state == STATE_PLAYING and previous == STATE_MENU:
+        if game.music_loaded and not pygame.mixer.music.get_busy():
+            pygame.mixer.music.set_volume(0.45)
+            pygame.mixer.music.play(-1)
+    elif game.state == STATE_GAME_OVER:
+        game.record_match()
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+        if game.game_over_snd:
+            game.game_over_snd.play()
+
+
+def _apply(game, header, records, registry, pool):
+    (_, state, reason, hp1, hp2, _, time_left, score, score_p2, _, _, _, _, seed,
+     elapsed, endless) = header
+    game.state = STATES[state]
+    game.game_over_reason = REASONS[reason]
+    game.time_left = time_left
+    game.elapsed_s = elapsed
+    game.endless = bool(endless)
+    game.score = score
+    game.score_p2 = score_p2
+    game.match_seed = seed if seed >= 0 else None
+
+    while len(pool) < len(records):
+        pool.append(_Proxy())
+
+    game.all_sprites.empty()
+    game.lures.empty()
+    game.player = game.player2 = None
+    for proxy, (kind, flags, img_id, x, y) in zip(pool, records):
+        proxy.image = registry.surfaces[img_id]
+        proxy.rect.size = proxy.image.get_size()
+        proxy.rect.topleft = (x, y)
+        game.all_sprites.add(proxy)
+        if kind == KIND_P1:
+            proxy.health = max(0, hp1)
+            game.player = proxy
+        elif kind == KIND_P2:
+            proxy.health = max(0, hp2)
+            game.player2 = proxy
+        elif kind == KIND_LURE:
+            proxy.owner = "P2" if flags & FLAG_P2 else "P1"
+            game.lures.add(proxy)
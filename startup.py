@@ -0,0 +1,46 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+#tiempos de arranque por fase hasta el primer frame (time-to-first-frame como metrica)
+
+
+class StartupProfiler:
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []
+        self.first_frame_ms = None
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, begin)
+
+    def add(self, name, begin):
+        #para fases largas que no conviene meter en un with
+        self.phases.append((name, (time.perf_counter() - begin) * 1000))
+
+    def first_frame(self):
+        if self.first_frame_ms is None:
+            self.first_frame_ms = (time.perf_counter() - self.start) * 1000
+
+    def report(self):
+        parts = [f"{name} {ms:.1f} ms" for name, ms in self.phases]
+        first = "n/a" if self.first_frame_ms is None else f"{self.first_frame_ms:.1f} ms"
+        return f"[startup] first frame {first} | " + " | ".join(parts)
+
+    def write(self, path):
+        #una linea JSON por arranque para seguir la metrica entre versiones
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "first_frame_ms": self.first_frame_ms,
+            "phases": {name: round(ms, 2) for name, ms in self.phases},
+        }
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
@@ -0,0 +1,170 @@
+import argparse
+import csv
+import itertools
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import eventsim
+import headless
+
+
+#barrido Monte Carlo de la curva de dificultad: partidas headless en un pool de procesos
+
+METRICS = ("survival_s", "score_p1", "score_p2", "damage_p1", "damage_p2")
+
+_worker_game = None
+
+
+def _init_worker():
+    global _worker_game
+    _worker_game = headless.make_game()
+
+
+def _play(game, params, policy_name, seed, events=False):
+    #partida con los valores de constants + los del punto
+    headless.apply_tuning(game, params)
+    play = eventsim.play_match if events else headless.play_match
+    row = play(game, seed, headless.POLICIES[policy_name](seed))
+    row.update(params)
+    row["policy"] = policy_name
+    return row
+
+
+def _run_chunk(point, policy_name, seeds, events=False):
+    params = dict(point)
+    #cada partida en un fork limpio del juego del worker: la fila depende solo de semilla y
+    #punto, no de las partidas que ese worker jugo antes
+    return [_play(headless.fork_game(_worker_game), params, policy_name, seed, events) for seed in seeds]
+
+
+def check_rows(rows, param_names, count, events=False):
+    #algunas filas repartidas en el barrido contra la misma partida en un juego recien creado
+    mismatches = []
+    for row in rows[::max(1, len(rows) // max(1, count))][:count]:
+        params = {name: row[name] for name in param_names}
+        fresh = _play(headless.make_game(), params, row["policy"], row["seed"], events)
+        if fresh != row:
+            mismatches.append((row, fresh))
+    return mismatches
+
+
+def parse_grid(specs):
+    #["predator_chance=0.2,0.3", "idle_shark_delay_ms=1500,2500"] -> lista de puntos
+    axes = []
+    for spec in specs:
+        name, values = spec.split("=", 1)
+        axes.append([(name, _number(v)) for v in values.split(",")])
+    return [tuple(p) for p in itertools.product(*axes)] if axes else [()]
+
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _quantile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * (len(values) - 1) + 0.5))]
+
+
+def summarize(rows, param_names):
+    groups = {}
+    for row in rows:
+        key = tuple(row[name] for name in param_names) + (row["policy"],)
+        groups.setdefault(key, []).append(row)
+
+    table = []
+    for key, group in sorted(groups.items()):
+        out = dict(zip(param_names + ["policy"], key))
+        out["matches"] = len(group)
+        out["wrecked_rate"] = round(sum(r["reason"] != "Time's up!" for r in group) / len(group), 4)
+        for metric in METRICS:
+            values = [r[metric] for r in group]
+            out[f"{metric}_mean"] = round(statistics.fmean(values), 3)
+            out[f"{metric}_p10"] = _quantile(values, 0.1)
+            out[f"{metric}_p50"] = _quantile(values, 0.5)
+            out[f"{metric}_p90"] = _quantile(values, 0.9)
+        table.append(out)
+    return table
+
+
+def write_table(rows, path):
+    if not rows:
+        return
+    if path.endswith(".parquet"):
+        #parquet es opcional (pyarrow); sin el se escribe csv
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            path = path[: -len(".parquet")] + ".csv"
+        else:
+            pq.write_table(pa.Table.from_pylist(rows), path)
+            return path
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def run_sweep(points, policy_name, matches, workers=None, base_seed=0, chunk=8, events=False):
+    jobs = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for i, point in enumerate(points):
+            seeds = [base_seed + i * matches + n for n in range(matches)]
+            for start in range(0, matches, chunk):
+                jobs.append(pool.submit(_run_chunk, point, policy_name, seeds[start:start + chunk], events))
+        rows = []
+        for job in jobs:
+            rows.extend(job.result())
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless difficulty sweep for Lucky Lures")
+    parser.add_argument("--param", action="append", default=[],
+                        help="name=v1,v2,... (LuckyLuresGame tuning attribute), repeatable")
+    parser.add_argument("--policy", default="random", choices=sorted(headless.POLICIES))
+    parser.add_argument("--matches", type=int, default=100, help="matches per grid point")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="sweep_summary.csv", help=".csv or .parquet")
+    parser.add_argument("--raw", help="also write one row per match here")
+    parser.add_argument("--events", action="store_true",
+                        help="event-driven matches (eventsim.py), same results as per-tick")
+    parser.add_argument("--check", type=int, default=3,
+                        help="raw rows replayed on a fresh game afterwards (0 = skip)")
+    args = parser.parse_args(argv)
+
+    points = parse_grid(args.param)
+    param_names = [name for name, _ in points[0]]
+    start = time.perf_counter()
+    rows = run_sweep(points, args.policy, args.matches, args.workers, args.seed, events=args.events)
+    elapsed = time.perf_counter() - start
+    if not rows:
+        #sin partidas (ej. --matches 0) no hay tabla que escribir
+        print(f"no matches played ({len(points)} points x {args.matches} matches), nothing written")
+        return 1
+
+    path = write_table(summarize(rows, param_names), args.out)
+    if args.raw:
+        write_table(rows, args.raw)
+    print(f"{len(rows)} matches over {len(points)} points in {elapsed:.1f}s "
+          f"({len(rows) / elapsed:.1f} matches/s) -> {path}")
+
+    mismatches = check_rows(rows, param_names, args.check, args.events)
+    for row, fresh in mismatches:
+        print(f"seed {row['seed']}: sweep {row}\n{' ' * (6 + len(str(row['seed'])))}fresh {fresh}")
+    if args.check:
+        print(f"{min(args.check, len(rows))} rows replayed on a fresh game: {len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
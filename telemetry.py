@@ -0,0 +1,78 @@
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+
+_STOP = object()
+
+
+class TelemetryLog:
+    #stream append-only de eventos en line-JSON; el frame loop solo hace put()
+
+    def __init__(self, directory, max_bytes=8 * 1024 * 1024, flush_s=1.0, prefix="telemetry"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_s = flush_s
+        self.prefix = prefix
+        self.queue = queue.SimpleQueue()
+        self.file_index = 0
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._writer, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def emit(self, kind, t_ms, match, **fields):
+        fields["e"] = kind
+        fields["t"] = int(t_ms)
+        fields["m"] = match
+        self.queue.put(fields)
+
+    def close(self, timeout=5.0):
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def _open(self):
+        self.file_index += 1
+        name = time.strftime(f"{self.prefix}_%Y%m%d_%H%M%S") + f"_{os.getpid()}_{self.file_index:04d}.jsonl"
+        path = os.path.join(self.directory, name)
+        return path, open(path, "a", encoding="utf-8")
+
+    def _rotate(self, path, handle):
+        handle.close()
+        #se comprime en el mismo thread escritor, nunca en el frame loop
+        with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(path)
+
+    def _writer(self):
+        path, handle = self._open()
+        stop = False
+        while not stop:
+            lines = []
+            try:
+                item = self.queue.get(timeout=self.flush_s)
+                while True:
+                    if item is _STOP:
+                        stop = True
+                        break
+                    lines.append(json.dumps(item, separators=(",", ":")))
+                    item = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            if lines:
+                handle.write("\n".join(lines) + "\n")
+                handle.flush()
+                if handle.tell() >= self.max_bytes:
+                    self._rotate(path, handle)
+                    path, handle = self._open()
+
+        empty = handle.tell() == 0
+        handle.close()
+        if empty:
+            os.remove(path)
+        else:
+            self._rotate(path, open(path, "rb"))
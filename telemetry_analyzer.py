@@ -0,0 +1,94 @@
+import argparse
+import glob
+import gzip
+import json
+import math
+import os
+from collections import Counter
+
+
+#lee gigas de logs en streaming: solo se guardan agregados, nunca los records
+
+
+def iter_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "*.jsonl*")))
+        else:
+            yield path
+
+
+def iter_records(paths):
+    for path in iter_files(paths):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # linea cortada al final de un archivo sin cerrar
+
+
+class Summary:
+    def __init__(self, score_bucket=50):
+        self.score_bucket = score_bucket
+        self.matches = 0
+        self.catches_by_minute = Counter()
+        self.minute_exposure = Counter()  # partidas que llegaron a cada minuto
+        self.damage = Counter()
+        self.events = Counter()
+        self.scores = Counter()
+
+    def add(self, rec):
+        kind = rec.get("e")
+        self.events[kind] += 1
+        minute = rec.get("t", 0) // 60000
+        if kind == "catch":
+            self.catches_by_minute[minute] += 1
+        elif kind in ("bite", "obstacle_hit"):
+            self.damage[kind] += 1
+        elif kind == "match_end":
+            self.matches += 1
+            #minutos que la partida llego a jugar: 60 s exactos son solo el minuto 0
+            duration_min = math.ceil(rec.get("duration_s", 0) / 60)
+            for m in range(duration_min):
+                self.minute_exposure[m] += 1
+            for score in rec.get("scores", {}).values():
+                self.scores[score // self.score_bucket * self.score_bucket] += 1
+
+    def lines(self):
+        out = [f"matches: {self.matches}", "events: " + ", ".join(f"{k}={v}" for k, v in sorted(self.events.items()))]
+        out.append("catches per match-minute:")
+        for minute in sorted(self.catches_by_minute):
+            exposure = self.minute_exposure.get(minute) or 1
+            out.append(f"  min {minute}: {self.catches_by_minute[minute] / exposure:.2f}")
+        total_damage = sum(self.damage.values()) or 1
+        out.append("damage sources:")
+        for kind, count in self.damage.most_common():
+            out.append(f"  {kind}: {count} ({100 * count / total_damage:.0f}%)")
+        out.append("score distribution (per player):")
+        for bucket in sorted(self.scores):
+            out.append(f"  {bucket}-{bucket + self.score_bucket - 1}: {self.scores[bucket]}")
+        return out
+
+
+def summarize(records, score_bucket=50):
+    summary = Summary(score_bucket)
+    for rec in records:
+        summary.add(rec)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize Lucky Lures telemetry logs")
+    parser.add_argument("paths", nargs="+", help="log files or directories")
+    parser.add_argument("--score-bucket", type=int, default=50)
+    args = parser.parse_args(argv)
+    print("\n".join(summarize(iter_records(args.paths), args.score_bucket).lines()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import random
+
+import pygame
+
+
+#rio largo: coordenadas de mundo (las de los rects) separadas de las de pantalla.
+#La camara es un Rect de vista que se mueve en el lugar; las entidades que usan la vista
+#como limite (cebos, botes, obstaculos) guardan ese mismo Rect y lo ven moverse solo
+
+
+class Camera:
+    def __init__(self, world, size, smoothing=0.12, lead=0.6):
+        self.world = world
+        self.view = pygame.Rect(0, 0, size[0], size[1])
+        self.view.bottom = world.bottom
+        self.y = float(self.view.top)
+        self.smoothing = smoothing
+        self.lead = lead  # los botes quedan un poco abajo del centro: se ve mas rio adelante
+
+    def _goal(self, boats):
+        total = count = 0
+        for boat in boats:
+            if boat:
+                total += boat.rect.centery
+                count += 1
+        if not count:
+            return None
+        return total / count - self.view.height * self.lead
+
+    def follow(self, boats, snap=False):
+        goal = self._goal(boats)
+        if goal is None:
+            return
+        self.y = goal if snap else self.y + (goal - self.y) * self.smoothing
+        self.y = max(self.world.top, min(self.y, self.world.bottom - self.view.height))
+        self.view.top = round(self.y)
+
+
+class ChunkStreamer:
+    #el fondo se arma en franjas de chunk_h px; solo existen las que estan cerca de la vista.
+    #Las franjas que salen vuelven a un pool y se reusan, la memoria no depende del largo del rio
+
+    def __init__(self, world, chunk_h, margin, make_chunk):
+        self.world = world
+        self.chunk_h = chunk_h
+        self.margin = margin
+        self.make_chunk = make_chunk
+        self.count = (world.height + chunk_h - 1) // chunk_h
+        self.chunks = {}
+        self.pool = []
+        self.generated = 0
+        self.evicted = 0
+
+    def _range(self, top, bottom):
+        h = self.chunk_h
+        first = max(0, (top - self.world.top) // h)
+        last = min(self.count - 1, (bottom - 1 - self.world.top) // h)
+        return first, last
+
+    def update(self, view):
+        first, last = self._range(view.top - self.margin, view.bottom + self.margin)
+        for index in [i for i in self.chunks if i < first or i > last]:
+            self.pool.append(self.chunks.pop(index))
+            self.evicted += 1
+        for index in range(first, last + 1):
+            if index not in self.chunks:
+                surface = self.pool.pop() if self.pool else self._new_surface()
+                self.make_chunk(surface, index, self.world.top + index * self.chunk_h)
+                self.chunks[index] = surface
+                self.generated += 1
+
+    def _new_surface(self):
+        surface = pygame.Surface((self.world.width, self.chunk_h))
+        return surface.convert() if pygame.display.get_surface() else surface
+
+    def draw(self, screen, view):
+        first, last = self._range(view.top, view.bottom)
+        for index in range(first, last + 1):
+            surface = self.chunks.get(index)
+            if surface is not None:
+                screen.blit(surface, (0, self.world.top + index * self.chunk_h - view.top))
+
+
+class RegionScheduler:
+    #cerca de la vista: update normal cada tick. Lejos: update_far con el dt acumulado cada
+    #far_every ticks, repartido en turnos para que el costo por frame sea parejo.
+    #Fuera de la zona activa la entidad se descarta (el spawner repone cerca de la camara)
+
+    def __init__(self, near_margin, active_margin, far_every):
+        self.near_margin = near_margin
+        self.active_margin = active_margin
+        self.far_every = far_every
+        self.near = pygame.Rect(0, 0, 0, 0)
+        self.active = pygame.Rect(0, 0, 0, 0)
+        self.tick = 0
+        self.next_slot = 0
+        self.far_updates = 0
+
+    def begin(self, view):
+        self.tick += 1
+        self.near.update(view.left - self.near_margin, view.top - self.near_margin,
+                         view.width + 2 * self.near_margin, view.height + 2 * self.near_margin)
+        self.active.update(view.left - self.active_margin, view.top - self.active_margin,
+                           view.width + 2 * self.active_margin, view.height + 2 * self.active_margin)
+
+    def step(self, sprite, dt_ms):
+        #True si el que llama tiene que hacer el update normal
+        rect = sprite.rect
+        if self.near.colliderect(rect):
+            sprite.far_dt = 0
+            return True
+        if not self.active.colliderect(rect):
+            sprite.kill()
+            return False
+        if sprite.far_slot is None:
+            sprite.far_slot = self.next_slot
+            self.next_slot = (self.next_slot + 1) % self.far_every
+        sprite.far_dt += dt_ms
+        if (self.tick + sprite.far_slot) % self.far_every == 0:
+            sprite.update_far(sprite.far_dt)
+            sprite.far_dt = 0
+            self.far_updates += 1
+        return False
+
+
+class River:
+    def __init__(self, screens, view_size, chunk_h=200, near_margin=150, active_screens=1.5,
+                 far_every=4, bg_image=None, water=(30, 120, 180), band=(20, 100, 160)):
+        w, h = view_size
+        self.screens = screens
+        self.active_screens = active_screens
+        self.world = pygame.Rect(0, 0, w, h * screens)
+        self.camera = Camera(self.world, view_size)
+        self.bg_image = bg_image
+        self.water = water
+        self.band = band
+        self.chunks = ChunkStreamer(self.world, chunk_h, chunk_h, self._make_chunk)
+        self.regions = RegionScheduler(near_margin, int(h * active_screens), far_every)
+        self.regions.begin(self.camera.view)
+        #zona de nado de los cardumenes (left, top, right, bottom) a lo largo de todo el rio
+        self.school_bounds = (0, self.world.top + 60, w, self.world.bottom - 60)
+
+    def fork(self):
+        #mismo rio con camara, chunks y regiones propias (varias partidas en un proceso)
+        return River(self.screens, self.camera.view.size, self.chunks.chunk_h, self.regions.near_margin,
+                     self.active_screens, self.regions.far_every, self.bg_image, self.water, self.band)
+
+    def reset(self):
+        #vuelve la camara al fondo del rio y los chunks al pool
+        self.camera.view.bottom = self.world.bottom
+        self.camera.y = float(self.camera.view.top)
+        self.chunks.pool.extend(self.chunks.chunks.values())
+        self.chunks.chunks.clear()
+        self.regions.begin(self.camera.view)
+
+    def _make_chunk(self, surface, index, top):
+        #fondo en coordenadas de mundo (las baldosas siguen de una franja a la otra)
+        #y detalles con un rng propio del chunk: al volver a cargarlo sale igual
+        h = surface.get_height()
+        if self.bg_image:
+            bg_h = self.bg_image.get_height()
+            y = -(top % bg_h)
+            while y < h:
+                surface.blit(self.bg_image, (0, y))
+                y += bg_h
+        else:
+            surface.fill(self.water)
+            for y in range(-(top % 40), h, 40):
+                pygame.draw.rect(surface, self.band, (0, y, surface.get_width(), 20))
+        rng = random.Random(index)
+        for _ in range(rng.randint(1, 4)):
+            x = rng.randint(20, surface.get_width() - 60)
+            y = rng.randint(0, h - 20)
+            w = rng.randint(24, 60)
+            pygame.draw.ellipse(surface, (235, 245, 255), (x, y, w, w // 4), 1)
+
+    def follow(self, boats, snap=False):
+        self.camera.follow(boats, snap)
+        self.regions.begin(self.camera.view)
+
+    def spawn_offset(self):
+        #y de la vista: los spawns en coordenadas de pantalla se corren con esto
+        return self.camera.view.top
+
+    def draw_background(self, screen):
+        self.chunks.update(self.camera.view)
+        self.chunks.draw(screen, self.camera.view)